@@ -1,5 +1,6 @@
 import os
 from ctypes import cdll,c_long,c_uint32,c_uint16,c_uint8,byref,create_string_buffer,c_bool, c_char, c_char_p,c_int,c_int16,c_int8,c_double,c_float,sizeof,c_voidp, Structure
+from tlpmx_bindings import bind
 
 _VI_ERROR = (-2147483647-1)
 VI_ON = 1
@@ -270,6 +271,14 @@ TLPM_SENS_FLAG_IS_WAVEL_SET = 0x0020  # Wavelength settable
 TLPM_SENS_FLAG_IS_TAU_SET = 0x0040  # Time constant tau settable
 TLPM_SENS_FLAG_HAS_TEMP = 0x0100  # Temperature sensor included
 
+
+def _vi_boolean(flag):
+	"""
+	Returns a c_bool or bool flag as ViBoolean, which is 16 bit wide.
+	"""
+	return c_uint16(getattr(flag, "value", flag))
+
+
 class TLPMX:
 
 	def __init__(self, resourceName = None, IDQuery = False, resetDevice = False):
@@ -308,11 +317,12 @@ class TLPMX:
 			dll_name = "TLPMX_64.dll"
 			dllabspath = os.path.dirname(os.path.abspath(__file__)) + os.path.sep + dll_name
 			self.dll = cdll.LoadLibrary(dllabspath)
+		bind(self.dll)
 
 		self.devSession = c_long()
 		self.devSession.value = 0
 		if resourceName!= None:
-			pInvokeResult = self.dll.TLPMX_init(resourceName, IDQuery, resetDevice, byref(self.devSession))
+			pInvokeResult = self.dll.TLPMX_init(resourceName, _vi_boolean(IDQuery), _vi_boolean(resetDevice), byref(self.devSession))
 			self.__testForError(pInvokeResult)
 
 
@@ -358,7 +368,7 @@ class TLPMX:
 		"""
 		self.dll.TLPMX_close(self.devSession)
 		self.devSession.value = 0
-		pInvokeResult = self.dll.TLPMX_init(resourceName, IDQuery, resetDevice, byref(self.devSession))
+		pInvokeResult = self.dll.TLPMX_init(resourceName, _vi_boolean(IDQuery), _vi_boolean(resetDevice), byref(self.devSession))
 		self.__testForError(pInvokeResult)
 		return pInvokeResult
 
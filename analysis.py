@@ -0,0 +1,48 @@
+import numpy as np
+
+# Distance between the 10 % and 90 % points of a Gaussian knife-edge profile in units of the 1/e^2 radius
+CLIP_10_90 = 1.2816
+
+
+def knife_edge_width(positions, powers):
+    """
+    Estimates the 1/e^2 beam radius of a Gaussian beam from a knife-edge profile (10-90 % method).
+
+    :param positions: knife-edge positions in mm
+    :param powers: transmitted powers
+    :return: beam radius in mm, or NaN if the profile does not cover the 10-90 % transition
+    """
+    order = np.argsort(positions)
+    positions = np.asarray(positions, dtype=float)[order]
+    powers = np.asarray(powers, dtype=float)[order]
+    if len(positions) < 3 or np.ptp(powers) == 0:
+        return np.nan
+
+    # Normalize to a rising, monotonic profile so that the clip levels can be interpolated
+    normalized = (powers - powers.min()) / np.ptp(powers)
+    if normalized[-1] < normalized[0]:
+        normalized = 1 - normalized
+    normalized = np.maximum.accumulate(normalized)
+
+    x10, x90 = np.interp([0.1, 0.9], normalized, positions)
+    return (x90 - x10) / CLIP_10_90
+
+
+class KnifeEdgeEstimator:
+    """
+    Collects scan points and keeps a running estimate of the beam radius.
+    """
+
+    def __init__(self):
+        self.positions = []
+        self.powers = []
+
+    def add(self, position, power):
+        self.positions.append(position)
+        self.powers.append(power)
+
+    def width(self):
+        """
+        Returns the current 1/e^2 beam radius estimate in mm (see `knife_edge_width`).
+        """
+        return knife_edge_width(self.positions, self.powers)
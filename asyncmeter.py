@@ -0,0 +1,119 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from powermeter import TLPMXSession
+from TLPMX import TLPM_MEAS_POWER
+
+
+class AsyncPowerMeter:
+    """
+    asyncio front end of a `TLPMXSession`.
+
+    The blocking driver calls of each meter run on the meter's own single-thread executor, so calls to one
+    meter stay in order while several meters (and both channels of a dual-channel meter) are awaited at
+    the same time. The time per point is that of the slowest meter instead of the sum of all of them.
+    Usable as an async context manager.
+    """
+
+    def __init__(self, session, name=None):
+        """
+        :param session: `TLPMXSession`, opened on the executor if it is not open yet
+        :param name: name of the worker thread, by default the resource name
+        """
+        self.session = session
+        name = name or (session.resource.decode() if isinstance(session.resource, bytes) else session.resource)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"meter-{name or 'default'}")
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def run(self, function, *args, **kwargs):
+        """
+        Runs `function(*args, **kwargs)` on the executor of this meter and returns its result.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.executor, partial(function, *args, **kwargs))
+
+    async def open(self):
+        await self.run(self.session.open)
+
+    async def close(self):
+        """
+        Closes the session and shuts the executor down.
+
+        :return: None
+        """
+        try:
+            await self.run(self.session.close)
+        finally:
+            self.executor.shutdown(wait=False)
+
+    async def power(self, channel=None):
+        """
+        Measures the power of one channel.
+
+        :param channel: sensor channel, by default the channel of the session
+        :return: power in W
+        """
+        return await self.run(self.session.facade.power, channel)
+
+    async def dual_channel(self, measurement=TLPM_MEAS_POWER):
+        """
+        Measures both channels of a dual-channel meter simultaneously.
+
+        :param measurement: TLPM_MEAS_* quantity
+        :return: (channel 1, channel 2) results
+        """
+        return await self.run(self.session.facade.dual_channel, measurement)
+
+    async def read_power(self):
+        """
+        Runs `TLPMXSession.read_power` on the executor.
+
+        :return: (averaged power, standard deviation) in W
+        """
+        return await self.run(self.session.read_power)
+
+
+async def read_powers(meters, channels=None):
+    """
+    Measures the power of several meters or channels concurrently.
+
+    :param meters: `AsyncPowerMeter`s, repeated for several channels of one meter
+    :param channels: channel per entry of `meters`, by default the channel of each session
+    :return: list of powers in W, in the order of `meters`
+    """
+    if channels is None:
+        channels = [None] * len(meters)
+    return await asyncio.gather(*(meter.power(channel) for meter, channel in zip(meters, channels)))
+
+
+async def _ratio(wavelength, n_points):
+    async with AsyncPowerMeter(TLPMXSession(wavelength)) as meter:
+        for _ in range(n_points):
+            signal_power, reference_power = await meter.dual_channel()
+            print(f'Signal {signal_power:.5e} W, reference {reference_power:.5e} W, '
+                  f'ratio {signal_power / reference_power:.5f}')
+
+
+def main():
+    """
+    main():
+    ------
+
+    Prints the ratio of the signal and reference channels of a dual-channel meter.
+    :return: None
+    """
+
+    wavelength = 1064  # nm
+    n_points = 10
+
+    asyncio.run(_ratio(wavelength, n_points))
+
+
+if __name__ == "__main__":
+    main()
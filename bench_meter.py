@@ -0,0 +1,81 @@
+from analysis import knife_edge_width
+from kinesis import StageController
+from kinesis_sim import SimulatedDCServo
+from powermeter import PowerMeterSession, TLPMXSession
+from powermeter_sim import GaussianBeam, SimulatedPowerMeter
+from sampling import SequentialSampler
+from scan import FORWARD, scan
+
+TIME_SCALE = 5  # simulated seconds per wall-clock second
+WAVELENGTH = 1064  # nm
+
+
+def _visa_fixed(meter):
+    session = PowerMeterSession(WAVELENGTH, unit='W', resource_manager=meter.resource_manager())
+    return session, session.read_power
+
+
+def _visa_sequential(meter):
+    session = PowerMeterSession(WAVELENGTH, unit='W', resource_manager=meter.resource_manager())
+    sampler = SequentialSampler(lambda: session.query_values('read?')[0], relative_sem=0.002)
+    return session, sampler
+
+
+def _tlpmx_averaged(meter):
+    session = TLPMXSession(WAVELENGTH, avg_count=10, driver=meter.tlpmx)
+    return session, session.read_power
+
+
+MODES = {"VISA, 5 readings": _visa_fixed, "VISA, sequential": _visa_sequential, "TLPMX, averaged": _tlpmx_averaged}
+
+
+def bench_meter(mode, start=0.5, stop=1.5, n_steps=20, beam=None, time_scale=TIME_SCALE, seed=0):
+    """
+    Runs a knife-edge scan against the simulated stage and power meter in accelerated time.
+
+    :param mode: key of MODES, the acquisition to measure
+    :param start: scan start in mm
+    :param stop: scan end in mm
+    :param n_steps: number of steps
+    :param beam: `powermeter_sim.GaussianBeam` or `MultimodeBeam`, by default the simulator's
+    :param time_scale: speed of simulated time relative to the wall clock
+    :param seed: seed of the simulated noise
+    :return: (simulated s per point spent measuring, beam radius estimate in mm)
+    """
+    stages = SimulatedDCServo(time_scale=time_scale, seed=seed)
+    meter = SimulatedPowerMeter.for_stage(stages, beam=beam, seed=seed)
+    session, read = MODES[mode](meter)
+    measure_time = 0.0
+
+    def measure():
+        nonlocal measure_time
+        started = stages.monotonic()
+        measurement = read()
+        measure_time += stages.monotonic() - started
+        return measurement
+
+    with StageController(simulate=stages) as stage, session:
+        stage.move_to(start)
+        points = list(scan(stage, start, stop, n_steps, FORWARD, 1, 0.0, measure))
+
+    positions = [position for _, _, _, position, _ in points]
+    powers = [measurement[0] for _, _, _, _, measurement in points]
+    return measure_time / len(points), knife_edge_width(positions, powers)
+
+
+def main():
+    """
+    main():
+    ------
+
+    Compares the measuring time per point and the beam radius estimate of the acquisition modes.
+    :return: None
+    """
+    beam = GaussianBeam(power=1e-3, radius=0.1, center=1.0)
+    for mode in MODES:
+        per_point, radius = bench_meter(mode, beam=beam)
+        print(f'{mode:>18}: {per_point * 1000:7.1f} ms/point, radius {radius:.4f} mm (true {beam.radius} mm)')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import time
+
+import numpy as np
+
+from analysis import knife_edge_width
+from flyscan import fly_scan
+from kinesis import StageController
+from kinesis_sim import SimulatedDCServo
+from powermeter_sim import GaussianBeam, SimulatedPowerMeter
+from scan import FORWARD, MODES, scan
+
+TIME_SCALE = 50  # simulated seconds per wall-clock second
+# The simulated meter computes its fast-array samples in Python and falls behind the stream at higher scales
+FLY_TIME_SCALE = 2
+
+
+def bench_scan(start=0.0, stop=2.0, n_steps=20, mode=FORWARD, passes=1, time_scale=TIME_SCALE, seed=0):
+    """
+    Runs a stepped scan against the simulated DC servo in accelerated time.
+
+    :param start: scan start in mm
+    :param stop: scan end in mm
+    :param n_steps: number of steps per pass
+    :param mode: FORWARD, BACKWARD or SERPENTINE
+    :param passes: number of passes
+    :param time_scale: speed of simulated time relative to the wall clock
+    :param seed: seed of the simulated encoder noise
+    :return: (simulated s per point, largest position error in mm)
+    """
+    simulator = SimulatedDCServo(time_scale=time_scale, seed=seed)
+    with StageController(simulate=simulator) as stage:
+        stage.move_to(start)
+        started = simulator.monotonic()
+        errors = [abs(position - target) for _, _, target, position, _ in
+                  scan(stage, start, stop, n_steps, mode, passes)]
+        elapsed = simulator.monotonic() - started
+
+    return elapsed / len(errors), max(errors)
+
+
+def bench_fly_scan(start=0.5, stop=1.5, velocity=0.5, acceleration=1.0, beam=None, time_scale=FLY_TIME_SCALE,
+                   seed=0):
+    """
+    Runs a fly scan against the simulated DC servo and power meter in accelerated time.
+
+    The positions assigned to the samples are checked against the beam model, so a fly scan timed with a
+    different clock than the stage's shows up as a large power error and a wrong radius.
+    :param start: scan start in mm
+    :param stop: scan end in mm
+    :param velocity: scan velocity in mm/s
+    :param acceleration: acceleration in mm/s^2
+    :param beam: `powermeter_sim.GaussianBeam`, by default the simulator's
+    :param time_scale: speed of simulated time relative to the wall clock
+    :param seed: seed of the simulated noise
+    :return: (simulated s of the scan, median power error in W, beam radius estimate in mm)
+    """
+    simulator = SimulatedDCServo(time_scale=time_scale, seed=seed)
+    power_meter = SimulatedPowerMeter.for_stage(simulator, beam=beam, seed=seed)
+    meter = power_meter.tlpmx()
+    meter.open(None, False, False)
+    try:
+        with StageController(simulate=simulator) as stage:
+            started = simulator.monotonic()
+            positions, powers, _ = fly_scan(stage, meter, start, stop, velocity, acceleration)
+            elapsed = simulator.monotonic() - started
+    finally:
+        meter.close()
+
+    error = np.median(np.abs(powers - power_meter.beam.transmitted(positions)))
+    return elapsed, error, knife_edge_width(positions, powers)
+
+
+def main():
+    """
+    main():
+    ------
+
+    Reports the simulated time per point of every scan mode and the accuracy of a fly scan, to compare
+    scan-throughput changes.
+    :return: None
+    """
+    for mode in MODES:
+        wall_start = time.perf_counter()
+        per_point, max_error = bench_scan(mode=mode, passes=2)
+        wall = time.perf_counter() - wall_start
+        print(f'{mode:>10}: {per_point * 1000:8.1f} ms/point, max error {max_error * 1000:.2f} um '
+              f'(wall clock {wall:.2f} s)')
+
+    beam = GaussianBeam()
+    duration, error, radius = bench_fly_scan(beam=beam)
+    print(f'{"fly scan":>10}: {duration:8.2f} s/scan, median power error {error * 1000:.4f} mW, '
+          f'radius {radius:.4f} mm (true {beam.radius} mm)')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import glob
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MODULES = ["TLPMX", "tlpmx_facade", "powermeter", "asyncmeter", "darkoffset", "flyscan", "hwtrigger"]
+RUNS = 7
+
+
+def import_time(module, directory, cached=True):
+    """
+    Imports `module` in a fresh interpreter and returns its cumulative import time.
+
+    :param module: module name
+    :param directory: directory holding the project modules
+    :param cached: use and write byte code caches; if False, the module and its project imports are
+        compiled from source, as on a first start
+    :return: import time in s
+    """
+    command = [sys.executable, "-X", "importtime"] + ([] if cached else ["-B"]) + ["-c", f"import {module}"]
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    result = subprocess.run(command, cwd=directory, env=env, capture_output=True, text=True, check=True)
+    match = re.search(rf"^import time:\s+\d+ \|\s+(\d+) \| {module}$", result.stderr, re.M)
+    return int(match.group(1)) * 1e-6
+
+
+def bench_startup(modules=MODULES, runs=RUNS):
+    """
+    Measures the median import time of the project modules with and without byte code caches.
+
+    The uncached runs work on a copy of the project without __pycache__ directories.
+    :param modules: module names
+    :param runs: imports per module and case
+    :return: dict of (cached s, uncached s) by module
+    """
+    with tempfile.TemporaryDirectory() as copy:
+        for path in glob.glob(os.path.join(HERE, "*.py")):
+            shutil.copy(path, copy)
+        times = {}
+        for module in modules:
+            import_time(module, HERE)  # write the caches
+            cached = statistics.median(import_time(module, HERE) for _ in range(runs))
+            uncached = statistics.median(import_time(module, copy, cached=False) for _ in range(runs))
+            times[module] = cached, uncached
+    return times
+
+
+def main():
+    """
+    main():
+    ------
+
+    Prints the import times of the project modules.
+    :return: None
+    """
+    print(f'{"module":>14}  {"cached":>9}  {"uncached":>9}')
+    for module, (cached, uncached) in bench_startup().items():
+        print(f'{module:>14}  {cached * 1000:6.1f} ms  {uncached * 1000:6.1f} ms')
+
+
+if __name__ == "__main__":
+    main()
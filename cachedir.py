@@ -0,0 +1,18 @@
+import os
+
+APP_NAME = "knife"
+
+
+def cache_path(file_name):
+    """
+    Returns the path of a cache file in the per-user cache directory: %LOCALAPPDATA%\\knife on Windows,
+    $XDG_CACHE_HOME/knife (by default ~/.cache/knife) elsewhere. The directory is not created here.
+
+    :param file_name: name of the cache file
+    :return: absolute path
+    """
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser(os.path.join("~", "AppData", "Local"))
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser(os.path.join("~", ".cache"))
+    return os.path.join(base, APP_NAME, file_name)
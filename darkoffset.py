@@ -0,0 +1,143 @@
+import json
+import os
+import time
+from ctypes import *
+
+from cachedir import cache_path
+from powermeter import TLPMXSession
+from TLPMX import TLPM_STAT_DARK_ADJUST_RUNNING
+
+DARK_CACHE = cache_path("dark_offsets.json")
+MAX_AGE = 8 * 3600  # s, offsets older than this are measured again
+ADJUST_POLL_INTERVAL = 0.1  # s
+ADJUST_TIMEOUT = 30  # s
+
+
+def adjust_dark(session, poll_interval=ADJUST_POLL_INTERVAL, timeout=ADJUST_TIMEOUT):
+    """
+    Runs the meter's dark/zero adjustment and reads the resulting offset. The input must be darkened.
+
+    :param session: open `TLPMXSession`
+    :param poll_interval: time between two state queries in s
+    :param timeout: time in s after which the adjustment is cancelled
+    :return: dark offset (A for photodiodes, V for thermal sensors)
+    """
+    meter = session.meter
+    meter.startDarkAdjust(session.channel)
+    state = c_int16(TLPM_STAT_DARK_ADJUST_RUNNING)
+    deadline = time.monotonic() + timeout
+    while True:
+        meter.getDarkAdjustState(byref(state), session.channel)
+        if state.value != TLPM_STAT_DARK_ADJUST_RUNNING:
+            break
+        if time.monotonic() > deadline:
+            meter.cancelDarkAdjust(session.channel)
+            raise TimeoutError(f"Dark adjustment did not finish within {timeout} s.")
+        time.sleep(poll_interval)
+
+    offset = c_double()
+    meter.getDarkOffset(byref(offset), session.channel)
+    return offset.value
+
+
+class DarkOffsetCache:
+    """
+    Dark offsets stored in a JSON file in the per-user cache directory, keyed by sensor serial number and
+    wavelength.
+
+    A dark adjustment blocks the meter for several seconds and needs a darkened input, so it is done once
+    with `measure` and the stored offset is written back with `setDarkOffset` whenever a session starts
+    (`apply`). The offset is a sensor current (or voltage), so it does not depend on the power range, which
+    sessions leave to auto range anyway. Offsets older than `max_age` are treated as missing, since the
+    dark current drifts with temperature.
+    """
+
+    def __init__(self, path=DARK_CACHE, max_age=MAX_AGE):
+        """
+        :param path: cache file
+        :param max_age: age in s after which an offset has expired, None to keep offsets forever
+        """
+        self.path = path
+        self.max_age = max_age
+        self.offsets = {}
+        if os.path.exists(path):
+            with open(path) as cache_file:
+                self.offsets = json.load(cache_file)
+
+    @staticmethod
+    def key(sensor_serial, wavelength):
+        return f"{sensor_serial}@{float(wavelength):g}nm"
+
+    def get(self, sensor_serial, wavelength):
+        """
+        Returns the stored offset, or None if there is none or it has expired.
+        """
+        entry = self.offsets.get(self.key(sensor_serial, wavelength))
+        if entry is None:
+            return None
+        if self.max_age is not None and time.time() - entry["time"] > self.max_age:
+            return None
+        return entry["offset"]
+
+    def put(self, sensor_serial, wavelength, offset):
+        """
+        Stores an offset and writes the cache file.
+
+        :return: None
+        """
+        self.offsets[self.key(sensor_serial, wavelength)] = {"offset": offset, "time": time.time()}
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "w") as cache_file:
+            json.dump(self.offsets, cache_file, indent=1)
+
+    def _key_args(self, session):
+        _, sensor_serial = session.sensor_info()
+        return sensor_serial, session.wavelength
+
+    def measure(self, session):
+        """
+        Runs a dark adjustment and stores its offset. The input must be darkened.
+
+        :param session: `TLPMXSession`
+        :return: dark offset
+        """
+        session.open()
+        offset = adjust_dark(session)
+        self.put(*self._key_args(session), offset)
+        return offset
+
+    def apply(self, session):
+        """
+        Writes the stored offset for the connected sensor and wavelength to the meter. Without a current
+        offset the meter keeps its own; the caller decides whether to report that.
+
+        :param session: `TLPMXSession`
+        :return: True if an offset was applied, False if none is stored or it has expired
+        """
+        session.open()
+        offset = self.get(*self._key_args(session))
+        if offset is None:
+            return False
+        session.meter.setDarkOffset(c_double(offset), session.channel)
+        return True
+
+
+def main():
+    """
+    main():
+    ------
+
+    Measures the dark offset of the connected sensor and stores it for later sessions.
+    :return: None
+    """
+    wavelength = 1064  # nm
+
+    cache = DarkOffsetCache()
+    input('Block the light to the sensor and press Enter.')
+    with TLPMXSession(wavelength) as session:
+        offset = cache.measure(session)
+        print(f'Dark offset {offset:.5e} stored in {cache.path}')
+
+
+if __name__ == "__main__":
+    main()
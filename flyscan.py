@@ -0,0 +1,163 @@
+import threading
+from ctypes import *
+
+import numpy as np
+
+from kinesis import MOVE_TIMEOUT, StageController, _clock, polling_interval_for, trapezoid_duration, trapezoid_position
+from TLPMX import TLPMX, TLPM_DEFAULT_CHANNEL
+from tlpmx_arrays import FAST_ARRAY_SIZE, ArrayReader
+
+POSITION_POLL_INTERVAL = 0.005  # s
+POSITION_RESOLUTION = 0.005  # mm, largest lag of the positions polled during a fly scan
+
+
+def _poll_positions(stage, done, times, positions, t0):
+    """
+    Records (time, polled position in device units) pairs until `done` is set. Runs in a background thread.
+    """
+    monotonic, sleep = _clock(stage.lib)
+    while not done.is_set():
+        times.append(monotonic() - t0)
+        positions.append(stage.polled_device_position())
+        sleep(POSITION_POLL_INTERVAL)
+
+
+def fly_scan(stage, meter, start, stop, velocity, acceleration, channel=TLPM_DEFAULT_CHANNEL, timeout=MOVE_TIMEOUT):
+    """
+    Scans the knife edge in one constant-velocity move while streaming power samples from the meter.
+
+    The stage is parked before `start` so that it has reached `velocity` when crossing the scan range.
+    Every power sample is time-stamped by the meter; its position is taken from the trapezoidal velocity
+    profile of the move, aligned in time with the positions polled from the controller during the move.
+    :param stage: open `StageController`
+    :param meter: open `TLPMX` session of a meter supporting fast array measurements
+    :param start: scan start in mm
+    :param stop: scan end in mm
+    :param velocity: scan velocity in mm/s
+    :param acceleration: acceleration in mm/s^2
+    :param channel: meter channel
+    :param timeout: time in s the scan may take beyond the duration of the move before `TimeoutError` is raised
+    :return: (positions in mm, powers in W, sample times in s) as NumPy arrays, restricted to the scan range
+    """
+    monotonic, _ = _clock(stage.lib)
+    direction = 1.0 if stop >= start else -1.0
+    run_up = velocity ** 2 / (2 * acceleration)
+    move_start = start - direction * run_up
+    move_stop = stop + direction * run_up
+    duration = trapezoid_duration(move_stop - move_start, velocity, acceleration)
+
+    saved_velocity = stage.get_velocity()
+    saved_polling = stage.polling_interval
+    polling_interval = polling_interval_for(velocity, POSITION_RESOLUTION)
+    stage.move_to(move_start)
+    stage.set_velocity(velocity, acceleration)
+    stage.set_polling_interval(polling_interval)
+
+    reader = ArrayReader(meter, FAST_ARRAY_SIZE, channel)
+    sample_times = []
+    sample_values = []
+    fetch_delays = []
+    stream_time = 0.0  # s, time of the next sample after the first one of the stream
+    interval = 0.0  # s between two samples
+    t_complete = None
+    poll_times = []
+    poll_positions = []
+    done = threading.Event()
+
+    try:
+        meter.confPowerFastArrayMeasurement(c_uint16(channel))
+        t0 = monotonic()
+        deadline = t0 + duration + timeout
+        target_dev = stage.start_move(move_stop)
+        poller = threading.Thread(target=_poll_positions, args=(stage, done, poll_times, poll_positions, t0))
+        poller.start()
+
+        while True:
+            if monotonic() > deadline:
+                raise TimeoutError(f"Fly scan did not complete within {duration + timeout:.1f} s.")
+            if t_complete is None and stage.is_move_complete(target_dev):
+                t_complete = monotonic() - t0
+            timestamps, values = reader.fast_array()
+            t_fetched = monotonic() - t0
+            if len(values):
+                # Blocks follow each other without gaps, but a block may have waited in the meter's buffer
+                # for a while; the stream is anchored below to the fetch with the shortest delay
+                relative = timestamps * 1e-6
+                if len(relative) > 1:
+                    interval = relative[-1] / (len(relative) - 1)
+                block_times = stream_time + relative
+                stream_time = block_times[-1] + interval
+                sample_times.append(block_times)
+                sample_values.append(values.astype(float))
+                fetch_delays.append(t_fetched - block_times[-1])
+            if t_complete is not None and (len(values) < FAST_ARRAY_SIZE or
+                                           stream_time + min(fetch_delays) >= t_complete):
+                break  # The samples up to the end of the move have been fetched
+    finally:
+        done.set()
+        stage.set_velocity(*saved_velocity)
+        stage.set_polling_interval(saved_polling)
+        reader.stop_fast_array()
+
+    poller.join()
+    sample_times = np.concatenate(sample_times) + min(fetch_delays) if sample_times else np.empty(0)
+    sample_values = np.concatenate(sample_values) if sample_values else np.empty(0)
+
+    # Align the model profile with the polled positions, using only the samples taken while moving
+    model_t = np.linspace(0.0, duration, 10000)
+    model_x = trapezoid_position(model_t, move_start, move_stop, velocity, acceleration)
+    poll_times = np.array(poll_times)
+    poll_positions = stage.to_real(np.array(poll_positions))
+    moving = (direction * (poll_positions - move_start) > 0) & (direction * (move_stop - poll_positions) > 0)
+    if moving.any():
+        travelled = direction * (model_x - move_start)
+        t_model = np.interp(direction * (poll_positions[moving] - move_start), travelled, model_t)
+        # A polled position is on average half a polling interval old when it is read
+        offset = np.median(poll_times[moving] - t_model) - polling_interval / 2000
+    else:
+        offset = 0.0
+
+    sample_positions = trapezoid_position(sample_times - offset, move_start, move_stop, velocity, acceleration)
+    in_range = (direction * (sample_positions - start) >= 0) & (direction * (stop - sample_positions) >= 0)
+    return sample_positions[in_range], sample_values[in_range], sample_times[in_range]
+
+
+def main():
+    """
+    main():
+    ------
+
+    Records a knife-edge profile with a single fly scan and saves it to a text file.
+    :return: None
+    """
+
+    start = 0  # Scan start in mm (change this value as needed)
+    stop = 2  # Scan end in mm (change this value as needed)
+    velocity = 0.5  # Scan velocity in mm/s
+    acceleration = 1.0  # mm/s^2
+    wavelength = 1064  # nm
+    save_path = "flyscan.txt"
+
+    meter = TLPMX()
+    device_count = c_uint32()
+    meter.findRsrc(byref(device_count))
+    if device_count.value == 0:
+        raise Exception('Could not find a power meter.')
+    resource_name = create_string_buffer(1024)
+    meter.getRsrcName(c_uint32(0), resource_name)
+    meter.open(resource_name, c_bool(True), c_bool(True))
+
+    try:
+        meter.setWavelength(c_double(wavelength), c_uint16(TLPM_DEFAULT_CHANNEL))
+        with StageController() as stage:
+            positions, powers, times = fly_scan(stage, meter, start, stop, velocity, acceleration)
+    finally:
+        meter.close()
+
+    print(f'Recorded {len(powers)} samples between {start} and {stop} mm')
+    np.savetxt(save_path, np.column_stack((times, positions, powers)), fmt="%.6f\t%.5f\t%.5e",
+               header="Time (s)\tPosition (mm)\tPower (W)", comments="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+from ctypes import *
+
+import numpy as np
+
+from kinesis import MOVE_POLL_INTERVAL, MOVE_TIMEOUT, StageController, _clock, trapezoid_duration, trapezoid_position
+from scan import FORWARD, scan
+from TLPMX import TLPMX, DIGITAL_IO_CONFIG_OUTPUT, TLPM_DEFAULT_CHANNEL, TLPM_IOLVL_HIGH, TLPM_IOLVL_LOW, TLPM_TRIGGER_SRC_REAR
+from tlpmx_arrays import SEQUENCE_BLOCK, ArrayReader, BurstRing, burst_blocks
+
+BURST_COUNT = 10  # samples per trigger
+BURST_AVERAGING = 1  # in 10 µs
+BURST_INIT_DELAY = 0  # in 10 µs, settle margin between the trigger and the first sample
+BURST_TICK = 10e-6  # s, unit of the burst averaging and delay
+TRIGGER_TIMEOUT = 1.0  # s
+CAPTURE_AVERAGING = 100  # in 10 µs, 1 ms per sample of a move capture
+CAPTURE_CAPACITY = 100000  # samples kept of a move capture
+# Driver methods of triggered scans and captures, see `powermeter.TLPMXSession.supports`
+TRIGGER_METHODS = ("setDigIoPinMode", "setDigIoOutput", "confBurstArrayMeasPowerChannel", "confBurstArrayMeasTrigger",
+                   "startBurstArrayMeasurement", "getBurstArraySamplesCount", "getBurstArraySamples")
+
+
+class TriggerOutput:
+    """
+    Digital output of the meter used as trigger source.
+
+    Wire the pin to the meter's trigger input (or to the trigger input of another device). A pulse is a
+    rising and a falling edge, sent as soon as the controller reports that a move has completed.
+    """
+
+    def __init__(self, meter, pin=1):
+        """
+        :param meter: open `TLPMX` session
+        :param pin: digital I/O pin, 1 to 4
+        """
+        if not 1 <= pin <= 4:
+            raise ValueError("Trigger pin must be between 1 and 4.")
+        self.meter = meter
+        self.pin = pin
+        self.low = [c_int16(TLPM_IOLVL_LOW)] * 4
+        self.high = list(self.low)
+        self.high[pin - 1] = c_int16(TLPM_IOLVL_HIGH)
+
+    def configure(self):
+        """
+        Configures the pin as output and sets it low.
+
+        :return: None
+        """
+        self.meter.setDigIoPinMode(c_int16(self.pin), c_uint16(DIGITAL_IO_CONFIG_OUTPUT))
+        self.meter.setDigIoOutput(*self.low)
+
+    def pulse(self):
+        """
+        Sends one trigger pulse.
+
+        :return: None
+        """
+        self.meter.setDigIoOutput(*self.high)
+        self.meter.setDigIoOutput(*self.low)
+
+
+def _wait_for_samples(reader, n, clock, timeout=TRIGGER_TIMEOUT):
+    monotonic, sleep = clock
+    deadline = monotonic() + timeout
+    while reader.burst_count() < n:
+        if monotonic() > deadline:
+            raise TimeoutError(f"Meter did not record {n} samples within {timeout} s. Is the trigger connected?")
+        sleep(MOVE_POLL_INTERVAL)
+
+
+def _wait_for_move(stage, target_dev, timeout):
+    monotonic, sleep = _clock(stage.lib)
+    deadline = monotonic() + timeout
+    while not stage.is_move_complete(target_dev):
+        if monotonic() > deadline:
+            raise TimeoutError(f"Move did not complete within {timeout} s.")
+        sleep(MOVE_POLL_INTERVAL)
+
+
+def triggered_scan(stage, meter, trigger, start, stop, n_steps, mode=FORWARD, passes=1, backlash=0.0,
+                   burst_count=BURST_COUNT, averaging=BURST_AVERAGING, init_delay=BURST_INIT_DELAY,
+                   trigger_source=TLPM_TRIGGER_SRC_REAR, channel=TLPM_DEFAULT_CHANNEL):
+    """
+    Runs a stepped scan in which every stage position hardware-triggers a burst of power samples.
+
+    The meter is armed once in burst array mode. At every point the trigger is pulsed as soon as the move
+    has completed, and the meter takes `burst_count` samples after a fixed `init_delay`, so the time of
+    sampling no longer depends on software sleeps. The samples of the point are then read from the
+    meter's burst buffer.
+    :param stage: open `StageController`
+    :param meter: open `TLPMX` session of a meter with burst array mode (PM103, PM5020)
+    :param trigger: `TriggerOutput` wired to the trigger input selected by `trigger_source`
+    :param start: lower end of the scan range in mm
+    :param stop: upper end of the scan range in mm
+    :param n_steps: number of steps per pass
+    :param mode: FORWARD, BACKWARD or SERPENTINE
+    :param passes: number of passes
+    :param backlash: backlash of the stage in mm
+    :param burst_count: samples per point
+    :param averaging: averaging of every sample in 10 µs
+    :param init_delay: delay between the trigger and the first sample in 10 µs
+    :param trigger_source: TLPM_TRIGGER_SRC_* input of the meter
+    :param channel: meter channel
+    :return: generator of (pass index, step, target position, measured position, (mean power, standard
+        deviation, number of samples)), like `scan.scan`
+    """
+    clock = _clock(stage.lib)
+    reader = ArrayReader(meter, burst_count)
+    trigger.configure()
+    meter.confBurstArrayMeasPowerChannel(c_uint16(channel))
+    meter.confBurstArrayMeasTrigger(c_uint32(trigger_source), c_uint32(init_delay), c_uint32(burst_count),
+                                    c_uint32(averaging))
+    meter.startBurstArrayMeasurement()
+
+    recorded = 0
+    for pass_index, step, target, position, _ in scan(stage, start, stop, n_steps, mode, passes, backlash,
+                                                        trigger.pulse):
+        _wait_for_samples(reader, recorded + burst_count, clock)
+        _, values, _ = reader.burst(recorded, burst_count)
+        recorded += burst_count
+        yield pass_index, step, target, position, (float(np.mean(values)), float(np.std(values)), burst_count)
+
+
+def triggered_move(stage, meter, trigger, target, interval, blocks, h_pos=1, trigger_source=TLPM_TRIGGER_SRC_REAR,
+                   channel=TLPM_DEFAULT_CHANNEL, timeout=MOVE_TIMEOUT):
+    """
+    Records a power sequence hardware-triggered at the start of a move.
+
+    The meter is armed for a triggered measurement sequence and the trigger is pulsed right before the
+    move is started. Sample times are taken from the meter's time stamps relative to the trigger, and
+    positions from the trapezoidal velocity profile of the move.
+    :param stage: open `StageController`
+    :param meter: open `TLPMX` session of a meter with measurement sequences (PM103, PM5020)
+    :param trigger: `TriggerOutput` wired to the trigger input selected by `trigger_source`
+    :param target: end of the move in mm
+    :param interval: sampling interval, see `TLPMX.confPowerMeasurementSequenceHWTrigger`
+    :param blocks: sequence length in units of SEQUENCE_BLOCK samples
+    :param h_pos: index of the trigger in the capture
+    :param trigger_source: TLPM_TRIGGER_SRC_* input of the meter
+    :param channel: meter channel
+    :param timeout: maximum time to wait for the move in s
+    :return: (positions in mm, powers in W, times since the trigger in s) as NumPy arrays
+    """
+    reader = ArrayReader(meter, SEQUENCE_BLOCK * blocks)
+    start = stage.get_position()
+    velocity, acceleration = stage.get_velocity()
+
+    trigger.configure()
+    meter.confPowerMeasurementSequenceHWTrigger(c_uint16(trigger_source), c_uint32(interval), c_uint32(h_pos),
+                                                c_uint16(channel))
+    meter.startMeasurementSequence(c_uint32(0), byref(c_int16()))
+
+    trigger.pulse()
+    _wait_for_move(stage, stage.start_move(target), timeout)
+
+    timestamps, values, _ = reader.sequence(blocks)
+    times = (timestamps - timestamps[min(h_pos, len(timestamps) - 1)]) / 1000
+    positions = trapezoid_position(times, start, target, velocity, acceleration)
+    return positions, values.astype(float), times.astype(float)
+
+
+def triggered_capture(stage, meter, trigger, target, averaging=CAPTURE_AVERAGING, capacity=CAPTURE_CAPACITY,
+                      trigger_source=TLPM_TRIGGER_SRC_REAR, channel=TLPM_DEFAULT_CHANNEL, timeout=MOVE_TIMEOUT):
+    """
+    Records a power burst hardware-triggered at the start of a move and streamed while the stage moves.
+
+    Unlike `triggered_move`, the capture is not limited by the meter's sequence buffer: one burst spans the
+    whole move and is read in tuned chunks (`tlpmx_arrays.burst_blocks`) into a `BurstRing`, so memory
+    stays flat however long the move takes. Sample times follow from the burst averaging, and positions
+    from the trapezoidal velocity profile of the move.
+    :param stage: open `StageController`
+    :param meter: open `TLPMX` session of a meter with burst array mode (PM103, PM5020)
+    :param trigger: `TriggerOutput` wired to the trigger input selected by `trigger_source`
+    :param target: end of the move in mm
+    :param averaging: averaging of every sample in 10 µs
+    :param capacity: number of samples kept; longer captures keep the end of the move
+    :param trigger_source: TLPM_TRIGGER_SRC_* input of the meter
+    :param channel: meter channel
+    :param timeout: maximum time to wait for the move in s
+    :return: (positions in mm, powers in W, times since the trigger in s) as NumPy arrays
+    """
+    start = stage.get_position()
+    velocity, acceleration = stage.get_velocity()
+    sample_time = averaging * BURST_TICK
+    count = max(int(np.ceil(trapezoid_duration(target - start, velocity, acceleration) / sample_time)), 1)
+    reader = ArrayReader(meter)
+    ring = BurstRing(capacity)
+
+    trigger.configure()
+    meter.confBurstArrayMeasPowerChannel(c_uint16(channel))
+    meter.confBurstArrayMeasTrigger(c_uint32(trigger_source), c_uint32(0), c_uint32(count), c_uint32(averaging))
+    meter.startBurstArrayMeasurement()
+
+    trigger.pulse()
+    target_dev = stage.start_move(target)
+    for block in burst_blocks(reader, count, start=False, clock=_clock(stage.lib)):
+        ring.extend(*block)
+    _wait_for_move(stage, target_dev, timeout)
+
+    _, values, _ = ring.latest()
+    times = (np.arange(ring.total - len(ring), ring.total) + 0.5) * sample_time
+    positions = trapezoid_position(times, start, target, velocity, acceleration)
+    return positions, values.astype(float), times
+
+
+def main():
+    """
+    main():
+    ------
+
+    Records a knife-edge profile with a move-triggered burst capture and saves it to a text file.
+    Digital output 1 of the meter must be wired to its rear trigger input.
+    :return: None
+    """
+
+    start = 0  # Move start in mm (change this value as needed)
+    stop = 2  # Move end in mm (change this value as needed)
+    wavelength = 1064  # nm
+    save_path = "capture.txt"
+
+    meter = TLPMX()
+    device_count = c_uint32()
+    meter.findRsrc(byref(device_count))
+    if device_count.value == 0:
+        raise Exception('Could not find a power meter.')
+    resource_name = create_string_buffer(1024)
+    meter.getRsrcName(c_uint32(0), resource_name)
+    meter.open(resource_name, c_bool(True), c_bool(True))
+
+    try:
+        meter.setWavelength(c_double(wavelength), c_uint16(TLPM_DEFAULT_CHANNEL))
+        with StageController() as stage:
+            stage.move_to(start)
+            positions, powers, times = triggered_capture(stage, meter, TriggerOutput(meter), stop)
+    finally:
+        meter.close()
+
+    print(f'Recorded {len(powers)} samples between {start} and {stop} mm')
+    np.savetxt(save_path, np.column_stack((times, positions, powers)), fmt="%.6f\t%.5f\t%.5e",
+               header="Time (s)\tPosition (mm)\tPower (W)", comments="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,463 @@
+import os
+import sys
+import time
+from ctypes import *
+
+import numpy as np
+
+from units import ACCELERATION, DISTANCE, GBOX_RATIO, PITCH, STEPS_PER_REV, VELOCITY, UnitConverter
+
+KINESIS_PATH = r"C:\Program Files\Thorlabs\Kinesis"
+DCSERVO_DLL = "Thorlabs.MotionControl.TCube.DCServo.dll"
+
+# Message types and ids pushed to the device message queue (Thorlabs.MotionControl.TCube.DCServo.h)
+GENERIC_MOTOR = 2
+MOVE_HOMED = 0
+MOVE_COMPLETED = 1
+MOVE_STOPPED = 2
+
+# Status bits returned by CC_GetStatusBits
+STATUS_MOVING_FORWARD = 0x00000010
+STATUS_MOVING_REVERSE = 0x00000020
+STATUS_JOGGING_FORWARD = 0x00000040
+STATUS_JOGGING_REVERSE = 0x00000080
+STATUS_HOMING = 0x00000200
+STATUS_MOVING = (STATUS_MOVING_FORWARD | STATUS_MOVING_REVERSE |
+                 STATUS_JOGGING_FORWARD | STATUS_JOGGING_REVERSE | STATUS_HOMING)
+
+MOVE_TIMEOUT = 30.0  # s, longer than a full 25 mm travel of the MTS25-Z8
+MOVE_POLL_INTERVAL = 0.01  # s
+MOVE_TOLERANCE = 5  # device units, used when falling back to the status bits
+
+DEFAULT_SERIAL = "83859973"  # Update to your device's serial number
+TCUBE_DCSERVO_TYPE = 83  # serial number prefix of TCube DC servo controllers
+POLLING_INTERVAL = 200  # ms
+MIN_POLLING_INTERVAL = 10  # ms
+MAX_POLLING_INTERVAL = 1000  # ms
+REQUEST_LATENCY = 0.02  # s, time for the controller to answer CC_RequestPosition
+
+_libraries = {}
+
+
+def load_library(simulate=False):
+    """
+    Loads the Kinesis TCube DCServo library once per process.
+
+    :param simulate: return a `kinesis_sim.SimulatedDCServo` instead of the real DLL, or a configured
+        simulator instance to use as it is
+    :return: the library handle exposing the `CC_*` calls
+    """
+    if simulate is not True and simulate is not False:
+        return simulate
+    if simulate not in _libraries:
+        if simulate:
+            from kinesis_sim import SimulatedDCServo
+            _libraries[simulate] = SimulatedDCServo()
+        else:
+            if sys.version_info < (3, 8):
+                os.chdir(KINESIS_PATH)
+            else:
+                os.add_dll_directory(KINESIS_PATH)
+            _libraries[simulate] = cdll.LoadLibrary(DCSERVO_DLL)
+
+    return _libraries[simulate]
+
+
+def discover_devices(simulate=False):
+    """
+    Lists the serial numbers of all attached TCube DC servo controllers.
+
+    :param simulate: list the devices of the simulated library
+    :return: list of serial numbers (str)
+    """
+    lib = load_library(simulate)
+    if lib.TLI_BuildDeviceList() != 0:
+        raise RuntimeError("Device initialization failed.")
+
+    buffer_size = 16 * max(lib.TLI_GetDeviceListSize(), 1)
+    serials = create_string_buffer(buffer_size)
+    lib.TLI_GetDeviceListByTypeExt(serials, c_ulong(buffer_size), c_int(TCUBE_DCSERVO_TYPE))
+    return [serial for serial in serials.value.decode().split(",") if serial]
+
+
+def _clock(lib):
+    """
+    Returns the (monotonic, sleep) functions to time calls to `lib` with.
+
+    A simulated library running in accelerated time provides its own, the real DLL uses the wall clock.
+    """
+    return getattr(lib, "monotonic", time.monotonic), getattr(lib, "sleep", time.sleep)
+
+
+def is_move_complete(lib, serial_num, target_dev=None):
+    """
+    Checks without blocking whether the controller reports that the current move has finished.
+
+    The device message queue is drained for a "moved" or "stopped" message. If `target_dev` is given
+    the polled status bits and position are used as a fallback in case the message was missed.
+    :param lib: Kinesis library handle
+    :param serial_num: device serial number (c_char_p)
+    :param target_dev: target position in device units, or None to rely on the message queue only
+    :return: True if the move has finished
+    """
+    message_type = c_ushort()
+    message_id = c_ushort()
+    message_data = c_ulong()
+
+    while lib.CC_MessageQueueSize(serial_num) > 0:
+        lib.CC_GetNextMessage(serial_num, byref(message_type), byref(message_id), byref(message_data))
+        if message_type.value == GENERIC_MOTOR and message_id.value in (MOVE_COMPLETED, MOVE_STOPPED):
+            return True
+
+    if target_dev is not None and not lib.CC_GetStatusBits(serial_num) & STATUS_MOVING:
+        return abs(lib.CC_GetPosition(serial_num) - target_dev) <= MOVE_TOLERANCE
+
+    return False
+
+
+def wait_for_move(lib, serial_num, target_dev=None, timeout=MOVE_TIMEOUT, poll_interval=MOVE_POLL_INTERVAL):
+    """
+    Blocks until the controller reports that the current move has finished (see `is_move_complete`).
+
+    :param lib: Kinesis library handle
+    :param serial_num: device serial number (c_char_p)
+    :param target_dev: target position in device units, or None to rely on the message queue only
+    :param timeout: maximum time to wait in s
+    :param poll_interval: time between checks of the message queue in s
+    :return: None
+    """
+    monotonic, sleep = _clock(lib)
+    deadline = monotonic() + timeout
+
+    while not is_move_complete(lib, serial_num, target_dev):
+        if monotonic() > deadline:
+            raise TimeoutError(f"Move did not complete within {timeout} s.")
+        sleep(poll_interval)
+
+
+def start_move(lib, serial_num, target_dev):
+    """
+    Starts an absolute move without waiting for it to complete.
+
+    :param lib: Kinesis library handle
+    :param serial_num: device serial number (c_char_p)
+    :param target_dev: target position in device units (c_int)
+    :return: None
+    """
+    lib.CC_ClearMessageQueue(serial_num)
+    lib.CC_SetMoveAbsolutePosition(serial_num, target_dev)
+    lib.CC_MoveAbsolute(serial_num)
+
+
+def move_absolute(lib, serial_num, target_dev, timeout=MOVE_TIMEOUT):
+    """
+    Moves the stage to an absolute position and waits for the move to complete.
+
+    :param lib: Kinesis library handle
+    :param serial_num: device serial number (c_char_p)
+    :param target_dev: target position in device units (c_int)
+    :param timeout: maximum time to wait for the move in s
+    :return: None
+    """
+    start_move(lib, serial_num, target_dev)
+    wait_for_move(lib, serial_num, getattr(target_dev, "value", target_dev), timeout)
+
+
+def _trapezoid(distance, velocity, acceleration):
+    """
+    Returns (ramp time, peak velocity, cruise time) of a trapezoidal-velocity move over `distance`.
+    """
+    # Triangular profile if the stage cannot reach `velocity` within half the distance
+    t_ramp = min(velocity / acceleration, (distance / acceleration) ** 0.5)
+    v_peak = acceleration * t_ramp
+    t_cruise = (distance - v_peak * t_ramp) / v_peak if v_peak > 0 else 0.0
+    return t_ramp, v_peak, t_cruise
+
+
+def trapezoid_duration(distance, velocity, acceleration):
+    """
+    Duration in s of a trapezoidal-velocity move over `distance` mm.
+    """
+    t_ramp, _, t_cruise = _trapezoid(abs(distance), velocity, acceleration)
+    return 2 * t_ramp + t_cruise
+
+
+def trapezoid_position(t, start, stop, velocity, acceleration):
+    """
+    Position of a trapezoidal-velocity move from `start` to `stop` at time `t` after the move began.
+
+    :param t: time(s) in s, scalar or NumPy array
+    :return: position(s) in mm
+    """
+    t = np.asarray(t, dtype=float)
+    direction = 1.0 if stop >= start else -1.0
+    t_ramp, v_peak, t_cruise = _trapezoid(abs(stop - start), velocity, acceleration)
+    d_ramp = 0.5 * acceleration * t_ramp ** 2
+
+    t = np.clip(t, 0.0, 2 * t_ramp + t_cruise)
+    t_decel = np.clip(t - t_ramp - t_cruise, 0.0, t_ramp)
+    travelled = np.where(
+        t < t_ramp,
+        0.5 * acceleration * t ** 2,
+        d_ramp + v_peak * np.clip(t - t_ramp, 0.0, t_cruise) + v_peak * t_decel - 0.5 * acceleration * t_decel ** 2)
+    return start + direction * travelled
+
+
+def polling_interval_for(velocity, resolution):
+    """
+    Returns a polling interval at which the polled position lags by at most `resolution` at `velocity`.
+
+    :param velocity: stage velocity in mm/s
+    :param resolution: acceptable position lag in mm
+    :return: polling interval in ms, clamped to the range supported by the controller
+    """
+    interval = 1000 * resolution / velocity if velocity > 0 else MAX_POLLING_INTERVAL
+    return int(min(max(interval, MIN_POLLING_INTERVAL), MAX_POLLING_INTERVAL))
+
+
+class PositionReader:
+    """
+    Reads the stage position from the controller's polling cache.
+
+    With polling running, CC_GetPosition returns a value at most one polling interval old. Once the stage
+    has been at rest for a full polling interval the cached value is exact and is returned directly; a
+    position request is only forced right after a move, or when a fresher value than the polling interval
+    is asked for while moving.
+    """
+
+    def __init__(self, lib, serial_num, polling_interval=POLLING_INTERVAL, request_latency=REQUEST_LATENCY):
+        self.lib = lib
+        self.serial_num = serial_num
+        self.polling_interval = polling_interval
+        self.request_latency = request_latency
+        self.monotonic, self.sleep = _clock(lib)
+        self.settled_at = self.monotonic()
+
+    def start_polling(self, polling_interval=None):
+        """
+        Starts (or restarts) the controller's status polling.
+
+        :param polling_interval: interval in ms, by default the current one
+        :return: None
+        """
+        if polling_interval is not None:
+            self.polling_interval = polling_interval
+        self.lib.CC_StopPolling(self.serial_num)
+        self.lib.CC_StartPolling(self.serial_num, c_int(self.polling_interval))
+        self.settled_at = self.monotonic() if self.settled_at is not None else None
+
+    def moving(self):
+        """
+        Marks the stage as moving. Called when a move is started.
+        """
+        self.settled_at = None
+
+    def settled(self):
+        """
+        Marks the stage as at rest. Called when a move has completed.
+        """
+        self.settled_at = self.monotonic()
+
+    def read(self, max_age=None):
+        """
+        Returns the current position in device units.
+
+        :param max_age: oldest acceptable value in s while moving, by default one polling interval
+        :return: position in device units
+        """
+        interval = self.polling_interval / 1000
+        if self.settled_at is None:
+            if max_age is None or max_age >= interval:
+                return self.lib.CC_GetPosition(self.serial_num)
+            remaining = interval
+        else:
+            remaining = interval - (self.monotonic() - self.settled_at)
+            if remaining <= 0:
+                return self.lib.CC_GetPosition(self.serial_num)
+
+        # No poll is known to have happened since the stage came to rest: ask for the position explicitly,
+        # but never wait longer than it takes for the next poll to arrive anyway
+        self.lib.CC_RequestPosition(self.serial_num)
+        self.sleep(min(self.request_latency, remaining))
+        return self.lib.CC_GetPosition(self.serial_num)
+
+
+class StageController:
+    """
+    Long-lived session with one TCube DC servo.
+
+    The device is opened, polled and configured with its motor parameters once and stays open until
+    `close` is called, so scans can reuse it without reconnecting. Usable as a context manager.
+    Unit conversions are done by a `UnitConverter` and are available before the device is opened.
+    With a `position_resolution`, the polling interval follows the move velocity (`polling_interval_for`):
+    it is chosen when the device is opened and whenever `set_velocity` changes the velocity.
+    """
+
+    def __init__(self, serial=DEFAULT_SERIAL, steps_per_rev=STEPS_PER_REV, gbox_ratio=GBOX_RATIO, pitch=PITCH,
+                 polling_interval=POLLING_INTERVAL, simulate=False, position_resolution=None):
+        self.serial_num = c_char_p(serial.encode())
+        self.steps_per_rev = steps_per_rev
+        self.gbox_ratio = gbox_ratio
+        self.pitch = pitch
+        self.units = UnitConverter(steps_per_rev, gbox_ratio, pitch)
+        self.polling_interval = polling_interval
+        self.position_resolution = position_resolution
+        self.simulate = simulate
+        self.lib = None
+        self.positions = None
+        self.is_open = False
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def open(self):
+        """
+        Opens the device, starts polling and applies the motor parameters. Does nothing if already open.
+
+        :return: None
+        """
+        if self.is_open:
+            return
+
+        self.lib = load_library(self.simulate)
+        if self.lib.TLI_BuildDeviceList() != 0:
+            raise RuntimeError("Device initialization failed.")
+
+        error = self.lib.CC_Open(self.serial_num)
+        if error != 0:
+            raise RuntimeError(f"Could not open device {self.serial_num.value.decode()} (error {error}).")
+        try:
+            if self.position_resolution is not None:
+                self.polling_interval = polling_interval_for(self.get_velocity()[0], self.position_resolution)
+            self.positions = PositionReader(self.lib, self.serial_num, self.polling_interval)
+            self.positions.start_polling()
+
+            # Set up the device to convert real units to device units
+            self.lib.CC_SetMotorParamsExt(self.serial_num, c_double(self.steps_per_rev), c_double(self.gbox_ratio),
+                                          c_double(self.pitch))
+            self.units.verify(self.lib, self.serial_num)
+        except Exception:
+            # Don't leave the device open while `is_open` says otherwise
+            self.lib.CC_StopPolling(self.serial_num)
+            self.lib.CC_Close(self.serial_num)
+            raise
+        self.is_open = True
+
+    def close(self):
+        """
+        Stops polling and closes the device. Does nothing if not open.
+
+        :return: None
+        """
+        if not self.is_open:
+            return
+
+        self.lib.CC_StopPolling(self.serial_num)
+        self.lib.CC_Close(self.serial_num)
+        self.is_open = False
+
+    def to_device(self, real_value, unit_type=DISTANCE):
+        """
+        Converts a position (mm), velocity (mm/s) or acceleration (mm/s^2), or an array of them, to device units.
+        """
+        return self.units.to_device(real_value, unit_type)
+
+    def to_real(self, dev_value, unit_type=DISTANCE):
+        """
+        Converts a position, velocity or acceleration in device units, or an array of them, to mm, mm/s or mm/s^2.
+        """
+        return self.units.to_real(dev_value, unit_type)
+
+    def get_velocity(self):
+        """
+        Reads the velocity parameters used for absolute moves.
+
+        :return: (max velocity in mm/s, acceleration in mm/s^2)
+        """
+        acceleration = c_int()
+        max_velocity = c_int()
+        self.lib.CC_GetVelParams(self.serial_num, byref(acceleration), byref(max_velocity))
+        return self.to_real(max_velocity.value, VELOCITY), self.to_real(acceleration.value, ACCELERATION)
+
+    def set_velocity(self, max_velocity, acceleration):
+        """
+        Sets the velocity parameters used for absolute moves, and retunes the polling interval to the new
+        velocity if the controller has a `position_resolution`.
+
+        :param max_velocity: velocity in mm/s
+        :param acceleration: acceleration in mm/s^2
+        :return: None
+        """
+        self.lib.CC_SetVelParams(self.serial_num, c_int(self.to_device(acceleration, ACCELERATION)),
+                                 c_int(self.to_device(max_velocity, VELOCITY)))
+        if self.position_resolution is not None:
+            polling_interval = polling_interval_for(max_velocity, self.position_resolution)
+            if polling_interval != self.polling_interval:
+                self.set_polling_interval(polling_interval)
+
+    def set_polling_interval(self, polling_interval):
+        """
+        Restarts the controller's status polling with a new interval (see `polling_interval_for`).
+
+        :param polling_interval: interval in ms
+        :return: None
+        """
+        self.positions.start_polling(polling_interval)
+        self.polling_interval = polling_interval
+
+    def polled_position(self):
+        """
+        Returns the position last polled by the controller without requesting a new one.
+
+        :return: position in mm
+        """
+        return self.to_real(self.polled_device_position())
+
+    def polled_device_position(self):
+        """
+        Returns the position last polled by the controller in device units.
+        """
+        return self.lib.CC_GetPosition(self.serial_num)
+
+    def get_position(self, max_age=None):
+        """
+        Reads back the current position, from the polling cache when it is fresh enough (see `PositionReader`).
+
+        :param max_age: oldest acceptable value in s while moving, by default one polling interval
+        :return: position in mm
+        """
+        return self.to_real(self.positions.read(max_age))
+
+    def move_to(self, real_pos, timeout=MOVE_TIMEOUT):
+        """
+        Moves to an absolute position in mm and waits for the move to complete.
+
+        :return: None
+        """
+        self.positions.moving()
+        move_absolute(self.lib, self.serial_num, c_int(self.to_device(real_pos)), timeout)
+        self.positions.settled()
+
+    def start_move(self, real_pos):
+        """
+        Starts a move to an absolute position in mm without waiting for it to complete.
+
+        :return: target position in device units, to be passed to `is_move_complete`
+        """
+        target_dev = self.to_device(real_pos)
+        self.positions.moving()
+        start_move(self.lib, self.serial_num, c_int(target_dev))
+        return target_dev
+
+    def is_move_complete(self, target_dev=None):
+        """
+        Checks without blocking whether the move started with `start_move` has finished.
+        """
+        if is_move_complete(self.lib, self.serial_num, target_dev):
+            self.positions.settled()
+            return True
+        return False
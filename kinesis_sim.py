@@ -0,0 +1,280 @@
+import math
+import random
+import threading
+import time
+from collections import deque
+
+from kinesis import (DEFAULT_SERIAL, GENERIC_MOTOR, MOVE_COMPLETED, POLLING_INTERVAL, STATUS_MOVING_FORWARD,
+                     STATUS_MOVING_REVERSE, trapezoid_duration, trapezoid_position)
+from units import ACCELERATION, DISTANCE, VELOCITY, UnitConverter
+
+SIMULATED_SERIALS = (DEFAULT_SERIAL, "83859974")  # e.g. an X and a Y stage
+MAX_VELOCITY = 2.3  # mm/s, MTS25-Z8
+MAX_ACCELERATION = 1.5  # mm/s^2
+SETTLE_TIME = 0.05  # s, servo settling after the profile has finished
+OVERSHOOT = 0.0005  # mm, position error at the end of the profile, decaying during settling
+ENCODER_NOISE = 1.0  # device units (standard deviation)
+REQUEST_LATENCY = 0.005  # s, time until a CC_RequestPosition reply updates the polled position
+
+
+def _value(arg):
+    """
+    Returns the Python value of a ctypes argument, passed either directly or through `byref`.
+    """
+    arg = getattr(arg, "_obj", arg)
+    return getattr(arg, "value", arg)
+
+
+def _set(ref, value):
+    """
+    Writes `value` into the ctypes object behind a `byref` argument.
+    """
+    getattr(ref, "_obj", ref).value = value
+
+
+class SimulatedClock:
+    """
+    Simulated time running `time_scale` times faster than the wall clock.
+    """
+
+    def __init__(self, time_scale=1.0):
+        self.time_scale = time_scale
+        self.origin = time.monotonic()
+
+    def now(self):
+        return (time.monotonic() - self.origin) * self.time_scale
+
+    def sleep(self, seconds):
+        time.sleep(seconds / self.time_scale)
+
+
+class _Axis:
+    """
+    State and kinematic model of one simulated DC servo.
+
+    Moves follow a trapezoidal velocity profile limited by the velocity parameters, followed by an
+    exponentially decaying overshoot while the servo settles. Reported positions carry encoder noise and,
+    like the real controller, are only refreshed at every poll or after a position request.
+    """
+
+    def __init__(self, simulator):
+        self.simulator = simulator
+        self.units = UnitConverter()
+        self.velocity = MAX_VELOCITY
+        self.acceleration = MAX_ACCELERATION
+        self.start_pos = 0.0  # mm
+        self.target_pos = 0.0  # mm
+        self.pending_pos = 0  # device units
+        self.move_start = -math.inf
+        self.profile_time = 0.0
+        self.moving = False
+        self.polling_interval = None  # s, None while polling is stopped
+        self.polled_at = 0.0
+        self.polled_pos = 0
+        self.requested_at = None
+        self.messages = deque()
+
+    def scale(self, unit_type):
+        """
+        Returns the number of device units per real unit for the given unit type.
+        """
+        return self.units.scales[unit_type]
+
+    def update(self, now):
+        if self.moving and now >= self.move_start + self.profile_time + self.simulator.settle_time:
+            self.moving = False
+            self.messages.append((GENERIC_MOTOR, MOVE_COMPLETED, self.units.to_device(self.target_pos)))
+
+    def true_position(self, now):
+        """
+        Returns the load position in mm at simulated time `now`.
+        """
+        t = now - self.move_start
+        if t < self.profile_time:
+            return float(trapezoid_position(t, self.start_pos, self.target_pos, self.velocity, self.acceleration))
+
+        direction = 1.0 if self.target_pos >= self.start_pos else -1.0
+        tau = self.simulator.settle_time / 5 or 1.0
+        return self.target_pos + direction * self.simulator.overshoot * math.exp(-(t - self.profile_time) / tau)
+
+    def read_encoder(self, now):
+        noise = self.simulator.rng.gauss(0.0, self.simulator.encoder_noise) if self.simulator.encoder_noise else 0.0
+        return round(self.true_position(now) * self.scale(DISTANCE) + noise)
+
+    def polled_position(self, now):
+        """
+        Returns the position held by the controller's polling cache, in device units.
+        """
+        if self.polling_interval:
+            last_poll = math.floor(now / self.polling_interval) * self.polling_interval
+            if last_poll > self.polled_at:
+                self.polled_at = last_poll
+                self.polled_pos = self.read_encoder(last_poll)
+        if self.requested_at is not None and now >= self.requested_at + self.simulator.request_latency:
+            self.polled_at = self.requested_at + self.simulator.request_latency
+            self.polled_pos = self.read_encoder(self.polled_at)
+            self.requested_at = None
+        return self.polled_pos
+
+    def move(self, now):
+        self.start_pos = self.true_position(now)
+        self.target_pos = self.units.to_real(self.pending_pos)
+        self.move_start = now
+        self.profile_time = trapezoid_duration(self.target_pos - self.start_pos, self.velocity, self.acceleration)
+        self.moving = True
+        self.update(now)
+
+
+class SimulatedDCServo:
+    """
+    Stand-in for the Kinesis TCube DCServo library implementing the `CC_*` calls used by the scripts.
+
+    Every axis follows a kinematic model with velocity and acceleration limits, settle time and encoder
+    noise, and pushes a "moved" message to its message queue when a move has settled. Simulated time can
+    run faster than the wall clock (`time_scale`) so that scan throughput can be measured in seconds.
+    """
+
+    def __init__(self, serials=SIMULATED_SERIALS, time_scale=1.0, settle_time=SETTLE_TIME, overshoot=OVERSHOOT,
+                 encoder_noise=ENCODER_NOISE, request_latency=REQUEST_LATENCY, seed=None):
+        """
+        :param serials: serial numbers (str) of the simulated devices
+        :param time_scale: speed of simulated time relative to the wall clock
+        :param settle_time: settling time after each move in s
+        :param overshoot: position error at the end of the profile in mm
+        :param encoder_noise: standard deviation of the encoder noise in device units
+        :param request_latency: delay of the reply to CC_RequestPosition in s
+        :param seed: seed of the encoder noise, for reproducible runs
+        """
+        self.clock = SimulatedClock(time_scale)
+        self.settle_time = settle_time
+        self.overshoot = overshoot
+        self.encoder_noise = encoder_noise
+        self.request_latency = request_latency
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.axes = {serial.encode(): _Axis(self) for serial in serials}
+
+    def monotonic(self):
+        """
+        Returns the simulated time in s. Used by `kinesis` to time waits on this library.
+        """
+        return self.clock.now()
+
+    def sleep(self, seconds):
+        """
+        Sleeps for `seconds` of simulated time.
+        """
+        self.clock.sleep(seconds)
+
+    def position(self, serial=DEFAULT_SERIAL, t=None):
+        """
+        Returns the true load position of an axis, without encoder noise or polling delay.
+
+        :param serial: serial number (str) of the device
+        :param t: simulated time in s, by default now
+        :return: position in mm
+        """
+        axis = self.axes[serial.encode()]
+        return axis.true_position(self.clock.now() if t is None else t)
+
+    def _axis(self, serial_num):
+        axis = self.axes[_value(serial_num)]
+        axis.update(self.clock.now())
+        return axis
+
+    def TLI_BuildDeviceList(self):
+        return 0
+
+    def TLI_GetDeviceListSize(self):
+        return len(self.axes)
+
+    def TLI_GetDeviceListByTypeExt(self, receive_buffer, buffer_size, type_id):
+        serials = b",".join(serial for serial in self.axes if serial.startswith(str(_value(type_id)).encode()))
+        if len(serials) >= _value(buffer_size):
+            return 1
+        _set(receive_buffer, serials)
+        return 0
+
+    def TLI_InitializeSimulations(self):
+        pass
+
+    def TLI_UninitializeSimulations(self):
+        pass
+
+    def CC_Open(self, serial_num):
+        return 0 if _value(serial_num) in self.axes else 2
+
+    def CC_Close(self, serial_num):
+        pass
+
+    def CC_StartPolling(self, serial_num, milliseconds):
+        self._axis(serial_num).polling_interval = (_value(milliseconds) or POLLING_INTERVAL) / 1000
+        return True
+
+    def CC_StopPolling(self, serial_num):
+        self._axis(serial_num).polling_interval = None
+
+    def CC_SetMotorParamsExt(self, serial_num, steps_per_rev, gbox_ratio, pitch):
+        self._axis(serial_num).units = UnitConverter(_value(steps_per_rev), _value(gbox_ratio), _value(pitch))
+        return 0
+
+    def CC_GetDeviceUnitFromRealValue(self, serial_num, real_unit, device_unit, unit_type):
+        _set(device_unit, round(_value(real_unit) * self._axis(serial_num).scale(_value(unit_type))))
+        return 0
+
+    def CC_GetRealValueFromDeviceUnit(self, serial_num, device_unit, real_unit, unit_type):
+        _set(real_unit, _value(device_unit) / self._axis(serial_num).scale(_value(unit_type)))
+        return 0
+
+    def CC_GetVelParams(self, serial_num, acceleration, max_velocity):
+        axis = self._axis(serial_num)
+        _set(acceleration, round(axis.acceleration * axis.scale(ACCELERATION)))
+        _set(max_velocity, round(axis.velocity * axis.scale(VELOCITY)))
+        return 0
+
+    def CC_SetVelParams(self, serial_num, acceleration, max_velocity):
+        axis = self._axis(serial_num)
+        axis.acceleration = min(_value(acceleration) / axis.scale(ACCELERATION), MAX_ACCELERATION)
+        axis.velocity = min(_value(max_velocity) / axis.scale(VELOCITY), MAX_VELOCITY)
+        return 0
+
+    def CC_RequestPosition(self, serial_num):
+        with self.lock:
+            self._axis(serial_num).requested_at = self.clock.now()
+        return 0
+
+    def CC_GetPosition(self, serial_num):
+        with self.lock:
+            return self._axis(serial_num).polled_position(self.clock.now())
+
+    def CC_RequestStatusBits(self, serial_num):
+        return 0
+
+    def CC_GetStatusBits(self, serial_num):
+        axis = self._axis(serial_num)
+        if not axis.moving:
+            return 0
+        return STATUS_MOVING_FORWARD if axis.target_pos > axis.start_pos else STATUS_MOVING_REVERSE
+
+    def CC_SetMoveAbsolutePosition(self, serial_num, position):
+        self._axis(serial_num).pending_pos = _value(position)
+        return 0
+
+    def CC_MoveAbsolute(self, serial_num):
+        with self.lock:
+            self._axis(serial_num).move(self.clock.now())
+        return 0
+
+    def CC_MessageQueueSize(self, serial_num):
+        return len(self._axis(serial_num).messages)
+
+    def CC_ClearMessageQueue(self, serial_num):
+        self._axis(serial_num).messages.clear()
+
+    def CC_GetNextMessage(self, serial_num, message_type, message_id, message_data):
+        axis = self._axis(serial_num)
+        if not axis.messages:
+            return False
+        for ref, value in zip((message_type, message_id, message_data), axis.messages.popleft()):
+            _set(ref, value)
+        return True
@@ -0,0 +1,131 @@
+import os
+import re
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SOURCE = os.path.join(HERE, "TLPMX.py")
+TARGET = os.path.join(HERE, "tlpmx_bindings.py")
+
+_METHOD = re.compile(r'\n\tdef (\w+)\(self,? ?([^)]*)\):\n\t\t"""(.*?)"""(.*?)(?=\n\tdef |\Z)', re.S)
+_CALL = re.compile(r'self\.dll\.(TLPMX_\w+)\(((?:[^()]|\([^()]*\))*)\)')
+_ARG = re.compile(r'^\t\t\t(\w+) ?\(\s*(.+?)\s*\)?\s*(?::.*)?$', re.M)
+_SCALAR = re.compile(r'^(c_\w+)( use with byref)?$')
+_ARRAY = re.compile(r'^\(?(c_\w+) \* \w+')
+# Argument types checked by hand against TLPMX.h where the docstrings get them wrong
+OVERRIDES = {
+    "TLPMX_init": ["c_char_p", "ViBoolean", "ViBoolean", "POINTER(ViSession)"],  # documented as c_bool (8 bit)
+}
+
+HEADER = '''"""
+ctypes signatures of the TLPMX driver functions.
+
+Generated from the docstrings of TLPMX.py, with hand-checked corrections, by make_tlpmx_bindings.py, do not
+edit.
+"""
+from ctypes import *
+
+ViSession = c_long  # TLPMX keeps the session in a c_long
+ViStatus = c_int
+ViBoolean = c_uint16  # 16 bit in VISA; the docstrings mostly give c_int16, which has the same width
+
+'''
+
+FOOTER = '''
+
+def bind(dll):
+    """
+    Declares argtypes and restype of the TLPMX functions in `dll`.
+
+    ctypes keeps the function pointers as attributes of the library, so `dll.TLPMX_xxx` returns the bound
+    pointer from then on and arguments are checked and converted by the declared types. Functions the
+    library does not export (older driver versions) are skipped.
+
+    :param dll: loaded TLPMX library
+    :return: dict of the bound function pointers by name
+    """
+    functions = {}
+    for name, argtypes in SIGNATURES.items():
+        try:
+            function = getattr(dll, name)
+        except AttributeError:
+            continue
+        function.argtypes = argtypes
+        function.restype = ViStatus
+        functions[name] = function
+    return functions
+'''
+
+
+def _ctype(declared):
+    """
+    Returns the ctypes expression for a type from a TLPMX docstring, or None if it is not understood.
+    """
+    declared = declared.strip()
+    if declared.startswith("create_string_buffer") or declared == "c_char_p":
+        return "c_char_p"
+    match = _SCALAR.match(declared)
+    if match:
+        return f"POINTER({match.group(1)})" if match.group(2) else match.group(1)
+    match = _ARRAY.match(declared)
+    if match:
+        return f"POINTER({match.group(1)})"
+    if declared == "ViPSession use with byref":
+        return "POINTER(ViSession)"
+    return None
+
+
+def signatures(source=SOURCE):
+    """
+    Derives the argument types of the driver functions called by the `TLPMX` methods.
+
+    A function is left out if the type of one of its arguments cannot be read from the docstring. Functions
+    in `OVERRIDES` take the types given there instead.
+    :param source: path of TLPMX.py
+    :return: (dict of argtypes expressions by function name, list of functions left out)
+    """
+    with open(source) as source_file:
+        text = source_file.read()
+
+    found = {}
+    skipped = []
+    for method, params, doc, body in _METHOD.findall(text):
+        declared = {name: _ctype(declared) for name, declared in _ARG.findall(doc)}
+        for function, args in _CALL.findall(body):
+            if function in OVERRIDES:
+                found[function] = OVERRIDES[function]
+                continue
+            types = []
+            for arg in (arg.strip() for arg in args.split(",") if arg.strip()):
+                if arg == "self.devSession":
+                    types.append("ViSession")
+                elif arg == "byref(self.devSession)":
+                    types.append("POINTER(ViSession)")
+                else:
+                    types.append(declared.get(arg))
+            if None in types:
+                skipped.append(function)
+            elif function not in found:
+                found[function] = types
+    return found, skipped
+
+
+def main():
+    """
+    main():
+    ------
+
+    Writes tlpmx_bindings.py from TLPMX.py.
+    :return: None
+    """
+    found, skipped = signatures()
+    with open(TARGET, "w") as target:
+        target.write(HEADER)
+        target.write("SIGNATURES = {\n")
+        for function in sorted(found):
+            target.write(f'    "{function}": ({", ".join(found[function])},),\n')
+        target.write("}\n")
+        target.write(FOOTER)
+    print(f'{len(found)} functions bound, left out: {", ".join(sorted(skipped)) or "none"}')
+
+
+if __name__ == "__main__":
+    main()
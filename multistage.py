@@ -0,0 +1,109 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from kinesis import StageController, discover_devices
+from scan import FORWARD, scan
+
+
+class StageGroup:
+    """
+    Several TCube DC servos driven concurrently, each by its own worker thread.
+
+    Every device gets a single-thread executor, so all calls for one device run in order on its worker
+    while different devices move and measure at the same time. Usable as a context manager.
+    """
+
+    def __init__(self, serials=None, simulate=False, **stage_options):
+        """
+        :param serials: serial numbers (str) of the devices to use, by default all attached ones
+        :param simulate: use the simulated library
+        :param stage_options: further keyword arguments for every `StageController`
+        """
+        if serials is None:
+            serials = discover_devices(simulate)
+        if not serials:
+            raise RuntimeError("No TCube DC servo found.")
+
+        self.stages = {serial: StageController(serial, simulate=simulate, **stage_options) for serial in serials}
+        self.workers = {serial: ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"stage-{serial}")
+                        for serial in serials}
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def submit(self, serial, function, *args, **kwargs):
+        """
+        Runs `function(stage, *args, **kwargs)` on the worker of one device.
+
+        :return: Future of the result
+        """
+        return self.workers[serial].submit(function, self.stages[serial], *args, **kwargs)
+
+    def run(self, function, *args, **kwargs):
+        """
+        Runs `function(stage, *args, **kwargs)` on every device concurrently and waits for all of them.
+
+        :return: dict of serial number to result
+        """
+        futures = {serial: self.submit(serial, function, *args, **kwargs) for serial in self.stages}
+        return {serial: future.result() for serial, future in futures.items()}
+
+    def open(self):
+        self.run(StageController.open)
+
+    def close(self):
+        try:
+            self.run(StageController.close)
+        finally:
+            for worker in self.workers.values():
+                worker.shutdown()
+
+    def move_to(self, positions):
+        """
+        Moves several devices at once and waits until all moves are complete.
+
+        :param positions: dict of serial number to target position in mm
+        :return: None
+        """
+        futures = [self.submit(serial, StageController.move_to, position) for serial, position in positions.items()]
+        for future in futures:
+            future.result()
+
+    def get_positions(self):
+        """
+        Returns a dict of serial number to current position in mm.
+        """
+        return self.run(StageController.get_position)
+
+
+def _scan_points(stage, start, stop, n_steps, mode, passes, backlash, measure):
+    return list(scan(stage, start, stop, n_steps, mode, passes, backlash, measure))
+
+
+def main():
+    """
+    main():
+    ------
+
+    Scans every attached stage over the same range at the same time, e.g. the X and Y knife edges.
+    :return: None
+    """
+
+    start = 0  # Scan start in mm (change this value as needed)
+    stop = 2  # Scan end in mm (change this value as needed)
+    n_steps = 10  # Number of steps (change this value as needed)
+
+    # Pass simulate=True to run without hardware
+    with StageGroup() as stages:
+        results = stages.run(_scan_points, start, stop, n_steps, FORWARD, 1, 0.0, None)
+
+    for serial, points in results.items():
+        for _, step, next_target_real, updated_real_pos, _ in points:
+            print(f'{serial} step {step}: moved to {next_target_real} mm, position {updated_real_pos} mm')
+
+
+if __name__ == "__main__":
+    main()
@@ -1,85 +1,38 @@
-import time
-import os
-import sys
-from ctypes import *
 import tkinter as tk
 from tkinter import messagebox
+from kinesis import StageController
+from scan import BACKWARD, FORWARD, SERPENTINE, scan
 
 # Function to move the stage
-def move_stage(serial_num, target_pos_real, n_steps, direction):
+def move_stage(stage, target_pos_real, n_steps, direction, passes=1, backlash=0.0):
     """
     Moves the stage in `n` steps from the current position to a target position `x` in mm.
+    Serpentine scans go back and forth between the two for `passes` passes.
     :return: None
     """
-    lib: CDLL = cdll.LoadLibrary("Thorlabs.MotionControl.TCube.DCServo.dll")
-
-    # Set constants
-    STEPS_PER_REV = c_double(512)  # for the MTS25-Z8
-    gbox_ratio = c_double(67.49)  # gearbox ratio
-    pitch = c_double(1.0)
-
-    # Apply these values to the device
-    lib.CC_SetMotorParamsExt(serial_num, STEPS_PER_REV, gbox_ratio, pitch)
-
-    # Get the device's current position in dev units
-    lib.CC_RequestPosition(serial_num)
-    time.sleep(0.2)
-    current_dev_pos = c_int(lib.CC_GetPosition(serial_num))
-
-    # Convert current device position to real units (mm)
-    current_real_pos = c_double()
-    lib.CC_GetRealValueFromDeviceUnit(serial_num, current_dev_pos, byref(current_real_pos), 0)
-    print(f'Current position: {current_real_pos.value} mm')
-
-    # Calculate the step size in real units (mm)
-    step_size_real = (target_pos_real.value - current_real_pos.value) / n_steps
-    if direction == "backward":
-        step_size_real = -abs(step_size_real)  # Ensure step size is negative for backward movement
+    # Get the device's current position in real units (mm)
+    current_real_pos = stage.get_position()
+    print(f'Current position: {current_real_pos} mm')
+
+    # Scan the distance to the target in the selected direction
+    distance = abs(target_pos_real - current_real_pos)
+    if direction == BACKWARD:
+        start, stop = current_real_pos - distance, current_real_pos
     else:
-        step_size_real = abs(step_size_real)   # Ensure step size is positive for forward movement
+        start, stop = current_real_pos, current_real_pos + distance
 
-    # Move the stage in `n` steps
-    for step in range(1, n_steps + 1):
-        # Calculate the next target position in real units
-        if direction == "backward":
-            next_target_real = c_double(current_real_pos.value - step * abs(step_size_real))  # Moving backward
-        else:
-            next_target_real = c_double(current_real_pos.value + step * abs(step_size_real))  # Moving forward
-
-        # Convert the next target position to device units
-        next_target_dev = c_int()
-        lib.CC_GetDeviceUnitFromRealValue(serial_num, next_target_real, byref(next_target_dev), 0)
-
-        print(f'Step {step}: Moving to {next_target_real.value} mm in Device Units: {next_target_dev.value}')
-
-        # Move to the next target position as an absolute move
-        lib.CC_SetMoveAbsolutePosition(serial_num, next_target_dev)
-        time.sleep(0.25)
-        lib.CC_MoveAbsolute(serial_num)
-
-        # Wait for the motor to move
-        time.sleep(2)
-
-        # Get the updated position to confirm the move
-        lib.CC_RequestPosition(serial_num)
-        time.sleep(0.2)
-        updated_dev_pos = c_int(lib.CC_GetPosition(serial_num))
-
-        # Convert updated device position to real units
-        updated_real_pos = c_double()
-        lib.CC_GetRealValueFromDeviceUnit(serial_num, updated_dev_pos, byref(updated_real_pos), 0)
-
-        print(f'Position after step {step}: {updated_real_pos.value} mm')
+    # Move the stage in `n` steps per pass
+    for pass_index, step, next_target_real, updated_real_pos, _ in scan(stage, start, stop, n_steps, direction, passes,
+                                                                        backlash):
+        print(f'Pass {pass_index + 1}, step {step}: moved to {next_target_real} mm '
+              f'(Device Units: {stage.to_device(next_target_real)}), position {updated_real_pos} mm')
 
     # Final position check
-    if abs(updated_real_pos.value - target_pos_real.value) < 0.1:  # Adjust tolerance as needed
+    if abs(updated_real_pos - next_target_real) < 0.1:  # Adjust tolerance as needed
         print("The motor has reached the target position.")
     else:
         print("The motor has not reached the target position.")
 
-    # Close the device
-    lib.CC_Close(serial_num)
-
 
 # GUI Setup
 class StageControlApp:
@@ -103,50 +56,58 @@ class StageControlApp:
         self.direction_label = tk.Label(master, text="Direction:")
         self.direction_label.grid(row=2, column=0, padx=10, pady=10)
 
-        self.direction_var = tk.StringVar(value="forward")
-        self.direction_forward = tk.Radiobutton(master, text="Forward", variable=self.direction_var, value="forward")
+        self.direction_var = tk.StringVar(value=FORWARD)
+        self.direction_forward = tk.Radiobutton(master, text="Forward", variable=self.direction_var, value=FORWARD)
         self.direction_forward.grid(row=2, column=1, padx=10, pady=10, sticky="w")
 
-        self.direction_backward = tk.Radiobutton(master, text="Backward", variable=self.direction_var, value="backward")
+        self.direction_backward = tk.Radiobutton(master, text="Backward", variable=self.direction_var, value=BACKWARD)
         self.direction_backward.grid(row=3, column=1, padx=10, pady=10, sticky="w")
 
+        self.direction_serpentine = tk.Radiobutton(master, text="Serpentine", variable=self.direction_var, value=SERPENTINE)
+        self.direction_serpentine.grid(row=4, column=1, padx=10, pady=10, sticky="w")
+
+        self.passes_label = tk.Label(master, text="Number of Passes:")
+        self.passes_label.grid(row=5, column=0, padx=10, pady=10)
+
+        self.passes_entry = tk.Entry(master)
+        self.passes_entry.insert(0, "1")
+        self.passes_entry.grid(row=5, column=1, padx=10, pady=10)
+
+        self.backlash_label = tk.Label(master, text="Backlash (mm):")
+        self.backlash_label.grid(row=6, column=0, padx=10, pady=10)
+
+        self.backlash_entry = tk.Entry(master)
+        self.backlash_entry.insert(0, "0")
+        self.backlash_entry.grid(row=6, column=1, padx=10, pady=10)
+
         self.move_button = tk.Button(master, text="Move Stage", command=self.move_stage)
-        self.move_button.grid(row=4, column=0, columnspan=2, pady=20)
+        self.move_button.grid(row=7, column=0, columnspan=2, pady=20)
+
+        self.stage = StageController()
+        self.master.protocol("WM_DELETE_WINDOW", self.close)
+
+    def close(self):
+        self.stage.close()
+        self.master.destroy()
 
     def move_stage(self):
         try:
             target_pos = float(self.target_pos_entry.get())
             n_steps = int(self.steps_entry.get())
             direction = self.direction_var.get()  # Get selected direction
+            passes = int(self.passes_entry.get())
+            backlash = float(self.backlash_entry.get())
 
             if n_steps <= 0:
                 raise ValueError("Number of steps must be greater than zero.")
+            if passes <= 0:
+                raise ValueError("Number of passes must be greater than zero.")
 
-            if sys.version_info < (3, 8):
-                os.chdir(r"C:\Program Files\Thorlabs\Kinesis")
-            else:
-                os.add_dll_directory(r"C:\Program Files\Thorlabs\Kinesis")
-
-            # Load the Thorlabs library
-            lib: CDLL = cdll.LoadLibrary("Thorlabs.MotionControl.TCube.DCServo.dll")
-
-            serial_num = c_char_p(b"83859973")  # Update with your serial number
-
-            # Initialize the device
-            if lib.TLI_BuildDeviceList() == 0:
-                lib.CC_Open(serial_num)
-                lib.CC_StartPolling(serial_num, c_int(200))
-
-                # Set up device and move
-                target_pos_real = c_double(target_pos)
-                move_stage(serial_num, target_pos_real, n_steps, direction)
-
-                # Close the device
-                lib.CC_Close(serial_num)
+            # Open the device on first use and keep it open for the following scans
+            self.stage.open()
+            move_stage(self.stage, target_pos, n_steps, direction, passes, backlash)
 
-                messagebox.showinfo("Success", "Stage has successfully moved!")
-            else:
-                messagebox.showerror("Error", "Device initialization failed.")
+            messagebox.showinfo("Success", "Stage has successfully moved!")
         except ValueError as e:
             messagebox.showerror("Input Error", f"Invalid input: {e}")
         except Exception as e:
@@ -0,0 +1,67 @@
+import queue
+import threading
+
+QUEUE_SIZE = 64  # points buffered between the acquisition and the worker thread
+
+_STOP = object()
+
+
+class AcquisitionPipeline:
+    """
+    Hands scan points from the acquisition loop to a worker thread.
+
+    The acquisition loop only moves and samples and `put`s each point on a bounded queue. The worker calls
+    every handler with the point, so saving, analysis and display overlap with the next move. If a handler
+    fails the error is raised in the acquisition loop on the next `put` or when the pipeline is closed.
+    Usable as a context manager.
+    """
+
+    def __init__(self, *handlers, maxsize=QUEUE_SIZE):
+        self.handlers = handlers
+        self.queue = queue.Queue(maxsize)
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.error = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def start(self):
+        self.thread.start()
+
+    def put(self, point):
+        """
+        Queues a point for the handlers, blocking while the queue is full.
+
+        :return: None
+        """
+        if self.error is not None:
+            raise self.error
+        self.queue.put(point)
+
+    def close(self):
+        """
+        Waits until all queued points are handled and stops the worker thread.
+
+        :return: None
+        """
+        self.queue.put(_STOP)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def _run(self):
+        while True:
+            point = self.queue.get()
+            if point is _STOP:
+                return
+            if self.error is not None:
+                continue
+            try:
+                for handler in self.handlers:
+                    handler(point)
+            except Exception as e:
+                self.error = e
@@ -2,6 +2,8 @@
 import pyvisa
 import numpy as np
 
+from scpi_batch import ScpiBatch
+
 rm = pyvisa.ResourceManager()
 
 # Find the power meter: we know it's a USB device from vendor 0x1313 (Thorlabs),
@@ -22,21 +24,23 @@ meter.write('system:beeper')
 print('*idn?')
 print('--> ' + meter.query('*idn?'))
 
-# Configure the power meter for laser power measurements
+# Configure the power meter for laser power measurements, all settings in one message
 wavelength = 1064  # nm
 
-meter.write('sense:power:unit mW')  # Change unit to mW (milliwatts)
-meter.write('sense:power:range:auto 1')  # Auto range
-meter.write('sense:average:count 50')  # Number of averages for reading
-meter.write('configure:power')  # Configure for power measurement
-
-meter.write('sense:correction:wavelength %.1f' % wavelength)
+setup = ScpiBatch()
+setup.write('sense:power:unit mW')  # Change unit to mW (milliwatts)
+setup.write('sense:power:range:auto 1')  # Auto range
+setup.write('sense:average:count 50')  # Number of averages for reading
+setup.write('configure:power')  # Configure for power measurement
+setup.write('sense:correction:wavelength %.1f' % wavelength)
+setup.send(meter)
 
-# Take 4 measurements and store them
-measurements = []
+# Take 4 measurements in one message and store them
+readings = ScpiBatch()
 for i in range(4):
-    cur_power = meter.query_ascii_values('read?')[0]
-    measurements.append(cur_power)
+    readings.query('read?', float)
+measurements = readings.send(meter)
+for i, cur_power in enumerate(measurements):
     print(f'Measurement {i+1}: {cur_power:.2f} mW')
 
 # Calculate the average power and the error (standard deviation)
@@ -0,0 +1,379 @@
+import time
+from ctypes import *
+
+import numpy as np
+
+from scpi_batch import ScpiBatch
+from TLPMX import TLPMX, TLPM_AUTORANGE_POWER_ON, TLPM_DEFAULT_CHANNEL
+from tlpmx_arrays import FAST_ARRAY_SIZE, ArrayReader
+from tlpmx_facade import MeterFacade
+
+PM100D_RESOURCES = 'USB?*::0x1313::0x8078::?*::INSTR'  # Thorlabs (0x1313) PM100D (0x8078)
+TIMEOUT = 2000  # ms
+RECONNECT_ATTEMPTS = 3
+RECONNECT_DELAY = 0.5  # s, time for the USB device to re-enumerate before the next attempt
+N_READINGS = 5
+AVERAGE_COUNT = 50  # samples the meter averages into every on-meter reading, as in power.py
+
+
+class PowerMeterSession:
+    """
+    Long-lived VISA session with a PM100D power meter.
+
+    The resource manager is created, the meter looked up and opened, and unit, range and wavelength
+    written once when the session is opened; every measurement then reuses the open session. If the USB
+    link drops, the next command reopens the meter (looking it up again if needed), restores the
+    configuration and is retried. Usable as a context manager.
+    """
+
+    def __init__(self, wavelength, resource=None, unit='mW', average_count=None, timeout=TIMEOUT,
+                 reconnect_attempts=RECONNECT_ATTEMPTS, resource_manager=None):
+        """
+        :param wavelength: correction wavelength in nm
+        :param resource: VISA resource name, by default the first PM100D found
+        :param unit: power unit, 'W' or 'mW'
+        :param average_count: number of samples the meter averages into every reading, by default the
+            meter's setting is kept
+        :param timeout: VISA timeout in ms
+        :param reconnect_attempts: number of times a command is retried after reopening the meter
+        :param resource_manager: `pyvisa.ResourceManager` to use, by default one created on open
+        """
+        self.wavelength = wavelength
+        self.resource = resource
+        self.find_resource = resource is None
+        self.unit = unit
+        self.average_count = average_count
+        self.timeout = timeout
+        self.reconnect_attempts = reconnect_attempts
+        self.rm = resource_manager
+        self.meter = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def is_open(self):
+        return self.meter is not None
+
+    def open(self):
+        """
+        Opens and configures the meter. Does nothing if the session is already open.
+
+        :return: None
+        """
+        if self.meter is not None:
+            return
+
+        import pyvisa  # here rather than at the top, so tools using only TLPMXSession start without VISA
+        if self.rm is None:
+            self.rm = pyvisa.ResourceManager()
+        if self.resource is None:
+            self.resource = self.find()
+
+        meter = self.rm.open_resource(self.resource)
+        meter.read_termination = '\n'
+        meter.write_termination = '\n'
+        meter.timeout = self.timeout
+        self.meter = meter
+        self.configure()
+
+    def find(self):
+        """
+        Returns the resource name of the first PM100D found.
+        """
+        res_found = self.rm.list_resources(PM100D_RESOURCES)
+        if not res_found:
+            raise ConnectionError('Could not find the PM100D power meter.')
+        return res_found[0]
+
+    def configure(self):
+        """
+        Writes the unit, auto range, averaging and wavelength settings of the session to the meter, in one
+        message.
+
+        :return: None
+        """
+        batch = ScpiBatch()
+        batch.write(f'sense:power:unit {self.unit}')
+        batch.write('sense:power:range:auto 1')
+        if self.average_count is not None:
+            batch.write(f'sense:average:count {self.average_count}')
+        batch.write(f'sense:correction:wavelength {self.wavelength}')
+        batch.send(self.meter)
+
+    def close(self):
+        """
+        Closes the meter. The resource manager is kept, so the session can be reopened cheaply.
+
+        :return: None
+        """
+        if self.meter is None:
+            return
+        import pyvisa
+        try:
+            self.meter.close()
+        except pyvisa.Error:
+            pass  # The link is already gone
+        finally:
+            self.meter = None
+
+    def reconnect(self):
+        """
+        Closes and reopens the meter.
+
+        :return: None
+        """
+        self.close()
+        self.open()
+
+    def _call(self, function):
+        import pyvisa
+        for attempt in range(self.reconnect_attempts + 1):
+            try:
+                self.open()
+                return function(self.meter)
+            except (pyvisa.errors.VisaIOError, pyvisa.errors.InvalidSession, ConnectionError):
+                if attempt == self.reconnect_attempts:
+                    raise
+                self.close()
+                if self.find_resource:
+                    # The meter may come back under a different resource name after re-enumeration
+                    self.resource = None
+                time.sleep(RECONNECT_DELAY)
+
+    def write(self, command):
+        """
+        Sends a command, reconnecting if the link has dropped.
+
+        :return: None
+        """
+        self._call(lambda meter: meter.write(command))
+
+    def query(self, command):
+        """
+        Sends a query and returns the answer as a string, reconnecting if the link has dropped.
+        """
+        return self._call(lambda meter: meter.query(command))
+
+    def query_values(self, command):
+        """
+        Sends a query and returns the answer as a list of floats, reconnecting if the link has dropped.
+        """
+        return self._call(lambda meter: meter.query_ascii_values(command))
+
+    def send(self, batch):
+        """
+        Sends a `scpi_batch.ScpiBatch`, reconnecting if the link has dropped.
+
+        :return: list of the answers of the queries in the batch
+        """
+        return self._call(batch.send)
+
+    def set_wavelength(self, wavelength):
+        """
+        Changes the correction wavelength, writing it to the meter only if it differs from the current one.
+
+        :param wavelength: wavelength in nm
+        :return: None
+        """
+        if wavelength != self.wavelength:
+            self.wavelength = wavelength
+            if self.meter is not None:
+                self.write(f'sense:correction:wavelength {wavelength}')
+
+    def read_power(self, n_readings=N_READINGS):
+        """
+        Takes `n_readings` power readings, queried in one message.
+
+        :param n_readings: number of readings
+        :return: (mean power, standard deviation) in the unit of the session
+        """
+        batch = ScpiBatch()
+        for _ in range(n_readings):
+            batch.query('read?', float)
+        readings = self.send(batch)
+        return np.mean(readings), np.std(readings)
+
+
+class TLPMXSession:
+    """
+    Long-lived `TLPMX` driver session that averages on the instrument.
+
+    The meter averages over the configured count or time, so every point needs a single `measPower` call
+    instead of a series of queries. The spread of the readings is taken from one fast-array burst
+    (PM103, PM5020) rather than from repeated queries. Usable as a context manager.
+    """
+
+    def __init__(self, wavelength, resource=None, channel=TLPM_DEFAULT_CHANNEL, avg_time=None, avg_count=None,
+                 burst_std=True, driver=TLPMX, dark_offsets=None):
+        """
+        :param wavelength: correction wavelength in nm
+        :param resource: resource name (bytes), by default the first power meter found
+        :param channel: sensor channel
+        :param avg_time: averaging time in s, by default the meter's setting is kept
+        :param avg_count: averaging count (PM100 series), by default the meter's setting is kept
+        :param burst_std: take the standard deviation from a fast-array burst; if False, or if the meter
+            has no fast-array mode, NaN is returned instead
+        :param driver: callable creating the driver session: `TLPMX` (the DLL, Windows only),
+            `tlpmx_scpi.ScpiTLPMX` (SCPI over pyvisa, e.g. on Linux) or `powermeter_sim.SimulatedPowerMeter.tlpmx`
+        :param dark_offsets: `darkoffset.DarkOffsetCache` whose stored offset is applied when the session opens;
+            `dark_offset_applied` tells whether there was one
+        """
+        self.wavelength = wavelength
+        self.resource = resource
+        self.channel = c_uint16(channel)
+        self.avg_time = avg_time
+        self.avg_count = avg_count
+        self.burst_std = burst_std
+        self.driver = driver
+        self.dark_offsets = dark_offsets
+        self.dark_offset_applied = False
+        self.meter = None
+        self.arrays = None
+        self.facade = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def is_open(self):
+        return self.meter is not None
+
+    def open(self):
+        """
+        Opens and configures the meter. Does nothing if the session is already open.
+
+        :return: None
+        """
+        if self.meter is not None:
+            return
+
+        meter = self.driver()
+        if self.resource is None:
+            device_count = c_uint32()
+            meter.findRsrc(byref(device_count))
+            if device_count.value == 0:
+                raise ConnectionError('Could not find a power meter.')
+            resource_name = create_string_buffer(1024)
+            meter.getRsrcName(c_uint32(0), resource_name)
+            self.resource = resource_name.value
+        meter.open(create_string_buffer(self.resource), c_bool(True), c_bool(False))
+        self.meter = meter
+        self.arrays = ArrayReader(meter, FAST_ARRAY_SIZE, self.channel.value)
+        self.facade = MeterFacade(meter, self.channel.value)
+        try:
+            self.configure()
+        except Exception:
+            self.close()
+            raise
+
+    def configure(self):
+        """
+        Writes the auto range, wavelength and averaging settings of the session to the meter, puts it into
+        fast-array mode if the spread is taken from bursts, and writes the stored dark offset if there is one.
+
+        :return: None
+        """
+        self.meter.setPowerAutoRange(c_int16(TLPM_AUTORANGE_POWER_ON), self.channel)
+        self.meter.setWavelength(c_double(self.wavelength), self.channel)
+        self.set_averaging(self.avg_time, self.avg_count)
+        if self.burst_std:
+            try:
+                self.meter.confPowerFastArrayMeasurement(self.channel)
+            except NameError:
+                # The meter has no fast-array mode; don't try again for every point
+                self.burst_std = False
+        if self.dark_offsets is not None:
+            self.dark_offset_applied = self.dark_offsets.apply(self)
+
+    def set_averaging(self, avg_time=None, avg_count=None):
+        """
+        Sets the averaging of the meter. Arguments left at None are not changed.
+
+        :param avg_time: averaging time in s
+        :param avg_count: averaging count (PM100 series)
+        :return: None
+        """
+        if avg_time is not None:
+            self.avg_time = avg_time
+            if self.meter is not None:
+                self.meter.setAvgTime(c_double(avg_time), self.channel)
+        if avg_count is not None:
+            self.avg_count = avg_count
+            if self.meter is not None:
+                self.meter.setAvgCnt(c_int16(avg_count), self.channel)
+
+    def supports(self, *names):
+        """
+        Returns whether the driver implements all the `TLPMX` methods `names`. The SCPI backend, for example,
+        has no digital I/O or array measurements; its versions of them only raise `NameError`.
+        """
+        self.open()
+        return all(callable(getattr(type(self.meter), name, None)) for name in names)
+
+    def close(self):
+        """
+        Closes the meter.
+
+        :return: None
+        """
+        if self.meter is None:
+            return
+        try:
+            self.meter.close()
+        finally:
+            self.meter = None
+            self.facade = None
+
+    def sensor_info(self):
+        """
+        Reads the name and serial number of the connected sensor.
+
+        :return: (name, serial number) as str
+        """
+        self.open()
+        name = create_string_buffer(1024)
+        serial = create_string_buffer(1024)
+        message = create_string_buffer(1024)
+        sensor_type = c_int16()
+        sensor_subtype = c_int16()
+        flags = c_int16()
+        self.meter.getSensorInfo(name, serial, message, byref(sensor_type), byref(sensor_subtype), byref(flags),
+                                 self.channel)
+        return name.value.decode(), serial.value.decode()
+
+    def read_burst(self):
+        """
+        Fetches the fast-array power samples taken since the last `resetFastArrayMeasurement`. The fast-array
+        mode is configured once, by `configure`.
+
+        :return: NumPy array of up to FAST_ARRAY_SIZE powers in W
+        """
+        return self.arrays.fast_array()[1].astype(float)
+
+    def read_power(self):
+        """
+        Takes one instrument-averaged power reading and, if enabled, a burst for its spread.
+
+        :return: (averaged power, standard deviation of the burst samples) in W
+        """
+        self.open()
+        if self.burst_std:
+            # Drop the samples buffered while the stage moved, so the burst covers the averaging window
+            self.meter.resetFastArrayMeasurement(self.channel)
+        power = self.facade.power()
+
+        std = np.nan
+        if self.burst_std:
+            samples = self.read_burst()
+            if len(samples) > 1:
+                std = float(np.std(samples))
+        return power, std
@@ -0,0 +1,701 @@
+import math
+import threading
+from collections import deque
+
+import numpy as np
+
+from kinesis import DEFAULT_SERIAL
+from kinesis_sim import SimulatedClock, _set, _value
+from TLPMX import TLPM_ATTR_MAX_VAL, TLPM_ATTR_MIN_VAL, TLPM_AUTORANGE_POWER_ON, TLPM_IOLVL_HIGH, TLPM_POWER_UNIT_DBM
+
+SIMULATED_RESOURCE = "USB0::0x1313::0x8078::P0000001::INSTR"
+IDN = "Thorlabs,PM100D,P0000001,2.0.0"
+SENSOR_NAME = "S120C"
+SENSOR_SERIAL = "SIM00001"
+POWER_RANGES = 10.0 ** np.arange(-8, 0)  # W, full-scale values of the simulated photodiode sensor
+RESPONSIVITY = 0.5  # A/W
+AVERAGE_RATE = 3000  # samples/s of the instrument's averaging
+FAST_ARRAY_RATE = 10e3  # samples/s of fast-array measurements
+FAST_ARRAY_SIZE = 200
+FAST_ARRAY_BUFFER = 10000  # samples kept by the meter between two fast-array fetches
+SEQUENCE_STEP = 10e-6  # s, sequence interval per unit of baseTime
+SEQUENCE_BLOCK = 100
+BURST_TICK = 10e-6  # s, unit of the burst trigger configuration
+LATENCY = 0.002  # s per command
+RANGE_SWITCH_TIME = 0.05  # s
+NOISE = 1e-3  # relative noise of a single sample
+NOISE_FLOOR = 1e-9  # W, noise of a single sample without light
+TRIGGER_TIMEOUT = 1.0  # s
+DARK_CURRENT = 2e-9  # A, photodiode current without light
+DARK_ADJUST_TIME = 2.0  # s
+WAVELENGTH_RANGE = (400.0, 1100.0)  # nm
+
+# Long and short forms of the SCPI nodes the simulator understands
+_SCPI_NODES = {"sense": "sens", "power": "pow", "range": "rang", "upper": "upp", "average": "aver", "count": "coun",
+               "correction": "corr", "wavelength": "wav", "configure": "conf", "measure": "meas", "system": "syst",
+               "beeper": "beep", "error": "err", "fetch": "fetc", "initiate": "init", "scalar": "scal",
+               "current": "curr", "sensor": "sens", "collect": "coll", "abort": "abor", "state": "stat",
+               "magnitude": "magn", "minimum": "min", "maximum": "max"}
+
+
+def _erf(x):
+    return np.vectorize(math.erf, otypes=[float])(x)
+
+
+class GaussianBeam:
+    """
+    Gaussian beam profiled by a knife edge; the edge uncovers the beam as it moves to larger positions.
+    """
+
+    def __init__(self, power=1e-3, radius=0.1, center=1.0):
+        """
+        :param power: total power in W
+        :param radius: 1/e^2 radius in mm
+        :param center: position of the edge at which half of the power passes in mm
+        """
+        self.power = power
+        self.radius = radius
+        self.center = center
+
+    def transmitted(self, edge):
+        """
+        Returns the power in W passing the knife edge at position(s) `edge` in mm.
+        """
+        return self.power / 2 * (1 + _erf(math.sqrt(2) * (np.asarray(edge, dtype=float) - self.center) / self.radius))
+
+
+class MultimodeBeam:
+    """
+    Incoherent sum of Gaussian beams, e.g. a fundamental mode with a weaker, wider halo.
+    """
+
+    def __init__(self, beams):
+        self.beams = list(beams)
+
+    @property
+    def power(self):
+        return sum(beam.power for beam in self.beams)
+
+    def transmitted(self, edge):
+        return sum(beam.transmitted(edge) for beam in self.beams)
+
+
+class SimulatedPowerMeter:
+    """
+    Model of a power meter with a photodiode sensor behind a knife edge.
+
+    The power reaching the sensor is that of `beam` past the edge at `position(t)`. Readings carry noise
+    that shrinks with the averaging, commands take `latency`, auto range switches cost `range_switch_time`
+    and a fixed range saturates at its full scale. The same model is served over VISA
+    (`SimulatedResourceManager`) and through the `TLPMX` methods (`SimulatedTLPMX`).
+    """
+
+    def __init__(self, beam=None, position=None, clock=None, noise=NOISE, noise_floor=NOISE_FLOOR, latency=LATENCY,
+                 range_switch_time=RANGE_SWITCH_TIME, seed=None):
+        """
+        :param beam: `GaussianBeam` or `MultimodeBeam`, by default a 1 mW beam of 0.1 mm radius at 1 mm
+        :param position: callable returning the knife-edge position in mm at simulated time t, by default
+            the edge stays at the beam center
+        :param clock: `kinesis_sim.SimulatedClock`, share the stage simulator's clock to run in its time
+        :param noise: relative noise of a single sample
+        :param noise_floor: noise of a single sample in W
+        :param latency: time per command in s
+        :param range_switch_time: time of an auto range switch in s
+        :param seed: seed of the noise, for reproducible runs
+        """
+        self.beam = beam if beam is not None else GaussianBeam()
+        self.position = position if position is not None else (lambda t: self.beam.center)
+        self.clock = clock if clock is not None else SimulatedClock()
+        self.noise = noise
+        self.noise_floor = noise_floor
+        self.latency = latency
+        self.range_switch_time = range_switch_time
+        self.rng = np.random.default_rng(seed)
+        self.lock = threading.RLock()
+
+        self.wavelength = 1064.0
+        self.unit = "W"
+        self.auto_range = True
+        self.range = POWER_RANGES[-1]
+        self.avg_count = 1
+        self.avg_time = None
+        self.last_power = 0.0
+        self.range_switches = 0
+        self.dark_current = DARK_CURRENT
+        self.dark_offset = 0.0
+        self.dark_adjust_end = None
+        self.array_mode = False  # fast-array measurement running
+
+    @classmethod
+    def for_stage(cls, simulator, serial=DEFAULT_SERIAL, **kwargs):
+        """
+        Creates a meter whose knife edge is mounted on an axis of a `kinesis_sim.SimulatedDCServo`.
+
+        :param simulator: `SimulatedDCServo`
+        :param serial: serial number (str) of the axis
+        :param kwargs: further arguments of `SimulatedPowerMeter`
+        :return: `SimulatedPowerMeter` sharing the simulator's clock
+        """
+        return cls(position=lambda t: simulator.position(serial, t), clock=simulator.clock, **kwargs)
+
+    def now(self):
+        return self.clock.now()
+
+    def sleep(self, seconds):
+        self.clock.sleep(seconds)
+
+    def true_power(self, t):
+        """
+        Returns the power in W on the sensor at simulated time(s) `t`.
+        """
+        t = np.asarray(t, dtype=float)
+        if t.ndim == 0:
+            return float(self.beam.transmitted(self.position(float(t))))
+        return self.beam.transmitted([self.position(ti) for ti in t])
+
+    def sample(self, power, averaging=1):
+        """
+        Adds the dark error and the noise of an average over `averaging` samples and applies the range.
+
+        :param power: power(s) in W
+        :return: reading(s) in W
+        """
+        power = np.asarray(power, dtype=float) + self.dark_error()
+        sigma = np.sqrt((self.noise * power) ** 2 + self.noise_floor ** 2) / math.sqrt(max(averaging, 1))
+        reading = power + self.rng.normal(0.0, 1.0, power.shape) * sigma
+        return np.minimum(reading, self.range) if not self.auto_range else reading
+
+    def range_for(self, power):
+        """
+        Returns the smallest range holding `power`, or the largest range.
+        """
+        index = min(np.searchsorted(POWER_RANGES, abs(power)), len(POWER_RANGES) - 1)
+        return float(POWER_RANGES[index])
+
+    def set_range(self, power):
+        self.range = self.range_for(power)
+
+    def averaging_time(self):
+        return self.avg_time if self.avg_time is not None else self.avg_count / AVERAGE_RATE
+
+    def measure(self):
+        """
+        Takes one averaged reading, switching range first if auto range needs to.
+
+        :return: power in W
+        """
+        with self.lock:
+            duration = self.averaging_time()
+            t = self.now()
+            power = self.true_power(t + duration / 2)
+            if self.auto_range and self.range_for(power) != self.range:
+                self.range = self.range_for(power)
+                self.range_switches += 1
+                self.sleep(self.range_switch_time)
+            self.sleep(duration)
+            self.last_power = float(self.sample(power, duration * AVERAGE_RATE))
+            return self.last_power
+
+    def dark_error(self):
+        """
+        Returns the power in W read without light, from the dark current not removed by the dark offset.
+        """
+        return (self.dark_current - self.dark_offset) / RESPONSIVITY
+
+    def start_dark_adjust(self):
+        self.dark_adjust_end = self.now() + DARK_ADJUST_TIME
+
+    def dark_adjust_running(self):
+        """
+        Returns True while a dark adjustment runs, and sets the dark offset when it has finished.
+        """
+        if self.dark_adjust_end is not None and self.now() >= self.dark_adjust_end:
+            noise = self.noise_floor * RESPONSIVITY / math.sqrt(DARK_ADJUST_TIME * AVERAGE_RATE)
+            self.dark_offset = self.dark_current + float(self.rng.normal(0.0, noise))
+            self.dark_adjust_end = None
+        return self.dark_adjust_end is not None
+
+    def in_unit(self, power):
+        return power * 1000 if self.unit == "MW" else power
+
+    def scpi(self, message):
+        """
+        Executes a SCPI message (commands separated by ';') and returns the answer, or None.
+        """
+        answers = [self._scpi_command(command) for command in message.split(";") if command.strip()]
+        answers = [answer for answer in answers if answer is not None]
+        return ";".join(answers) if answers else None
+
+    def _scpi_command(self, command):
+        header, _, argument = command.strip().lstrip(":").partition(" ")
+        argument = argument.strip()
+        bound = _SCPI_NODES.get(argument.lower(), argument.lower())  # MIN or MAX of a query
+        query = header.endswith("?")
+        nodes = [_SCPI_NODES.get(node, node) for node in header.rstrip("?").lower().split(":")]
+        nodes = [node.rstrip("0123456789") or node for node in nodes if node != "dc"]
+        if nodes[0] in ("pow", "curr", "aver", "corr"):
+            nodes.insert(0, "sens")  # SENSe is the default root
+        path = ":".join(nodes)
+
+        with self.lock:
+            if path == "*idn":
+                return IDN
+            if path in ("*rst", "*cls", "conf:pow", "conf:scal:pow", "abor"):
+                self.array_mode = False
+                return None
+            if path in ("syst:beep", "init"):
+                return None
+            if path in ("read", "meas:pow", "meas", "meas:scal:pow"):
+                return f"{self.in_unit(self.measure()):.9e}"
+            if path == "meas:curr":
+                return f"{self.measure() * RESPONSIVITY:.9e}"
+            if path == "syst:sens:idn":
+                return f"{SENSOR_NAME},{SENSOR_SERIAL},,1,2,33"
+            if path in ("sens:corr:coll:zero", "sens:corr:coll:zero:init"):
+                self.start_dark_adjust()
+                return None
+            if path == "sens:corr:coll:zero:abor":
+                self.dark_adjust_end = None
+                return None
+            if path == "sens:corr:coll:zero:stat":
+                return str(int(self.dark_adjust_running()))
+            if path == "sens:corr:coll:zero:magn":
+                if query:
+                    return f"{self.dark_offset:.9e}"
+                self.dark_offset = float(argument)
+                return None
+            if path == "sens:curr:rang:upp" and query:
+                return f"{self.range * RESPONSIVITY:.9e}"
+            if path == "fetc":
+                return f"{self.in_unit(self.last_power):.9e}"
+            if path == "conf":
+                return "POW"
+            if path == "syst:err":
+                return '0,"No error"'
+            if path == "sens:pow:unit":
+                if query:
+                    return self.unit
+                self.unit = argument.upper()
+                return None
+            if path == "sens:pow:rang:auto":
+                if query:
+                    return str(int(self.auto_range))
+                self.auto_range = argument.upper() in ("1", "ON")
+                return None
+            if path in ("sens:pow:rang", "sens:pow:rang:upp"):
+                if query:
+                    limit = {"min": POWER_RANGES[0], "max": POWER_RANGES[-1]}.get(bound, self.range)
+                    return f"{self.in_unit(limit):.9e}"
+                self.auto_range = False
+                self.set_range(float(argument) / (1000 if self.unit == "MW" else 1))
+                return None
+            if path in ("sens:aver", "sens:aver:coun"):
+                if query:
+                    return str(self.avg_count)
+                self.avg_count = int(float(argument))
+                self.avg_time = None
+                return None
+            if path == "sens:corr:wav":
+                if query:
+                    wavelength = {"min": WAVELENGTH_RANGE[0], "max": WAVELENGTH_RANGE[1]}.get(bound, self.wavelength)
+                    return f"{wavelength:.1f}"
+                self.wavelength = float(argument)
+                return None
+        raise ValueError(f"Unknown SCPI command '{command}'.")
+
+    def resource_manager(self):
+        """
+        Returns a `SimulatedResourceManager` serving this meter.
+        """
+        return SimulatedResourceManager(self)
+
+    def tlpmx(self):
+        """
+        Returns a `SimulatedTLPMX` driver session of this meter, for `powermeter.TLPMXSession(driver=...)`.
+        """
+        return SimulatedTLPMX(self)
+
+
+class SimulatedInstrument:
+    """
+    Stand-in for the `pyvisa` resource of the meter.
+    """
+
+    def __init__(self, meter):
+        self.meter = meter
+        self.read_termination = "\n"
+        self.write_termination = "\n"
+        self.timeout = 2000
+        self.answers = deque()
+
+    def write(self, message):
+        self.meter.sleep(self.meter.latency)
+        answer = self.meter.scpi(message)
+        if answer is not None:
+            self.answers.append(answer)
+
+    def read(self):
+        if not self.answers:
+            raise TimeoutError("No answer queued; the last message was not a query.")
+        return self.answers.popleft()
+
+    def query(self, message):
+        self.write(message)
+        return self.read()
+
+    def query_ascii_values(self, message):
+        return [float(value) for value in self.query(message).replace(";", ",").split(",")]
+
+    def close(self):
+        pass
+
+
+class SimulatedResourceManager:
+    """
+    Stand-in for `pyvisa.ResourceManager` listing the simulated meter, for `PowerMeterSession(resource_manager=...)`.
+    """
+
+    def __init__(self, meter):
+        self.meter = meter
+
+    def list_resources(self, query="?*::INSTR"):
+        return (SIMULATED_RESOURCE,)
+
+    def open_resource(self, resource_name):
+        if resource_name != SIMULATED_RESOURCE:
+            raise ValueError(f"Unknown resource '{resource_name}'.")
+        return SimulatedInstrument(self.meter)
+
+    def close(self):
+        pass
+
+
+class SimulatedTLPMX:
+    """
+    Stand-in for a `TLPMX` driver session implementing the methods used by this project.
+
+    Arguments are ctypes values or `byref` references, as for the real driver, and failures raise
+    `NameError` like `TLPMX`. A rising edge on a digital output counts as a trigger, as if the pin were
+    wired to the trigger input.
+    """
+
+    def __init__(self, meter):
+        self.meter = meter
+        self.is_open = False
+        self.output_pins = set()
+        self.outputs = [0, 0, 0, 0]
+        self.fast_start = None
+        self.fast_next = None
+        self.burst_config = (0, 1, 1)  # init delay, count, averaging in BURST_TICK
+        self.burst_armed = False
+        self.burst_times = []
+        self.sequence_interval = SEQUENCE_STEP
+        self.sequence_h_pos = 0
+        self.sequence_hw_trigger = False
+        self.sequence_trigger = None
+        self.raw_answers = deque()
+
+    def _io(self):
+        if not self.is_open:
+            raise NameError(b"Instrument session is not open.")
+        self.meter.sleep(self.meter.latency)
+
+    def trigger(self):
+        """
+        Applies a trigger at the current simulated time.
+
+        :return: None
+        """
+        t = self.meter.now()
+        if self.burst_armed:
+            self.burst_times.append(t)
+        if self.sequence_hw_trigger and self.sequence_trigger is None:
+            self.sequence_trigger = t
+
+    def findRsrc(self, resourceCount):
+        _set(resourceCount, 1)
+        return 0
+
+    def getRsrcName(self, index, resourceName):
+        _set(resourceName, SIMULATED_RESOURCE.encode())
+        return 0
+
+    def open(self, resourceName, IDQuery, resetDevice):
+        self.is_open = True
+        return 0
+
+    def close(self):
+        self.is_open = False
+        return 0
+
+    def setWavelength(self, wavelength, channel):
+        self._io()
+        self.meter.wavelength = _value(wavelength)
+        return 0
+
+    def getWavelength(self, attribute, wavelength, channel):
+        self._io()
+        _set(wavelength, self.meter.wavelength)
+        return 0
+
+    def setPowerUnit(self, powerUnit, channel):
+        self._io()
+        self.meter.unit = "DBM" if _value(powerUnit) == TLPM_POWER_UNIT_DBM else "W"
+        return 0
+
+    def setPowerAutoRange(self, powerAutorangeMode, channel):
+        self._io()
+        self.meter.auto_range = _value(powerAutorangeMode) == TLPM_AUTORANGE_POWER_ON
+        return 0
+
+    def getPowerAutorange(self, powerAutorangeMode, channel):
+        self._io()
+        _set(powerAutorangeMode, int(self.meter.auto_range))
+        return 0
+
+    def setPowerRange(self, power_to_Measure, channel):
+        self._io()
+        self.meter.set_range(_value(power_to_Measure))
+        return 0
+
+    def getPowerRange(self, attribute, powerValue, channel):
+        self._io()
+        attribute = _value(attribute)
+        if attribute == TLPM_ATTR_MIN_VAL:
+            _set(powerValue, float(POWER_RANGES[0]))
+        elif attribute == TLPM_ATTR_MAX_VAL:
+            _set(powerValue, float(POWER_RANGES[-1]))
+        else:
+            _set(powerValue, self.meter.range)
+        return 0
+
+    def getCurrentRanges(self, currentValues, rangeCount, channel):
+        self._io()
+        for i, power_range in enumerate(POWER_RANGES):
+            currentValues[i] = power_range * RESPONSIVITY
+        _set(rangeCount, len(POWER_RANGES))
+        return 0
+
+    def getCurrentRange(self, attribute, currentValue, channel):
+        self._io()
+        _set(currentValue, self.meter.range * RESPONSIVITY)
+        return 0
+
+    def setAvgTime(self, avgTime, channel):
+        self._io()
+        self.meter.avg_time = _value(avgTime)
+        return 0
+
+    def getAvgTime(self, attribute, avgTime, channel):
+        self._io()
+        _set(avgTime, self.meter.averaging_time())
+        return 0
+
+    def setAvgCnt(self, averageCount, channel):
+        self._io()
+        self.meter.avg_count = _value(averageCount)
+        self.meter.avg_time = None
+        return 0
+
+    def getAvgCnt(self, averageCount, channel):
+        self._io()
+        _set(averageCount, self.meter.avg_count)
+        return 0
+
+    def measPower(self, power, channel):
+        self._io()
+        _set(power, self.meter.measure())
+        return 0
+
+    def measDualChannelSimultaneous(self, measurement, resultChannel1, resultChannel2):
+        # Channel 2 is a reference detector seeing the whole beam
+        self._io()
+        _set(resultChannel1, self.meter.measure())
+        _set(resultChannel2, float(self.meter.sample(self.meter.beam.power, self.meter.avg_count)))
+        return 0
+
+    def getSensorInfo(self, name, snr, message, pType, pStype, pFlags, channel):
+        self._io()
+        _set(name, SENSOR_NAME.encode())
+        _set(snr, SENSOR_SERIAL.encode())
+        _set(message, b"")
+        _set(pType, 1)  # photodiode
+        _set(pStype, 2)
+        _set(pFlags, 0x0021)  # power sensor, wavelength settable
+        return 0
+
+    def startDarkAdjust(self, channel):
+        self._io()
+        self.meter.start_dark_adjust()
+        return 0
+
+    def cancelDarkAdjust(self, channel):
+        self._io()
+        self.meter.dark_adjust_end = None
+        return 0
+
+    def getDarkAdjustState(self, state, channel):
+        self._io()
+        _set(state, int(self.meter.dark_adjust_running()))
+        return 0
+
+    def setDarkOffset(self, darkOffset, channel):
+        self._io()
+        self.meter.dark_offset = _value(darkOffset)
+        return 0
+
+    def getDarkOffset(self, darkOffset, channel):
+        self._io()
+        _set(darkOffset, self.meter.dark_offset)
+        return 0
+
+    def confPowerFastArrayMeasurement(self, channel):
+        self._io()
+        self.fast_start = self.fast_next = self.meter.now()
+        self.meter.array_mode = True
+        return 0
+
+    def resetFastArrayMeasurement(self, channel):
+        return self.confPowerFastArrayMeasurement(channel)
+
+    def _fast_samples(self, count, timestamps, values, relative):
+        self._io()
+        if self.fast_start is None or not self.meter.array_mode:
+            raise NameError(b"Fast array measurement is not configured.")
+        now = self.meter.now()
+        self.fast_next = max(self.fast_next, now - FAST_ARRAY_BUFFER / FAST_ARRAY_RATE)
+        n = int(min((now - self.fast_next) * FAST_ARRAY_RATE, FAST_ARRAY_SIZE))
+        times = self.fast_next + np.arange(n) / FAST_ARRAY_RATE
+        powers = self.meter.sample(self.meter.true_power(times)) if n else []
+        origin = times[0] if (relative and n) else self.fast_start
+        for i in range(n):
+            timestamps[i] = int(round((times[i] - origin) * 1e6))
+            values[i] = powers[i]
+        self.fast_next += n / FAST_ARRAY_RATE
+        _set(count, n)
+        return 0
+
+    def getNextFastArrayMeasurement(self, count, timestamps, values, channel):
+        return self._fast_samples(count, timestamps, values, False)
+
+    def getNextFastArrayMeasurementRelativeTime(self, count, timestamps, values, channel):
+        return self._fast_samples(count, timestamps, values, True)
+
+    def confBurstArrayMeasPowerChannel(self, channel):
+        self._io()
+        return 0
+
+    def confBurstArrayMeasTrigger(self, trgSource, initDelay, burstCount, averaging):
+        self._io()
+        self.burst_config = (_value(initDelay), _value(burstCount), max(_value(averaging), 1))
+        return 0
+
+    def startBurstArrayMeasurement(self):
+        self._io()
+        self.burst_armed = True
+        self.burst_times = []
+        return 0
+
+    def _burst_sample_times(self):
+        init_delay, count, averaging = self.burst_config
+        offsets = (init_delay + averaging * (np.arange(count) + 0.5)) * BURST_TICK
+        if not self.burst_times:
+            return np.empty(0)
+        return np.concatenate([t + offsets for t in self.burst_times])
+
+    def getBurstArraySamplesCount(self, samplesCount):
+        self._io()
+        _set(samplesCount, int(np.count_nonzero(self._burst_sample_times() <= self.meter.now())))
+        return 0
+
+    def getBurstArraySamples(self, startIndex, sampleCount, timeStamps, values, values2):
+        self._io()
+        if len(timeStamps) < 2 * _value(sampleCount) or min(len(values), len(values2)) < _value(sampleCount):
+            # The driver writes this much without checking; refuse instead of corrupting memory
+            raise NameError(b"Burst sample buffers are too small.")
+        start = _value(startIndex)
+        times = self._burst_sample_times()[start:start + _value(sampleCount)]
+        powers = self.meter.sample(self.meter.true_power(times), self.burst_config[2]) if len(times) else []
+        for i, t in enumerate(times):
+            timeStamps[i] = int(round((t - self.burst_times[0]) * 1e6))
+            values[i] = powers[i]
+            values2[i] = 0.0
+        return 0
+
+    def setDigIoPinMode(self, pinNumber, pinMode):
+        self._io()
+        self.output_pins.add(_value(pinNumber))
+        return 0
+
+    def setDigIoOutput(self, IO0, IO1, IO2, IO3):
+        self._io()
+        levels = [_value(level) for level in (IO0, IO1, IO2, IO3)]
+        rising = any(level == TLPM_IOLVL_HIGH and not previous and pin + 1 in self.output_pins
+                     for pin, (level, previous) in enumerate(zip(levels, self.outputs)))
+        self.outputs = levels
+        if rising:
+            self.trigger()
+        return 0
+
+    def confPowerMeasurementSequence(self, baseTime, channel):
+        self._io()
+        self.sequence_interval = _value(baseTime) * SEQUENCE_STEP
+        self.sequence_h_pos = 0
+        self.sequence_hw_trigger = False
+        return 0
+
+    def confPowerMeasurementSequenceHWTrigger(self, trigSrc, baseTime, hPos, channel):
+        self._io()
+        self.sequence_interval = _value(baseTime) * SEQUENCE_STEP
+        self.sequence_h_pos = _value(hPos)
+        self.sequence_hw_trigger = True
+        return 0
+
+    def startMeasurementSequence(self, autoTriggerDelay, triggerForced):
+        self._io()
+        self.sequence_trigger = None if self.sequence_hw_trigger else self.meter.now()
+        return 0
+
+    def getMeasurementSequence(self, baseTime, timeStamps, values, values2):
+        self._io()
+        deadline = self.meter.now() + TRIGGER_TIMEOUT
+        while self.sequence_trigger is None:
+            if self.meter.now() > deadline:
+                raise NameError(b"Timeout waiting for the sequence trigger.")
+            self.meter.sleep(self.meter.latency)
+
+        n = SEQUENCE_BLOCK * _value(baseTime)
+        offsets = (np.arange(n) - self.sequence_h_pos) * self.sequence_interval
+        remaining = self.sequence_trigger + offsets[-1] - self.meter.now()
+        if remaining > 0:
+            self.meter.sleep(remaining)
+        powers = self.meter.sample(self.meter.true_power(self.sequence_trigger + offsets))
+        for i in range(n):
+            timeStamps[i] = i * self.sequence_interval * 1000
+            values[i] = powers[i]
+            values2[i] = 0.0
+        return 0
+
+    def writeRaw(self, command):
+        self._io()
+        command = _value(command)
+        answer = self.meter.scpi(command.decode() if isinstance(command, bytes) else command)
+        if answer is not None:
+            self.raw_answers.append(answer + "\n")
+        return 0
+
+    def readRaw(self, buffer, size, returnCount):
+        self._io()
+        if not self.raw_answers:
+            raise NameError(b"Timeout expired before operation completed.")
+        data = self.raw_answers.popleft().encode()
+        if len(data) > _value(size):
+            # The rest stays in the output queue for the next read
+            self.raw_answers.appendleft(data[_value(size):].decode())
+            data = data[:_value(size)]
+        buffer[:len(data)] = data
+        if len(data) < _value(size):
+            buffer[len(data)] = b"\0"
+        if returnCount is not None:
+            _set(returnCount, len(data))
+        return 0
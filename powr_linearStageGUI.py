@@ -1,80 +1,117 @@
-import time
-import os
-import sys
-from ctypes import *
 import tkinter as tk
 from tkinter import messagebox, filedialog
-import pyvisa
-import numpy as np
+from analysis import KnifeEdgeEstimator
+from darkoffset import DarkOffsetCache
+from hwtrigger import TRIGGER_METHODS, TriggerOutput, triggered_scan
+from kinesis import StageController
+from pipeline import AcquisitionPipeline
+from powermeter import AVERAGE_COUNT, N_READINGS, PowerMeterSession, TLPMXSession
+from ranging import RangeCache, RangeLock, plan_ranges
+from sampling import SequentialSampler
+from scan import BACKWARD, FORWARD, SERPENTINE, scan
+from scheduler import AdaptiveStepScheduler, adaptive_scan
+from TLPMX import TLPMX
+from tlpmx_scpi import ScpiTLPMX
 
 # Function to move the stage
-def move_stage(serial_num, target_pos_real, n_steps, direction, save_path, wavelength):
-    lib: CDLL = cdll.LoadLibrary("Thorlabs.MotionControl.TCube.DCServo.dll")
+def move_stage(stage, target_pos_real, n_steps, direction, save_path, wavelength, adaptive=False, passes=1,
+               backlash=0.0, target_error=None, on_meter=False, fixed_ranges=False, hw_trigger=False, driver=TLPMX,
+               avg_count=AVERAGE_COUNT):
+    if adaptive and (direction != FORWARD or passes != 1):
+        raise ValueError("Adaptive steps scan once from the current position to the target.")
+    current_real_pos = stage.get_position()
+    print(f'Current position: {current_real_pos} mm')
+
+    # The meter is opened and configured once and reused for every point of the scan
+    if on_meter:
+        # The meter averages every reading itself; readings are in W and saved in mW
+        dark_offsets = DarkOffsetCache()
+        meter = TLPMXSession(wavelength, avg_count=avg_count, driver=driver, dark_offsets=dark_offsets)
+        if hw_trigger and not meter.supports(*TRIGGER_METHODS):
+            meter.close()
+            raise ValueError("This meter backend has no digital I/O and burst measurements for hardware triggers.")
+        if target_error:
+            measure = SequentialSampler(lambda: meter.facade.power(), target_error * 1e-3)
+        else:
+            def measure():
+                return meter.read_power() + (1,)
+    else:
+        if fixed_ranges or hw_trigger:
+            raise ValueError("Fixed ranges and hardware triggers need on-meter averaging (TLPMX).")
+        meter = PowerMeterSession(wavelength)
+        if target_error:
+            # Read until the standard error of the mean reaches `target_error` (mW) instead of a fixed count
+            measure = SequentialSampler(lambda: meter.query_values('read?')[0], target_error)
+        else:
+            measure = meter.read_power
+
+    if adaptive:
+        start, stop = current_real_pos, target_pos_real
+    else:
+        distance = abs(target_pos_real - current_real_pos)
+        if direction == BACKWARD:
+            start, stop = current_real_pos - distance, current_real_pos
+        else:
+            start, stop = current_real_pos, current_real_pos + distance
     
-    STEPS_PER_REV = c_double(512)
-    gbox_ratio = c_double(67.49)
-    pitch = c_double(1.0)
+    edge = KnifeEdgeEstimator()
+    with meter, open(save_path, "w") as power_file:
+        if on_meter and not meter.dark_offset_applied:
+            print(f'No current dark offset for this sensor at {wavelength:g} nm in {dark_offsets.path}, keeping '
+                  f'the meter\'s own; run darkoffset.py with the input blocked to store one')
+        range_lock = None
+        if fixed_ranges:
+            # Plan the ranges from a pre-scan (or the cached plan) and keep the meter out of auto range
+            range_lock = RangeLock(meter, plan_ranges(stage, meter, min(start, stop), max(start, stop), RangeCache()))
 
-    lib.CC_SetMotorParamsExt(serial_num, STEPS_PER_REV, gbox_ratio, pitch)
-    lib.CC_RequestPosition(serial_num)
-    time.sleep(0.2)
-    current_dev_pos = c_int(lib.CC_GetPosition(serial_num))
+        if hw_trigger:
+            # Every position triggers a burst through digital output 1, wired to the meter's trigger input
+            points = triggered_scan(stage, meter.meter, TriggerOutput(meter.meter), start, stop, n_steps, direction,
+                                    passes, backlash)
+        elif adaptive:
+            # Concentrate the `n_steps` points on the edge transition between here and the target
+            scheduler = AdaptiveStepScheduler(start, stop, n_steps)
+            points = adaptive_scan(stage, scheduler, measure, range_lock, backlash)
+        else:
+            points = scan(stage, start, stop, n_steps, direction, passes, backlash, measure, range_lock)
 
-    current_real_pos = c_double()
-    lib.CC_GetRealValueFromDeviceUnit(serial_num, current_dev_pos, byref(current_real_pos), 0)
-    print(f'Current position: {current_real_pos.value} mm')
+        power_file.write("Step\tPosition (mm)\tPower (W)\tError (W)\tSamples")
 
-    step_size_real = (target_pos_real.value - current_real_pos.value) / n_steps
-    step_size_real = -abs(step_size_real) if direction == "backward" else abs(step_size_real)
-    
-    with open(save_path, "w") as power_file:
-        power_file.write("Step\tPosition (mm)\tPower (W)\tError (W)")
-        
-        for step in range(1, n_steps + 1):
-            next_target_real = c_double(current_real_pos.value - step * abs(step_size_real)) if direction == "backward" else c_double(current_real_pos.value + step * abs(step_size_real))
-            next_target_dev = c_int()
-            lib.CC_GetDeviceUnitFromRealValue(serial_num, next_target_real, byref(next_target_dev), 0)
-
-            print(f'Step {step}: Moving to {next_target_real.value} mm')
-            lib.CC_SetMoveAbsolutePosition(serial_num, next_target_dev)
-            time.sleep(0.25)
-            lib.CC_MoveAbsolute(serial_num)
-            time.sleep(2)
-
-            lib.CC_RequestPosition(serial_num)
-            time.sleep(0.2)
-            updated_dev_pos = c_int(lib.CC_GetPosition(serial_num))
-            updated_real_pos = c_double()
-            lib.CC_GetRealValueFromDeviceUnit(serial_num, updated_dev_pos, byref(updated_real_pos), 0)
-            print(f'Position after step {step}: {updated_real_pos.value} mm')
-
-            mean_power, std_power = measure_power(wavelength)
-            power_file.write(f"\n{step}\t{updated_real_pos.value:.2f}\t{mean_power:.5f}\t{std_power:.5f}")
-    
-    lib.CC_Close(serial_num)
+        # Saving, analysis and printing run on the pipeline's worker thread, overlapping with the next move
+        def save_point(point):
+            step, next_target_real, updated_real_pos, measurement = point
+            mean_power, std_power = measurement[:2]
+            if on_meter:
+                mean_power, std_power = mean_power * 1e3, std_power * 1e3
+            n_samples = measurement[2] if len(measurement) > 2 else N_READINGS
+            print(f'Step {step}: moved to {next_target_real} mm, position {updated_real_pos} mm')
+            print(f'Measured Power: {mean_power:.5f} ± {std_power:.5f} mW ({n_samples} readings)')
+            power_file.write(f"\n{step}\t{updated_real_pos:.4f}\t{mean_power:.5f}\t{std_power:.5f}\t{n_samples}")
+            edge.add(updated_real_pos, mean_power)
 
-# Function to measure power with error calculation
-def measure_power(wavelength):
-    rm = pyvisa.ResourceManager()
-    res_found = rm.list_resources('USB?*::0x1313::0x8078::?*::INSTR')
-    if not res_found:
-        raise Exception('Could not find the PM100D power meter.')
-    
-    meter = rm.open_resource(res_found[0])
-    meter.read_termination = '\n'
-    meter.write_termination = '\n'
-    meter.timeout = 2000
-    
-    meter.write('sense:power:unit mW')  # Ensure the power meter is set to milliwatts
-    meter.write('sense:power:range:auto 1')
-    meter.write(f'sense:correction:wavelength {wavelength}')
-    
-    readings = [meter.query_ascii_values('read?')[0] for _ in range(5)]
-    mean_power = np.mean(readings)
-    std_power = np.std(readings)
+        if range_lock is not None:
+            range_lock.lock()
+        try:
+            with AcquisitionPipeline(save_point) as pipeline:
+                for step, (_, _, next_target_real, updated_real_pos, measurement) in enumerate(points, start=1):
+                    pipeline.put((step, next_target_real, updated_real_pos, measurement))
+        finally:
+            if range_lock is not None:
+                range_lock.unlock()
+                print(f'Power range switches: {range_lock.switches}, step-ups after near-saturation: '
+                      f'{range_lock.step_ups}')
 
-    print(f'Measured Power: {mean_power:.5f} ± {std_power:.5f} mW')
-    return mean_power, std_power
+    print(f'Estimated beam radius (1/e^2, 10-90 %): {edge.width():.4f} mm')
+
+# Function to measure power with error calculation
+def measure_power(wavelength, on_meter=False, driver=TLPMX, avg_count=AVERAGE_COUNT):
+    # One-off measurement; scans keep a session open instead of reconnecting for every point
+    if on_meter:
+        with TLPMXSession(wavelength, avg_count=avg_count, driver=driver) as meter:
+            power, std = meter.read_power()
+            return power * 1e3, std * 1e3
+    with PowerMeterSession(wavelength) as meter:
+        return meter.read_power()
 
 class StageControlApp:
     def __init__(self, master):
@@ -90,18 +127,60 @@ class StageControlApp:
         self.steps_entry.grid(row=1, column=1, padx=10, pady=10)
 
         tk.Label(master, text="Direction:").grid(row=2, column=0, padx=10, pady=10)
-        self.direction_var = tk.StringVar(value="forward")
-        tk.Radiobutton(master, text="Forward", variable=self.direction_var, value="forward").grid(row=2, column=1, padx=10, pady=10, sticky="w")
-        tk.Radiobutton(master, text="Backward", variable=self.direction_var, value="backward").grid(row=3, column=1, padx=10, pady=10, sticky="w")
+        self.direction_var = tk.StringVar(value=FORWARD)
+        tk.Radiobutton(master, text="Forward", variable=self.direction_var, value=FORWARD).grid(row=2, column=1, padx=10, pady=10, sticky="w")
+        tk.Radiobutton(master, text="Backward", variable=self.direction_var, value=BACKWARD).grid(row=3, column=1, padx=10, pady=10, sticky="w")
+        tk.Radiobutton(master, text="Serpentine", variable=self.direction_var, value=SERPENTINE).grid(row=4, column=1, padx=10, pady=10, sticky="w")
+        
+        tk.Label(master, text="Number of Passes:").grid(row=5, column=0, padx=10, pady=10)
+        self.passes_entry = tk.Entry(master)
+        self.passes_entry.insert(0, "1")
+        self.passes_entry.grid(row=5, column=1, padx=10, pady=10)
+        
+        tk.Label(master, text="Backlash (mm):").grid(row=6, column=0, padx=10, pady=10)
+        self.backlash_entry = tk.Entry(master)
+        self.backlash_entry.insert(0, "0")
+        self.backlash_entry.grid(row=6, column=1, padx=10, pady=10)
         
-        tk.Label(master, text="Wavelength (nm):").grid(row=4, column=0, padx=10, pady=10)
+        tk.Label(master, text="Wavelength (nm):").grid(row=7, column=0, padx=10, pady=10)
         self.wavelength_entry = tk.Entry(master)
-        self.wavelength_entry.grid(row=4, column=1, padx=10, pady=10)
+        self.wavelength_entry.grid(row=7, column=1, padx=10, pady=10)
+        
+        tk.Label(master, text="Target Error (mW, optional):").grid(row=8, column=0, padx=10, pady=10)
+        self.target_error_entry = tk.Entry(master)
+        self.target_error_entry.grid(row=8, column=1, padx=10, pady=10)
+        
+        self.adaptive_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(master, text="Adaptive steps", variable=self.adaptive_var).grid(row=9, column=1, padx=10, pady=10, sticky="w")
+        
+        self.on_meter_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(master, text="On-meter averaging (TLPMX)", variable=self.on_meter_var).grid(row=10, column=1, padx=10, pady=10, sticky="w")
         
-        tk.Button(master, text="Select Save Folder", command=self.select_save_path).grid(row=5, column=0, columnspan=2, pady=10)
-        tk.Button(master, text="Move Stage", command=self.move_stage).grid(row=6, column=0, columnspan=2, pady=20)
+        self.fixed_ranges_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(master, text="Fixed ranges (pre-scan, TLPMX only)", variable=self.fixed_ranges_var).grid(row=11, column=1, padx=10, pady=10, sticky="w")
+        
+        self.hw_trigger_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(master, text="Hardware trigger (TLPMX, output 1 to trigger in)", variable=self.hw_trigger_var).grid(row=12, column=1, padx=10, pady=10, sticky="w")
+        
+        # The TLPMX DLL only exists for Windows; elsewhere the meter can be driven over SCPI
+        self.scpi_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(master, text="SCPI backend (TLPMX without the DLL)", variable=self.scpi_var).grid(row=13, column=1, padx=10, pady=10, sticky="w")
+        
+        tk.Label(master, text="Meter Averaging Count:").grid(row=14, column=0, padx=10, pady=10)
+        self.avg_count_entry = tk.Entry(master)
+        self.avg_count_entry.insert(0, str(AVERAGE_COUNT))
+        self.avg_count_entry.grid(row=14, column=1, padx=10, pady=10)
+        
+        tk.Button(master, text="Select Save Folder", command=self.select_save_path).grid(row=15, column=0, columnspan=2, pady=10)
+        tk.Button(master, text="Move Stage", command=self.move_stage).grid(row=16, column=0, columnspan=2, pady=20)
         
         self.save_path = ""
+        self.stage = StageController()
+        self.master.protocol("WM_DELETE_WINDOW", self.close)
+
+    def close(self):
+        self.stage.close()
+        self.master.destroy()
     
     def select_save_path(self):
         folder = filedialog.askdirectory()
@@ -121,24 +200,39 @@ class StageControlApp:
             n_steps = int(self.steps_entry.get())
             direction = self.direction_var.get()
             wavelength = float(self.wavelength_entry.get())
+            adaptive = self.adaptive_var.get()
+            on_meter = self.on_meter_var.get()
+            fixed_ranges = self.fixed_ranges_var.get()
+            hw_trigger = self.hw_trigger_var.get()
+            driver = ScpiTLPMX if self.scpi_var.get() else TLPMX
+            avg_count = int(self.avg_count_entry.get())
+            passes = int(self.passes_entry.get())
+            backlash = float(self.backlash_entry.get())
+            target_error = self.target_error_entry.get().strip()
+            target_error = float(target_error) if target_error else None
             
             if n_steps <= 0:
                 raise ValueError("Number of steps must be greater than zero.")
+            if passes <= 0:
+                raise ValueError("Number of passes must be greater than zero.")
+            if avg_count <= 0:
+                raise ValueError("Meter averaging count must be greater than zero.")
+            if target_error is not None and target_error <= 0:
+                raise ValueError("Target error must be greater than zero.")
+            if (fixed_ranges or hw_trigger or driver is ScpiTLPMX) and not on_meter:
+                raise ValueError("Fixed ranges, hardware triggers and the SCPI backend need on-meter averaging (TLPMX).")
+            if adaptive and (direction != FORWARD or passes != 1):
+                raise ValueError("Adaptive steps scan once from the current position to the target; "
+                                 "choose Forward and one pass.")
+            if hw_trigger and (adaptive or target_error is not None or fixed_ranges):
+                raise ValueError("Hardware-triggered scans take fixed steps, a fixed sample count and auto range.")
             if not self.save_path:
                 raise ValueError("Please select a folder to save the power data.")
             
-            os.add_dll_directory(r"C:\\Program Files\\Thorlabs\\Kinesis")
-            lib: CDLL = cdll.LoadLibrary("Thorlabs.MotionControl.TCube.DCServo.dll")
-            serial_num = c_char_p(b"83859973")
-            
-            if lib.TLI_BuildDeviceList() == 0:
-                lib.CC_Open(serial_num)
-                lib.CC_StartPolling(serial_num, c_int(200))
-                move_stage(serial_num, c_double(target_pos), n_steps, direction, self.save_path, wavelength)
-                lib.CC_Close(serial_num)
-                messagebox.showinfo("Success", "Stage movement complete!")
-            else:
-                messagebox.showerror("Error", "Device initialization failed.")
+            self.stage.open()
+            move_stage(self.stage, target_pos, n_steps, direction, self.save_path, wavelength, adaptive, passes,
+                       backlash, target_error, on_meter, fixed_ranges, hw_trigger, driver, avg_count)
+            messagebox.showinfo("Success", "Stage movement complete!")
         except Exception as e:
             messagebox.showerror("Error", str(e))
 
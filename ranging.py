@@ -0,0 +1,284 @@
+import json
+import os
+from bisect import bisect_left
+from ctypes import *
+
+import numpy as np
+
+from cachedir import cache_path
+from scan import FORWARD, scan
+from TLPMX import TLPM_ATTR_MAX_VAL, TLPM_ATTR_MIN_VAL, TLPM_ATTR_SET_VAL, TLPM_AUTORANGE_POWER_OFF, \
+    TLPM_AUTORANGE_POWER_ON
+
+PRESCAN_POINTS = 11
+RANGE_HEADROOM = 1.5  # the range must exceed the expected power by this factor
+MAX_RANGES = 32
+RANGE_CACHE = cache_path("ranges.json")
+
+
+def available_ranges(meter, channel):
+    """
+    Lists the power ranges of the connected sensor at the current wavelength.
+
+    Photodiode ranges are current ranges (`getCurrentRanges`) scaled by the ratio of the power and current
+    range in use. Other sensors get decade steps between the smallest and largest power range.
+    :param meter: open `TLPMX` session
+    :param channel: sensor channel (c_uint16)
+    :return: ascending NumPy array of range limits in W
+    """
+    power = c_double()
+    try:
+        current_ranges = (c_double * MAX_RANGES)()
+        count = c_uint16()
+        meter.getCurrentRanges(current_ranges, byref(count), channel)
+        current = c_double()
+        meter.getCurrentRange(c_int16(TLPM_ATTR_SET_VAL), byref(current), channel)
+        meter.getPowerRange(c_int16(TLPM_ATTR_SET_VAL), byref(power), channel)
+        if count.value and current.value > 0:
+            return np.sort(np.array(current_ranges[:count.value]) * power.value / current.value)
+    except NameError:
+        pass  # No photodiode sensor, or the meter does not list its ranges
+
+    meter.getPowerRange(c_int16(TLPM_ATTR_MIN_VAL), byref(power), channel)
+    smallest = power.value
+    meter.getPowerRange(c_int16(TLPM_ATTR_MAX_VAL), byref(power), channel)
+    largest = power.value
+    decades = np.arange(np.floor(np.log10(smallest)), np.ceil(np.log10(largest)) + 1)
+    return np.clip(10.0 ** decades, smallest, largest)
+
+
+class RangePlan:
+    """
+    Fixed power range to use at each position of a scan, planned from a pre-scan.
+
+    Every pre-scan point gets the smallest range that holds its power with `RANGE_HEADROOM`. Between two
+    pre-scan points the larger of their two ranges is used, so the range only changes where the pre-scan
+    showed that it has to.
+    """
+
+    def __init__(self, positions, ranges, span=None):
+        """
+        :param positions: pre-scan positions in mm
+        :param ranges: range limit in W for each position
+        :param span: (start, stop) in mm the pre-scan was planned for, by default the extent of `positions`
+        """
+        order = np.argsort(positions)
+        self.positions = [float(position) for position in np.asarray(positions)[order]]
+        self.ranges = [float(limit) for limit in np.asarray(ranges)[order]]
+        if span is None:
+            span = (self.positions[0], self.positions[-1])
+        self.span = (float(min(span)), float(max(span)))
+
+    @classmethod
+    def from_profile(cls, positions, powers, ranges, headroom=RANGE_HEADROOM, span=None):
+        """
+        Plans the ranges for a pre-scan profile.
+
+        :param positions: pre-scan positions in mm
+        :param powers: powers measured at the positions in W
+        :param ranges: available range limits in W (see `available_ranges`)
+        :param headroom: factor by which the range must exceed the power
+        :param span: (start, stop) in mm the pre-scan was planned for
+        :return: `RangePlan`
+        """
+        ranges = np.sort(np.asarray(ranges, dtype=float))
+        index = np.searchsorted(ranges, np.abs(np.asarray(powers, dtype=float)) * headroom)
+        return cls(positions, ranges[np.minimum(index, len(ranges) - 1)], span)
+
+    def range_at(self, position):
+        """
+        Returns the range limit in W to use at `position`.
+        """
+        index = bisect_left(self.positions, position)
+        if index < len(self.positions) and self.positions[index] == position:
+            return self.ranges[index]
+        neighbours = self.ranges[max(index - 1, 0):index + 1]
+        return max(neighbours)
+
+    def covers(self, start, stop):
+        """
+        Returns True if the pre-scan was planned over [start, stop] or a wider span. The planned span is
+        compared rather than the measured positions, which miss the endpoints by the settling error.
+        """
+        return self.span[0] <= min(start, stop) and self.span[1] >= max(start, stop)
+
+    def to_dict(self):
+        return {"positions": self.positions, "ranges": self.ranges, "span": list(self.span)}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["positions"], data["ranges"], data.get("span"))
+
+
+class RangeCache:
+    """
+    Range plans stored in a JSON file in the per-user cache directory, keyed by sensor serial number and
+    wavelength.
+    """
+
+    def __init__(self, path=RANGE_CACHE):
+        self.path = path
+        self.plans = {}
+        if os.path.exists(path):
+            with open(path) as cache_file:
+                self.plans = json.load(cache_file)
+
+    @staticmethod
+    def key(sensor_serial, wavelength):
+        return f"{sensor_serial}@{float(wavelength):g}nm"
+
+    def get(self, sensor_serial, wavelength):
+        """
+        Returns the cached `RangePlan`, or None.
+        """
+        data = self.plans.get(self.key(sensor_serial, wavelength))
+        return RangePlan.from_dict(data) if data is not None else None
+
+    def put(self, sensor_serial, wavelength, plan):
+        """
+        Stores a plan and writes the cache file.
+
+        :return: None
+        """
+        self.plans[self.key(sensor_serial, wavelength)] = plan.to_dict()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with open(self.path, "w") as cache_file:
+            json.dump(self.plans, cache_file, indent=1)
+
+
+def prescan(stage, session, start, stop, n_points=PRESCAN_POINTS):
+    """
+    Measures a coarse power profile over [start, stop] with auto range enabled.
+
+    :param stage: open `StageController`
+    :param session: `TLPMXSession`
+    :param start: scan start in mm
+    :param stop: scan end in mm
+    :param n_points: number of points including `start`
+    :return: (positions in mm, powers in W) as NumPy arrays
+    """
+    session.open()
+    session.meter.setPowerAutoRange(c_int16(TLPM_AUTORANGE_POWER_ON), session.channel)
+
+    stage.move_to(start)
+    positions = [stage.get_position()]
+    powers = [session.facade.power()]
+    for _, _, _, position, power in scan(stage, start, stop, n_points - 1, FORWARD, 1, 0.0, session.facade.power):
+        positions.append(position)
+        powers.append(power)
+    return np.array(positions), np.array(powers)
+
+
+class RangeLock:
+    """
+    Keeps auto range off during a scan and switches to the planned range at each position.
+
+    `setPowerRange` is only sent when the planned range differs from the one set, so a knife-edge scan
+    usually switches once or twice instead of whenever the meter's auto range decides to. A reading within
+    `RANGE_HEADROOM` of the full scale may be clipped, e.g. when a cached plan no longer matches the beam;
+    it is then repeated in the next larger range.
+    """
+
+    def __init__(self, session, plan, ranges=None, headroom=RANGE_HEADROOM):
+        """
+        :param session: `TLPMXSession`
+        :param plan: `RangePlan`
+        :param ranges: available range limits in W, by default read from the meter by `lock`
+        :param headroom: factor by which the range must exceed a reading for it to be trusted
+        """
+        self.session = session
+        self.plan = plan
+        self.ranges = None if ranges is None else np.sort(np.asarray(ranges, dtype=float))
+        self.headroom = headroom
+        self.current = None
+        self.switches = 0
+        self.step_ups = 0
+
+    def lock(self):
+        """
+        Turns auto range off.
+
+        :return: None
+        """
+        self.session.open()
+        if self.ranges is None:
+            self.ranges = available_ranges(self.session.meter, self.session.channel)
+        self.session.meter.setPowerAutoRange(c_int16(TLPM_AUTORANGE_POWER_OFF), self.session.channel)
+        self.current = None
+
+    def unlock(self):
+        """
+        Turns auto range back on.
+
+        :return: None
+        """
+        if self.session.is_open:
+            self.session.meter.setPowerAutoRange(c_int16(TLPM_AUTORANGE_POWER_ON), self.session.channel)
+        self.current = None
+
+    def set_range(self, limit):
+        """
+        Sets the range `limit` in W if it is not already set.
+
+        :return: None
+        """
+        if limit != self.current:
+            self.session.meter.setPowerRange(c_double(limit), self.session.channel)
+            self.current = limit
+            self.switches += 1
+
+    def apply(self, position):
+        """
+        Sets the planned range for `position` if it is not already set.
+
+        :return: range limit in W
+        """
+        limit = self.plan.range_at(position)
+        self.set_range(limit)
+        return limit
+
+    def measure(self, position, measure):
+        """
+        Measures at `position` in its planned range, stepping up while the reading may be clipped.
+
+        :param position: target or measured position of the point in mm, as known to the scan
+        :param measure: callable taking no arguments and returning the power in W, or a tuple starting with it
+        :return: the measurement
+        """
+        limit = self.apply(position)
+        while True:
+            measurement = measure()
+            power = measurement[0] if isinstance(measurement, tuple) else measurement
+            larger = self.ranges[self.ranges > limit]
+            if abs(power) * self.headroom < limit or not len(larger):
+                return measurement
+            limit = float(larger[0])
+            self.set_range(limit)
+            self.step_ups += 1
+
+
+def plan_ranges(stage, session, start, stop, cache=None, n_points=PRESCAN_POINTS):
+    """
+    Returns the range plan for a scan over [start, stop], from the cache or from a new pre-scan.
+
+    :param stage: open `StageController`
+    :param session: `TLPMXSession`
+    :param start: scan start in mm
+    :param stop: scan end in mm
+    :param cache: `RangeCache`, or None to always pre-scan
+    :param n_points: number of pre-scan points
+    :return: `RangePlan`
+    """
+    sensor_serial = None
+    if cache is not None:
+        _, sensor_serial = session.sensor_info()
+        plan = cache.get(sensor_serial, session.wavelength)
+        if plan is not None and plan.covers(start, stop):
+            return plan
+
+    positions, powers = prescan(stage, session, start, stop, n_points)
+    plan = RangePlan.from_profile(positions, powers, available_ranges(session.meter, session.channel),
+                                  span=(start, stop))
+    if cache is not None:
+        cache.put(sensor_serial, session.wavelength, plan)
+    return plan
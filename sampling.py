@@ -0,0 +1,66 @@
+import math
+
+MIN_COUNT = 3
+MAX_COUNT = 50
+
+
+class SequentialSampler:
+    """
+    Averages readings until the standard error of the mean is small enough.
+
+    Readings are taken one at a time. After `min_count` readings the sampler stops as soon as the standard
+    error of the mean falls below `target_sem` (absolute) or `relative_sem` times the mean, or when
+    `max_count` readings have been taken. Quiet points, like the plateaus of a knife-edge scan, then need
+    only a few readings, while noisy points near the edge get more. The number of readings per point is
+    kept in `counts`.
+    """
+
+    def __init__(self, read, target_sem=None, relative_sem=None, min_count=MIN_COUNT, max_count=MAX_COUNT):
+        """
+        :param read: callable taking no arguments and returning one reading
+        :param target_sem: standard error of the mean to reach, in the unit of the readings
+        :param relative_sem: standard error of the mean to reach, relative to the mean
+        :param min_count: readings taken before the error is checked, at least 2
+        :param max_count: largest number of readings per point
+        """
+        if target_sem is None and relative_sem is None:
+            raise ValueError("A target error (absolute or relative) is needed.")
+        if not 2 <= min_count <= max_count:
+            raise ValueError("Need 2 <= min_count <= max_count.")
+
+        self.read = read
+        self.target_sem = target_sem
+        self.relative_sem = relative_sem
+        self.min_count = min_count
+        self.max_count = max_count
+        self.counts = []
+
+    def __call__(self):
+        """
+        Takes readings until the stopping rule is met.
+
+        :return: (mean, standard deviation, number of readings)
+        """
+        # Welford's running mean and sum of squared deviations
+        n = 0
+        mean = 0.0
+        m2 = 0.0
+        while n < self.max_count:
+            value = self.read()
+            n += 1
+            delta = value - mean
+            mean += delta / n
+            m2 += delta * (value - mean)
+            if n >= self.min_count and self.converged(mean, math.sqrt(m2 / (n - 1) / n)):
+                break
+
+        self.counts.append(n)
+        return mean, math.sqrt(m2 / n), n
+
+    def converged(self, mean, sem):
+        """
+        Returns True if the standard error of the mean `sem` meets the target.
+        """
+        if self.target_sem is not None and sem <= self.target_sem:
+            return True
+        return self.relative_sem is not None and sem <= self.relative_sem * abs(mean)
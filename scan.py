@@ -0,0 +1,93 @@
+import numpy as np
+
+FORWARD = "forward"
+BACKWARD = "backward"
+SERPENTINE = "serpentine"
+MODES = (FORWARD, BACKWARD, SERPENTINE)
+POSITION_TOLERANCE = 1e-4  # mm, closer than this to the starting point of a pass counts as being there
+
+
+def plan_scan(start, stop, n_steps, mode=FORWARD, passes=1):
+    """
+    Plans the positions of a stepped scan over [start, stop].
+
+    Every pass moves `n_steps` equal steps away from its starting point, which is not measured itself.
+    Forward passes run from `start` to `stop`, backward passes from `stop` to `start` and serpentine
+    passes alternate between the two, so repeated passes need no return trip.
+    :param start: lower end of the scan range in mm
+    :param stop: upper end of the scan range in mm
+    :param n_steps: number of steps per pass
+    :param mode: FORWARD, BACKWARD or SERPENTINE
+    :param passes: number of passes
+    :return: list of (starting point, NumPy array of positions) per pass
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown scan mode '{mode}', expected one of {MODES}.")
+    if n_steps <= 0:
+        raise ValueError("Number of steps must be greater than zero.")
+
+    fractions = np.arange(1, n_steps + 1) / n_steps
+    forward = start + (stop - start) * fractions
+    backward = stop - (stop - start) * fractions
+
+    plan = []
+    for pass_index in range(passes):
+        if mode == BACKWARD or (mode == SERPENTINE and pass_index % 2):
+            plan.append((stop, backward))
+        else:
+            plan.append((start, forward))
+    return plan
+
+
+def move_with_backlash(stage, target, previous, backlash):
+    """
+    Moves to `target`, offsetting the commanded position by `backlash` if the move is in the negative direction.
+
+    :param stage: open `StageController`
+    :param target: load position to reach in mm
+    :param previous: load position in mm the stage moves from
+    :param backlash: backlash of the stage in mm
+    :return: correction in mm to add to a readback at `target` to get the load position
+    """
+    correction = backlash if target < previous else 0.0
+    stage.move_to(target - correction)
+    return correction
+
+
+def scan(stage, start, stop, n_steps, mode=FORWARD, passes=1, backlash=0.0, measure=None, range_lock=None):
+    """
+    Runs a stepped scan and yields every point as it is measured.
+
+    Passes that start away from the current position begin with a move to their starting point. Backlash
+    is compensated by offsetting the commanded position of moves in the negative direction by `backlash`
+    (`move_with_backlash`), the moves to the starting points included, and correcting their readback by
+    the same amount, so both directions report the load position.
+    :param stage: open `StageController`
+    :param start: lower end of the scan range in mm
+    :param stop: upper end of the scan range in mm
+    :param n_steps: number of steps per pass
+    :param mode: FORWARD, BACKWARD or SERPENTINE
+    :param passes: number of passes
+    :param backlash: backlash of the stage in mm
+    :param measure: optional callable taking no arguments, called at every point
+    :param range_lock: optional `ranging.RangeLock`; `measure` is then called through it, in the power range
+        planned for the measured position
+    :return: generator of (pass index, step, target position, measured position, measurement)
+    """
+    previous = stage.get_position()
+    for pass_index, (origin, targets) in enumerate(plan_scan(start, stop, n_steps, mode, passes)):
+        if abs(origin - previous) > POSITION_TOLERANCE:
+            move_with_backlash(stage, origin, previous, backlash)
+            previous = origin
+
+        for step, target in enumerate(targets.tolist(), start=1):
+            correction = move_with_backlash(stage, target, previous, backlash)
+            position = stage.get_position() + correction
+            previous = target
+            if measure is None:
+                measurement = None
+            elif range_lock is not None:
+                measurement = range_lock.measure(position, measure)
+            else:
+                measurement = measure()
+            yield pass_index, step, target, position, measurement
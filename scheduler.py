@@ -0,0 +1,111 @@
+from bisect import insort
+
+from scan import move_with_backlash
+
+
+class AdaptiveStepScheduler:
+    """
+    Plans the positions of a knife-edge scan from the power measured so far.
+
+    A coarse uniform pass over [start, stop] is made first. Every further point bisects the interval
+    between two measured positions across which the power changes the most, so the point budget is spent
+    on the edge transition and the flat fully-blocked and fully-open plateaus only get the coarse steps.
+
+    Iterate over the scheduler to get the positions to visit and call `add` with the measured position and
+    power after each one.
+    """
+
+    def __init__(self, start, stop, n_points, n_coarse=None, min_step=0.001, plateau_weight=0.05):
+        """
+        :param start: scan start in mm
+        :param stop: scan end in mm
+        :param n_points: total number of points to measure
+        :param n_coarse: number of points of the initial uniform pass, by default a quarter of `n_points`
+        :param min_step: intervals narrower than this (mm) are not split further
+        :param plateau_weight: weight of the interval width relative to the power change, keeps some
+            points on the plateaus
+        """
+        if n_coarse is None:
+            n_coarse = max(3, n_points // 4)
+        n_coarse = min(n_coarse, n_points)
+        if n_coarse < 2:
+            raise ValueError("At least two points are needed for a scan.")
+
+        self.start = start
+        self.stop = stop
+        self.n_points = n_points
+        self.min_step = min_step
+        self.plateau_weight = plateau_weight
+        self.coarse = [start + i * (stop - start) / (n_coarse - 1) for i in range(n_coarse)]
+        self.points = []  # (position, power), sorted by position
+
+    def __iter__(self):
+        while True:
+            position = self.next_position()
+            if position is None:
+                return
+            yield position
+
+    def add(self, position, power):
+        """
+        Records the power measured at a position.
+
+        :return: None
+        """
+        insort(self.points, (position, power))
+
+    def next_position(self):
+        """
+        Returns the next position to measure, or None once the point budget is spent.
+        """
+        n_measured = len(self.points)
+        if n_measured >= self.n_points:
+            return None
+        if n_measured < len(self.coarse):
+            return self.coarse[n_measured]
+
+        powers = [power for _, power in self.points]
+        power_range = (max(powers) - min(powers)) or 1.0
+        width_range = abs(self.stop - self.start) or 1.0
+
+        best_score = None
+        best_position = None
+        for (x0, p0), (x1, p1) in zip(self.points, self.points[1:]):
+            width = x1 - x0
+            if width < 2 * self.min_step:
+                continue
+            score = abs(p1 - p0) / power_range + self.plateau_weight * width / width_range
+            if best_score is None or score > best_score:
+                best_score = score
+                best_position = (x0 + x1) / 2
+
+        return best_position
+
+    def profile(self):
+        """
+        Returns the measured (positions, powers), sorted by position.
+        """
+        return [position for position, _ in self.points], [power for _, power in self.points]
+
+
+def adaptive_scan(stage, scheduler, measure, range_lock=None, backlash=0.0):
+    """
+    Runs a scan with the positions chosen by `scheduler` and yields every point as it is measured.
+
+    The scheduler bisects intervals on both sides of the last point, so moves go back and forth; backlash
+    is compensated on the negative ones as in `scan.scan`.
+    :param stage: open `StageController`
+    :param scheduler: `AdaptiveStepScheduler`
+    :param measure: callable taking no arguments and returning the power, or a tuple starting with it
+    :param range_lock: optional `ranging.RangeLock` setting the planned power range before each measurement
+    :param backlash: backlash of the stage in mm
+    :return: generator of (pass index, step, target position, measured position, measurement), like `scan.scan`
+    """
+    previous = stage.get_position()
+    for step, target in enumerate(scheduler, start=1):
+        correction = move_with_backlash(stage, target, previous, backlash)
+        position = stage.get_position() + correction
+        previous = target
+        measurement = range_lock.measure(position, measure) if range_lock is not None else measure()
+        scheduler.add(position, measurement[0] if isinstance(measurement, tuple) else measurement)
+        yield 0, step, target, position, measurement
@@ -0,0 +1,127 @@
+from ctypes import *
+
+MAX_MESSAGE = 256  # characters per message, within the input buffer of the PM100 series
+READ_BUFFER = 1024  # bytes per readRaw call
+
+
+def values(answer):
+    """
+    Converts a comma-separated answer to a list of floats, for `ScpiBatch.query`.
+    """
+    return [float(value) for value in answer.split(",")]
+
+
+class RawTransport:
+    """
+    Message transport over `TLPMX.writeRaw`/`readRaw`, for sending a `ScpiBatch` through the driver.
+
+    A pyvisa resource needs no adapter: it already has `write(message)` and `read()`.
+    """
+
+    def __init__(self, meter, buffer_size=READ_BUFFER):
+        """
+        :param meter: open `TLPMX` session (or `tlpmx_scpi.ScpiTLPMX`)
+        :param buffer_size: bytes per readRaw call
+        """
+        self.meter = meter
+        self.buffer = create_string_buffer(buffer_size)
+        self.size = c_uint32(buffer_size)
+        self.count = c_uint32()
+
+    def write(self, message):
+        self.meter.writeRaw(c_char_p((message + "\n").encode()))
+
+    def read(self):
+        """
+        Reads one answer, in several readRaw calls if it is longer than the buffer.
+
+        :return: answer without the line termination
+        """
+        data = b""
+        while True:
+            self.meter.readRaw(self.buffer, self.size, byref(self.count))
+            data += self.buffer.raw[:self.count.value]
+            if data.endswith(b"\n") or self.count.value < self.size.value:
+                return data.decode().strip()
+
+
+class ScpiBatch:
+    """
+    Queue of SCPI commands and queries sent as semicolon-chained messages.
+
+    Each message costs one round trip however many commands it holds, so a session setup or the group of
+    queries taken at every point becomes a single transaction. Commands are sent with a leading colon, so
+    each one starts from the root of the command tree, and the answers of the queries in a message, which
+    the meter separates by semicolons, are split and converted in order.
+    """
+
+    def __init__(self, max_message=MAX_MESSAGE):
+        """
+        :param max_message: longest message in characters; longer batches are split into several messages
+        """
+        self.max_message = max_message
+        self.commands = []
+
+    def __len__(self):
+        return len(self.commands)
+
+    def write(self, command):
+        """
+        Queues a command without an answer.
+
+        :return: the batch, for chaining
+        """
+        self.commands.append((command, None))
+        return self
+
+    def query(self, command, convert=str):
+        """
+        Queues a query.
+
+        :param command: query, ending with '?'
+        :param convert: callable converting the answer string, e.g. float or `values`
+        :return: the batch, for chaining
+        """
+        self.commands.append((command, convert))
+        return self
+
+    def messages(self):
+        """
+        Joins the queued commands into messages.
+
+        :return: list of (message, converters of the queries in the message)
+        """
+        messages = []
+        parts = []
+        converters = []
+        for command, convert in self.commands:
+            command = command.strip()
+            part = command if command.startswith("*") else ":" + command.lstrip(":")
+            if parts and len(";".join(parts)) + 1 + len(part) > self.max_message:
+                messages.append((";".join(parts), converters))
+                parts, converters = [], []
+            parts.append(part)
+            if convert is not None:
+                converters.append(convert)
+        if parts:
+            messages.append((";".join(parts), converters))
+        return messages
+
+    def send(self, transport):
+        """
+        Sends the queued commands and reads the answers. The queue is emptied once all messages went through.
+
+        :param transport: object with `write(message)` and `read()`, like a pyvisa resource or `RawTransport`
+        :return: list of the converted answers of the queries, in the order they were queued
+        """
+        answers = []
+        for message, converters in self.messages():
+            transport.write(message)
+            if not converters:
+                continue
+            fields = transport.read().split(";")
+            if len(fields) != len(converters):
+                raise ValueError(f"Expected {len(converters)} answers to '{message}', got {len(fields)}.")
+            answers.extend(convert(field.strip()) for convert, field in zip(converters, fields))
+        self.commands = []
+        return answers
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from kinesis import StageController
+from kinesis_sim import SimulatedDCServo
+from powr_linearStageGUI import move_stage
+from scan import BACKWARD, FORWARD
+from scheduler import AdaptiveStepScheduler, adaptive_scan
+
+
+def edge(position, center=1.0, width=0.05):
+    return 1.0 / (1.0 + np.exp(-(position - center) / width))
+
+
+def run(scheduler):
+    for position in scheduler:
+        scheduler.add(position, edge(position))
+    return scheduler.profile()
+
+
+def test_coarse_pass_first():
+    scheduler = AdaptiveStepScheduler(0.0, 2.0, 20, n_coarse=5)
+    assert scheduler.coarse == [0.0, 0.5, 1.0, 1.5, 2.0]
+    assert scheduler.next_position() == 0.0
+
+
+def test_spends_the_budget_on_the_edge():
+    positions, _ = run(AdaptiveStepScheduler(0.0, 2.0, 40, n_coarse=5))
+    assert len(positions) == 40
+    near_edge = sum(abs(position - 1.0) < 0.25 for position in positions)
+    assert near_edge > len(positions) / 2
+
+
+def test_respects_min_step():
+    positions, _ = run(AdaptiveStepScheduler(0.0, 2.0, 200, n_coarse=5, min_step=0.01))
+    assert np.min(np.diff(positions)) >= 0.01 - 1e-12
+    assert len(positions) < 200
+
+
+def test_needs_two_points():
+    with pytest.raises(ValueError):
+        AdaptiveStepScheduler(0.0, 1.0, 1)
+
+
+class RecordingStage:
+    """
+    Stage stand-in that records the commanded positions and reports them back.
+    """
+
+    def __init__(self, position=0.0):
+        self.position = position
+        self.moves = []
+
+    def get_position(self):
+        return self.position
+
+    def move_to(self, position):
+        self.moves.append(position)
+        self.position = position
+
+
+def test_adaptive_scan_compensates_backlash():
+    stage = RecordingStage()
+    scheduler = AdaptiveStepScheduler(0.0, 2.0, 10, n_coarse=5)
+    points = list(adaptive_scan(stage, scheduler, lambda: edge(stage.position), backlash=0.1))
+
+    targets = [target for _, _, target, _, _ in points]
+    for previous, target, move, (_, _, _, position, _) in zip([0.0] + targets, targets, stage.moves, points):
+        assert move == pytest.approx(target - 0.1 if target < previous else target)
+        assert position == pytest.approx(target)
+    assert any(target < previous for previous, target in zip(targets, targets[1:]))
+
+
+@pytest.mark.parametrize("direction, passes", [(BACKWARD, 1), (FORWARD, 2)])
+def test_adaptive_gui_scan_rejects_direction_and_passes(tmp_path, direction, passes):
+    with StageController(simulate=SimulatedDCServo(time_scale=50)) as stage:
+        with pytest.raises(ValueError):
+            move_stage(stage, 1.0, 10, direction, tmp_path / "scan.txt", 1064, adaptive=True, passes=passes)
@@ -0,0 +1,56 @@
+from ctypes import *
+
+import numpy as np
+import pytest
+
+from kinesis_sim import SimulatedClock
+from powermeter_sim import SimulatedPowerMeter
+from tlpmx_arrays import FAST_ARRAY_SIZE, SEQUENCE_BLOCK, ArrayReader
+
+
+@pytest.fixture
+def meter():
+    driver = SimulatedPowerMeter(clock=SimulatedClock(time_scale=100), seed=0).tlpmx()
+    driver.open(None, False, False)
+    yield driver
+    driver.close()
+
+
+def test_buffers_are_shared_with_the_driver(meter):
+    reader = ArrayReader(meter, size=1000)
+    assert np.shares_memory(reader.values, np.frombuffer(reader._values, np.float32))
+    assert np.shares_memory(reader.raw_timestamps, np.frombuffer(reader._raw_timestamps, np.uint32))
+
+
+def test_full_buffer_burst(meter):
+    size = 500
+    reader = ArrayReader(meter, size=size)
+    meter.confBurstArrayMeasTrigger(c_uint32(0), c_uint32(0), c_uint32(size), c_uint32(1))
+    meter.startBurstArrayMeasurement()
+    meter.trigger()
+    while reader.burst_count() < size:
+        meter.meter.sleep(0.01)
+    timestamps, values, values2 = reader.burst(0, size)
+    assert len(timestamps) == len(values) == len(values2) == size
+    assert np.all(np.diff(timestamps.astype(np.int64)) >= 0)
+    with pytest.raises(ValueError):
+        reader.burst(0, size + 1)
+
+
+def test_fast_array_returns_views(meter):
+    reader = ArrayReader(meter)
+    meter.confPowerFastArrayMeasurement(c_uint16(1))
+    meter.meter.sleep(0.05)
+    timestamps, values = reader.fast_array()
+    assert 0 < len(values) <= FAST_ARRAY_SIZE
+    assert timestamps[0] == 0 and np.all(np.diff(timestamps.astype(np.int64)) > 0)
+    assert np.shares_memory(values, reader.values)
+
+
+def test_sequence(meter):
+    reader = ArrayReader(meter)
+    meter.confPowerMeasurementSequence(c_uint32(2), c_uint16(1))
+    meter.startMeasurementSequence(c_uint32(0), c_bool(False))
+    timestamps, values, _ = reader.sequence(2)
+    assert len(values) == 2 * SEQUENCE_BLOCK
+    assert np.all(np.diff(timestamps) > 0)
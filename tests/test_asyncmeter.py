@@ -0,0 +1,64 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from asyncmeter import AsyncPowerMeter, read_powers
+from powermeter import TLPMXSession
+from powermeter_sim import GaussianBeam, SimulatedPowerMeter
+
+LATENCY = 0.05  # s per driver call, long enough to dominate the test's own overhead
+
+
+def session(resource, beam=None):
+    meter = SimulatedPowerMeter(beam=beam, latency=LATENCY, seed=0)
+    return TLPMXSession(1064, resource=resource, burst_std=False, driver=meter.tlpmx)
+
+
+async def timed_reads(meters, n_points):
+    started = time.perf_counter()
+    for _ in range(n_points):
+        powers = await read_powers(meters)
+    return powers, time.perf_counter() - started
+
+
+def test_meters_are_read_concurrently():
+    async def run():
+        async with AsyncPowerMeter(session(b"meter1", GaussianBeam(power=1e-3))) as first, \
+                AsyncPowerMeter(session(b"meter2", GaussianBeam(power=2e-3))) as second:
+            _, single = await timed_reads([first], 5)
+            powers, both = await timed_reads([first, second], 5)
+        return powers, single, both
+
+    powers, single, both = asyncio.run(run())
+    assert powers[1] / powers[0] == pytest.approx(2, rel=0.05)
+    assert both < 1.5 * single  # the slowest meter sets the pace, not the sum of both
+
+
+def test_calls_to_one_meter_run_in_order_on_its_thread():
+    threads = []
+    order = []
+
+    def record(index):
+        threads.append(threading.current_thread().name)
+        time.sleep(0.01 * (3 - index))  # later calls finish faster if run in parallel
+        order.append(index)
+
+    async def run():
+        async with AsyncPowerMeter(session(b"meter1")) as meter:
+            await asyncio.gather(*(meter.run(record, index) for index in range(3)))
+
+    asyncio.run(run())
+    assert order == [0, 1, 2]
+    assert set(threads) == {threads[0]} and threads[0].startswith("meter-meter1")
+
+
+def test_dual_channel_reads_signal_and_reference():
+    async def run():
+        async with AsyncPowerMeter(session(b"meter1", GaussianBeam(power=1e-3, center=1.0))) as meter:
+            return await meter.dual_channel()
+
+    signal, reference = asyncio.run(run())
+    assert reference == pytest.approx(1e-3, rel=0.05)
+    assert signal == pytest.approx(0.5e-3, rel=0.05)  # the edge stays at the beam center
@@ -0,0 +1,105 @@
+from ctypes import *
+
+import numpy as np
+import pytest
+
+from analysis import knife_edge_width
+from hwtrigger import TriggerOutput, triggered_capture
+from kinesis import StageController
+from kinesis_sim import SimulatedClock, SimulatedDCServo
+from powermeter_sim import GaussianBeam, SimulatedPowerMeter
+from tlpmx_arrays import ArrayReader, BurstRing, ChunkTuner, burst_blocks
+
+BEAM = dict(power=1e-3, radius=0.1, center=1.0)
+
+
+def test_chunk_tuner_doubles_until_fitted():
+    tuner = ChunkTuner(initial=100, min_chunk=100, max_chunk=10000)
+    tuner.record(100, 0.01)
+    assert tuner.chunk_size == 200
+
+
+def test_chunk_tuner_fits_latency_and_bandwidth():
+    latency, seconds_per_sample = 0.002, 1e-6
+    tuner = ChunkTuner(min_chunk=100, max_chunk=100000, efficiency=0.9)
+    for n in (100, 200, 400, 800):
+        tuner.record(n, latency + n * seconds_per_sample)
+    # Smallest chunk reaching 90 % of the bandwidth: 0.9 / 0.1 * latency / seconds_per_sample
+    assert abs(tuner.chunk_size - 18000) <= 1
+    assert tuner.throughput() > 0
+
+
+def test_chunk_tuner_goes_large_when_size_does_not_cost_time():
+    tuner = ChunkTuner(min_chunk=100, max_chunk=5000)
+    tuner.record(100, 2e-4)
+    tuner.record(200, 1e-4)
+    assert tuner.chunk_size == 5000
+
+
+def block(first, n):
+    indices = np.arange(first, first + n)
+    return indices.astype(np.uint32), indices.astype(np.float32), -indices.astype(np.float32)
+
+
+def test_burst_ring_before_wraparound():
+    ring = BurstRing(8)
+    ring.extend(*block(0, 5))
+    timestamps, values, values2 = ring.latest()
+    assert len(ring) == 5
+    np.testing.assert_array_equal(values, np.arange(5))
+    np.testing.assert_array_equal(values2, -np.arange(5))
+
+
+def test_burst_ring_wraparound_keeps_latest_in_order():
+    ring = BurstRing(8)
+    for first in range(0, 15, 5):
+        ring.extend(*block(first, 5))
+    timestamps, values, _ = ring.latest()
+    assert len(ring) == 8 and ring.total == 15
+    np.testing.assert_array_equal(values, np.arange(7, 15))
+    np.testing.assert_array_equal(timestamps, np.arange(7, 15))
+
+
+def test_burst_ring_block_larger_than_capacity():
+    ring = BurstRing(4)
+    ring.extend(*block(0, 3))
+    ring.extend(*block(3, 10))
+    _, values, _ = ring.latest()
+    np.testing.assert_array_equal(values, np.arange(9, 13))
+    ring.extend(*block(13, 1))
+    _, values, _ = ring.latest()
+    np.testing.assert_array_equal(values, np.arange(10, 14))
+
+
+def test_burst_blocks_read_all_samples_in_tuned_chunks():
+    meter = SimulatedPowerMeter(clock=SimulatedClock(time_scale=100), seed=0).tlpmx()
+    meter.open(None, False, False)
+    total = 5000
+    meter.confBurstArrayMeasTrigger(c_uint32(0), c_uint32(0), c_uint32(total), c_uint32(1))
+    reader = ArrayReader(meter, size=1000)
+    tuner = ChunkTuner(max_chunk=reader.size)
+    meter.startBurstArrayMeasurement()
+    meter.trigger()
+    blocks = burst_blocks(reader, total, tuner, start=False, clock=(meter.meter.now, meter.meter.sleep))
+
+    ring = BurstRing(2000)
+    sizes = []
+    for timestamps, values, values2 in blocks:
+        assert np.shares_memory(values, reader.values)  # no per-block allocation
+        sizes.append(len(values))
+        ring.extend(timestamps, values, values2)
+    assert sum(sizes) == total and max(sizes) <= reader.size
+    assert ring.total == total and len(ring) == 2000
+    assert np.all(np.diff(ring.latest()[0].astype(np.int64)) > 0)
+
+
+def test_triggered_capture_recovers_radius():
+    simulator = SimulatedDCServo(time_scale=20, seed=0)
+    meter = SimulatedPowerMeter.for_stage(simulator, beam=GaussianBeam(**BEAM), seed=0)
+    driver = meter.tlpmx()
+    driver.open(None, False, False)
+    with StageController(simulate=simulator) as stage:
+        stage.move_to(0.5)
+        positions, powers, _ = triggered_capture(stage, driver, TriggerOutput(driver), 1.5)
+    assert knife_edge_width(positions, powers) == pytest.approx(BEAM["radius"], abs=0.005)
+    assert np.median(np.abs(powers - meter.beam.transmitted(positions))) < 1e-5
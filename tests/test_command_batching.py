@@ -0,0 +1,125 @@
+import pytest
+
+from powermeter import PowerMeterSession
+from powermeter_sim import SimulatedInstrument, SimulatedPowerMeter, SimulatedResourceManager
+from scpi_batch import RawTransport, ScpiBatch, values
+
+
+class EchoTransport:
+    """
+    Transport answering every query with its position in the message.
+    """
+
+    def __init__(self):
+        self.messages = []
+
+    def write(self, message):
+        self.messages.append(message)
+
+    def read(self):
+        queries = [part for part in self.messages[-1].split(";") if part.endswith("?")]
+        return ";".join(str(i + 1) for i in range(len(queries)))
+
+
+def test_messages_join_commands_from_the_root():
+    batch = ScpiBatch().write("sense:power:unit W").write("*CLS").query("read?", float)
+    (message, converters), = batch.messages()
+    assert message == ":sense:power:unit W;*CLS;:read?"
+    assert converters == [float]
+
+
+def test_messages_split_at_max_message():
+    batch = ScpiBatch(max_message=21)
+    for _ in range(4):
+        batch.query("meas:pow?", float)
+    messages = batch.messages()
+    assert [message for message, _ in messages] == [":meas:pow?;:meas:pow?", ":meas:pow?;:meas:pow?"]
+    assert all(len(message) <= 21 for message, _ in messages)
+
+
+def test_send_converts_answers_in_order_and_empties_queue():
+    transport = EchoTransport()
+    batch = ScpiBatch(max_message=25).write("conf:pow").query("read?", float).query("read?", int).query("x?")
+    assert batch.send(transport) == [1.0, 2, "1"]
+    assert len(transport.messages) == 2
+    assert len(batch) == 0
+
+
+def test_send_writes_without_reading_when_there_are_no_queries():
+    class WriteOnly(EchoTransport):
+        def read(self):
+            raise AssertionError("nothing to read")
+
+    assert ScpiBatch().write("*RST").send(WriteOnly()) == []
+
+
+def test_send_checks_answer_count():
+    class Short(EchoTransport):
+        def read(self):
+            return "1"
+
+    with pytest.raises(ValueError):
+        ScpiBatch().query("a?").query("b?").send(Short())
+
+
+def test_values():
+    assert values("1,2.5,-3e-3") == [1.0, 2.5, -0.003]
+
+
+class CountingRawMeter:
+    """
+    `SimulatedTLPMX` wrapper counting writeRaw calls.
+    """
+
+    def __init__(self, meter):
+        self.meter = meter
+        self.writes = 0
+
+    def writeRaw(self, command):
+        self.writes += 1
+        return self.meter.writeRaw(command)
+
+    def readRaw(self, buffer, size, returnCount):
+        return self.meter.readRaw(buffer, size, returnCount)
+
+
+@pytest.fixture
+def meter():
+    return SimulatedPowerMeter(seed=0, latency=0)
+
+
+def test_raw_transport_sends_one_message(meter):
+    driver = meter.tlpmx()
+    driver.open(None, False, False)
+    raw = CountingRawMeter(driver)
+    batch = ScpiBatch().write("sense:correction:wavelength 633").write("sense:average:count 10")
+    batch.query("sense:correction:wavelength?", float).query("sense:average:count?", int).query("*IDN?")
+    wavelength, count, idn = batch.send(RawTransport(raw))
+    assert (wavelength, count) == (633.0, 10) and idn.startswith("Thorlabs")
+    assert raw.writes == 1
+
+
+def test_raw_transport_reads_long_answers_in_parts(meter):
+    driver = meter.tlpmx()
+    driver.open(None, False, False)
+    transport = RawTransport(driver, buffer_size=8)
+    transport.write("*IDN?;*IDN?")
+    assert transport.read() == ";".join(2 * [meter.scpi("*IDN?")])
+
+
+def test_session_configures_and_reads_in_one_message_each(meter):
+    messages = []
+
+    class Recording(SimulatedInstrument):
+        def write(self, message):
+            messages.append(message)
+            super().write(message)
+
+    class Manager(SimulatedResourceManager):
+        def open_resource(self, resource_name):
+            return Recording(super().open_resource(resource_name).meter)
+
+    with PowerMeterSession(1064, average_count=20, resource_manager=Manager(meter)) as session:
+        assert len(messages) == 1 and meter.avg_count == 20
+        session.read_power(n_readings=5)
+    assert len(messages) == 2 and messages[1].count("read?") == 5
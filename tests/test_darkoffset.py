@@ -0,0 +1,43 @@
+import time
+
+import pytest
+
+from darkoffset import DarkOffsetCache
+from kinesis_sim import SimulatedClock
+from powermeter import TLPMXSession
+from powermeter_sim import DARK_CURRENT, SENSOR_SERIAL, SimulatedPowerMeter
+
+
+@pytest.fixture
+def meter():
+    return SimulatedPowerMeter(clock=SimulatedClock(time_scale=100), seed=0)
+
+
+def test_measured_offset_is_applied_by_later_sessions(meter, tmp_path):
+    cache = DarkOffsetCache(tmp_path / "cache" / "dark_offsets.json")
+    with TLPMXSession(1064, driver=meter.tlpmx) as session:
+        offset = cache.measure(session)
+    assert offset == pytest.approx(DARK_CURRENT, rel=0.1)
+
+    meter.dark_offset = 0.0
+    with TLPMXSession(1064, driver=meter.tlpmx, dark_offsets=DarkOffsetCache(cache.path)) as session:
+        assert session.dark_offset_applied
+    assert meter.dark_offset == offset
+
+
+def test_offset_is_keyed_by_sensor_and_wavelength(tmp_path):
+    cache = DarkOffsetCache(tmp_path / "dark_offsets.json")
+    cache.put(SENSOR_SERIAL, 1064, 1e-9)
+    assert cache.get(SENSOR_SERIAL, 1064.0) == 1e-9
+    assert cache.get(SENSOR_SERIAL, 532) is None
+    assert cache.get("other", 1064) is None
+
+
+def test_expired_offset_is_not_applied(meter, tmp_path, capsys):
+    cache = DarkOffsetCache(tmp_path / "dark_offsets.json", max_age=60)
+    cache.put(SENSOR_SERIAL, 1064, 1e-9)
+    cache.offsets[cache.key(SENSOR_SERIAL, 1064)]["time"] = time.time() - 120
+    with TLPMXSession(1064, driver=meter.tlpmx, dark_offsets=cache) as session:
+        assert not session.dark_offset_applied
+    assert meter.dark_offset == 0.0
+    assert capsys.readouterr().out == ""  # reporting the miss is left to the caller
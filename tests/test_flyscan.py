@@ -0,0 +1,44 @@
+import pytest
+
+from bench_scan import bench_fly_scan
+from flyscan import fly_scan
+from kinesis import StageController
+from kinesis_sim import SimulatedDCServo
+from powermeter_sim import GaussianBeam, SimulatedPowerMeter
+
+BEAM = dict(power=1e-3, radius=0.1, center=1.0)
+
+
+@pytest.fixture
+def bench():
+    simulator = SimulatedDCServo(time_scale=20, seed=0)
+    power_meter = SimulatedPowerMeter.for_stage(simulator, beam=GaussianBeam(**BEAM), seed=0)
+    meter = power_meter.tlpmx()
+    meter.open(None, False, False)
+    with StageController(simulate=simulator) as stage:
+        yield stage, power_meter, meter
+    meter.close()
+
+
+def test_fly_scan_recovers_radius():
+    _, error, estimate = bench_fly_scan(0.7, 1.3, beam=GaussianBeam(**BEAM))
+    assert estimate == pytest.approx(BEAM["radius"], abs=0.005)
+    assert error < 1e-5
+
+
+def test_fly_scan_restores_stage_and_meter(bench):
+    stage, power_meter, meter = bench
+    velocity = stage.get_velocity()
+    polling = stage.polling_interval
+    fly_scan(stage, meter, 0.9, 1.1, 0.5, 1.0)
+    assert stage.get_velocity() == pytest.approx(velocity)
+    assert stage.polling_interval == polling
+    assert not power_meter.array_mode
+
+
+def test_fly_scan_times_out_on_stalled_move(bench, monkeypatch):
+    stage, power_meter, meter = bench
+    monkeypatch.setattr(stage, "is_move_complete", lambda target_dev=None: False)
+    with pytest.raises(TimeoutError):
+        fly_scan(stage, meter, 0.9, 1.1, 0.5, 1.0, timeout=0.1)
+    assert not power_meter.array_mode
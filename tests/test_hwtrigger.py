@@ -0,0 +1,63 @@
+import pytest
+
+from analysis import knife_edge_width
+from hwtrigger import TriggerOutput, triggered_scan
+from kinesis import StageController
+from kinesis_sim import SimulatedDCServo
+from powermeter_sim import GaussianBeam, SimulatedPowerMeter
+
+BEAM = dict(power=1e-3, radius=0.1, center=1.0)
+RADIUS_TOLERANCE = 0.02  # mm, the 10-90 % estimate of a 20-point scan
+
+
+class UnwiredTrigger(TriggerOutput):
+    """
+    Trigger output whose pin is not connected to the trigger input.
+    """
+
+    def pulse(self):
+        pass
+
+
+@pytest.fixture
+def bench():
+    simulator = SimulatedDCServo(time_scale=20, seed=0)
+    meter = SimulatedPowerMeter.for_stage(simulator, beam=GaussianBeam(**BEAM), seed=0)
+    driver = meter.tlpmx()
+    driver.open(None, False, False)
+    with StageController(simulate=simulator) as stage:
+        stage.move_to(0.5)
+        yield stage, driver
+
+
+def test_trigger_pin_must_exist(bench):
+    _, driver = bench
+    for pin in (0, 5):
+        with pytest.raises(ValueError):
+            TriggerOutput(driver, pin)
+
+
+def test_pulse_triggers_armed_burst(bench):
+    _, driver = bench
+    trigger = TriggerOutput(driver, pin=2)
+    trigger.configure()
+    driver.startBurstArrayMeasurement()
+    trigger.pulse()
+    trigger.pulse()
+    assert len(driver.burst_times) == 2
+    assert driver.outputs == [0, 0, 0, 0]
+
+
+def test_triggered_scan_recovers_radius(bench):
+    stage, driver = bench
+    points = list(triggered_scan(stage, driver, TriggerOutput(driver), 0.5, 1.5, 20))
+    positions = [position for _, _, _, position, _ in points]
+    powers = [measurement[0] for _, _, _, _, measurement in points]
+    assert knife_edge_width(positions, powers) == pytest.approx(BEAM["radius"], abs=RADIUS_TOLERANCE)
+    assert all(measurement[2] == 10 for _, _, _, _, measurement in points)
+
+
+def test_triggered_scan_times_out_without_trigger(bench):
+    stage, driver = bench
+    with pytest.raises(TimeoutError, match="trigger"):
+        next(triggered_scan(stage, driver, UnwiredTrigger(driver), 0.5, 1.5, 20))
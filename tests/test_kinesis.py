@@ -0,0 +1,29 @@
+import pytest
+
+from kinesis import StageController, wait_for_move
+from kinesis_sim import SimulatedDCServo
+
+
+@pytest.fixture
+def stage():
+    with StageController(simulate=SimulatedDCServo(time_scale=50, seed=0)) as stage:
+        yield stage
+
+
+def test_move_to_returns_once_settled(stage):
+    stage.move_to(0.5)
+    assert abs(stage.get_position() - 0.5) < 1e-3
+
+
+def test_start_move_completes_without_blocking(stage):
+    target_dev = stage.start_move(0.2)
+    assert not stage.is_move_complete(target_dev)
+    wait_for_move(stage.lib, stage.serial_num, target_dev)
+    assert abs(stage.get_position() - 0.2) < 1e-3
+
+
+def test_wait_for_move_times_out(stage):
+    stage.set_velocity(0.1, 1.0)
+    target_dev = stage.start_move(2.0)
+    with pytest.raises(TimeoutError):
+        wait_for_move(stage.lib, stage.serial_num, target_dev, timeout=0.5)
@@ -0,0 +1,74 @@
+import time
+from ctypes import *
+
+import numpy as np
+import pytest
+
+from kinesis import StageController, trapezoid_duration, trapezoid_position
+from kinesis_sim import MAX_VELOCITY, SETTLE_TIME, SimulatedDCServo
+
+
+@pytest.fixture
+def simulator():
+    return SimulatedDCServo(time_scale=50, seed=0)
+
+
+def test_move_takes_profile_plus_settle_time():
+    simulator = SimulatedDCServo(time_scale=10, seed=0)
+    with StageController(simulate=simulator) as stage:
+        velocity, acceleration = stage.get_velocity()
+        wall_start = time.monotonic()
+        started = simulator.monotonic()
+        stage.move_to(2.0)
+        elapsed = simulator.monotonic() - started
+        wall = time.monotonic() - wall_start
+    expected = trapezoid_duration(2.0, velocity, acceleration) + SETTLE_TIME
+    # Never earlier; later only by the completion polling and scheduling delays
+    assert expected <= elapsed < expected + 0.2
+    assert wall < elapsed / 5  # accelerated time
+
+
+def test_position_follows_trapezoid_profile(simulator):
+    with StageController(simulate=simulator) as stage:
+        stage.set_velocity(1.0, 1.0)
+        # Bracket the start and every reading in time, so scheduling delays cannot fail the comparison
+        before_start = simulator.monotonic()
+        stage.start_move(3.0)
+        after_start = simulator.monotonic()
+        for _ in range(5):
+            simulator.sleep(0.6)
+            before = simulator.monotonic()
+            position = simulator.position()
+            after = simulator.monotonic()
+            lowest = trapezoid_position(before - after_start, 0.0, 3.0, 1.0, 1.0)
+            highest = trapezoid_position(after - before_start, 0.0, 3.0, 1.0, 1.0)
+            assert lowest - 0.02 <= position <= highest + 0.02
+
+
+def test_velocity_is_limited(simulator):
+    with StageController(simulate=simulator) as stage:
+        stage.set_velocity(10.0, 1.0)
+        assert stage.get_velocity()[0] == pytest.approx(MAX_VELOCITY, rel=1e-3)
+
+
+def test_polled_position_lags_while_moving(simulator):
+    with StageController(simulate=simulator, polling_interval=200) as stage:
+        stage.set_velocity(1.0, 1.0)
+        stage.start_move(3.0)
+        simulator.sleep(1.5)
+        assert stage.polled_position() < simulator.position() - 0.01
+        # A request refreshes it
+        before = simulator.position()
+        position = stage.get_position(max_age=0.0)
+        assert before - 0.005 < position < simulator.position() + 0.005
+
+
+def test_encoder_noise():
+    simulator = SimulatedDCServo(time_scale=100, seed=0, encoder_noise=3.0)
+    serial_num = c_char_p(b"83859973")
+    readings = []
+    for _ in range(200):
+        simulator.CC_RequestPosition(serial_num)
+        simulator.sleep(0.01)
+        readings.append(simulator.CC_GetPosition(serial_num))
+    assert np.std(readings) == pytest.approx(3.0, rel=0.25)
@@ -0,0 +1,45 @@
+import pytest
+
+from kinesis_sim import SimulatedDCServo
+from multistage import StageGroup, _scan_points
+from scan import FORWARD
+
+SERIALS = ("83000001", "83000002")
+
+
+@pytest.fixture
+def simulator():
+    return SimulatedDCServo(serials=SERIALS, time_scale=50, seed=0)
+
+
+def test_discovers_all_devices(simulator):
+    with StageGroup(simulate=simulator) as stages:
+        assert sorted(stages.stages) == list(SERIALS)
+        assert all(stage.is_open for stage in stages.stages.values())
+    assert not any(stage.is_open for stage in stages.stages.values())
+
+
+def test_moves_run_concurrently(simulator):
+    with StageGroup(simulate=simulator) as stages:
+        started = simulator.monotonic()
+        stages.move_to({SERIALS[0]: 1.0})
+        single = simulator.monotonic() - started
+        started = simulator.monotonic()
+        stages.move_to({SERIALS[0]: 0.0, SERIALS[1]: 1.0})
+        both = simulator.monotonic() - started
+        positions = stages.get_positions()
+    assert positions == {SERIALS[0]: pytest.approx(0.0, abs=1e-3), SERIALS[1]: pytest.approx(1.0, abs=1e-3)}
+    # The two moves overlap, so together they take about as long as one
+    assert both < 1.5 * single
+
+
+def test_scans_every_stage(simulator):
+    with StageGroup(simulate=simulator) as stages:
+        results = stages.run(_scan_points, 0.0, 0.5, 5, FORWARD, 1, 0.0, None)
+    for points in results.values():
+        assert [round(target, 6) for _, _, target, _, _ in points] == [0.1, 0.2, 0.3, 0.4, 0.5]
+
+
+def test_needs_a_device():
+    with pytest.raises(RuntimeError):
+        StageGroup(serials=[])
@@ -0,0 +1,39 @@
+import threading
+
+import pytest
+
+from pipeline import AcquisitionPipeline
+
+
+def test_handlers_run_in_order_off_the_acquisition_thread():
+    seen = []
+    threads = set()
+
+    def record(point):
+        seen.append(point)
+        threads.add(threading.get_ident())
+
+    with AcquisitionPipeline(record, maxsize=2) as pipeline:
+        for point in range(10):
+            pipeline.put(point)
+    assert seen == list(range(10))
+    assert threading.get_ident() not in threads
+
+
+def test_all_handlers_see_every_point():
+    first, second = [], []
+    with AcquisitionPipeline(first.append, second.append) as pipeline:
+        pipeline.put("a")
+        pipeline.put("b")
+    assert first == second == ["a", "b"]
+
+
+def test_handler_error_is_raised_in_the_acquisition_loop():
+    def fail(point):
+        raise OSError("disk full")
+
+    pipeline = AcquisitionPipeline(fail)
+    pipeline.start()
+    pipeline.put(1)
+    with pytest.raises(OSError, match="disk full"):
+        pipeline.close()
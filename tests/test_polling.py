@@ -0,0 +1,49 @@
+import pytest
+
+from kinesis import MAX_POLLING_INTERVAL, MIN_POLLING_INTERVAL, StageController, polling_interval_for
+from kinesis_sim import SimulatedDCServo
+
+
+class RequestCounter(SimulatedDCServo):
+    """
+    Simulator counting position requests.
+    """
+
+    requests = 0
+
+    def CC_RequestPosition(self, serial_num):
+        self.requests += 1
+        return super().CC_RequestPosition(serial_num)
+
+
+def test_readback_after_move_is_exact():
+    simulator = RequestCounter(time_scale=50, seed=0)
+    with StageController(simulate=simulator) as stage:
+        stage.move_to(0.5)
+        assert stage.get_position() == pytest.approx(simulator.position(), abs=2e-4)
+        assert simulator.requests == 1
+
+
+def test_readback_at_rest_uses_the_polling_cache():
+    simulator = RequestCounter(time_scale=50, seed=0)
+    with StageController(simulate=simulator) as stage:
+        stage.move_to(0.5)
+        simulator.sleep(2 * stage.polling_interval / 1000)
+        requests = simulator.requests
+        started = simulator.monotonic()
+        for _ in range(5):
+            stage.get_position()
+        assert simulator.requests == requests
+        assert simulator.monotonic() - started < stage.polling_interval / 1000
+
+
+def test_polling_interval_for():
+    assert polling_interval_for(0.5, 0.005) == 10
+    assert polling_interval_for(100.0, 0.001) == MIN_POLLING_INTERVAL
+    assert polling_interval_for(0.0, 0.001) == MAX_POLLING_INTERVAL
+
+
+def test_polling_follows_velocity():
+    with StageController(simulate=SimulatedDCServo(time_scale=50), position_resolution=0.001) as stage:
+        stage.set_velocity(0.05, 1.0)
+        assert stage.polling_interval == 20
@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+from analysis import knife_edge_width
+from kinesis import StageController
+from kinesis_sim import SimulatedDCServo
+from powermeter import AVERAGE_COUNT, PowerMeterSession, TLPMXSession
+from powermeter_sim import GaussianBeam, SimulatedInstrument, SimulatedPowerMeter, SimulatedResourceManager
+from powr_linearStageGUI import measure_power, move_stage
+from scan import FORWARD, scan
+
+BEAM = dict(power=1e-3, radius=0.1, center=1.0)
+RADIUS_TOLERANCE = 0.02  # mm, the 10-90 % estimate of a 20-point scan
+
+
+@pytest.fixture
+def bench():
+    simulator = SimulatedDCServo(time_scale=20, seed=0)
+    meter = SimulatedPowerMeter.for_stage(simulator, beam=GaussianBeam(**BEAM), seed=0)
+    with StageController(simulate=simulator) as stage:
+        stage.move_to(0.5)
+        yield stage, meter
+
+
+def radius(points):
+    positions = [position for _, _, _, position, _ in points]
+    powers = [measurement[0] for _, _, _, _, measurement in points]
+    return knife_edge_width(positions, powers)
+
+
+class CountingResourceManager(SimulatedResourceManager):
+    """
+    Resource manager counting lookups and opens, whose instruments can be made to drop the link once.
+    """
+
+    def __init__(self, meter):
+        super().__init__(meter)
+        self.lookups = 0
+        self.opens = 0
+        self.drop_next = False
+
+    def list_resources(self, query="?*::INSTR"):
+        self.lookups += 1
+        return super().list_resources(query)
+
+    def open_resource(self, resource_name):
+        self.opens += 1
+        instrument = super().open_resource(resource_name)
+        manager = self
+
+        class Dropping(SimulatedInstrument):
+            def write(self, message):
+                if manager.drop_next:
+                    manager.drop_next = False
+                    raise ConnectionError("USB link dropped")
+                super().write(message)
+
+        return Dropping(instrument.meter)
+
+
+def test_visa_scan_recovers_radius(bench):
+    stage, meter = bench
+    with PowerMeterSession(1064, unit='W', resource_manager=meter.resource_manager()) as session:
+        points = list(scan(stage, 0.5, 1.5, 20, FORWARD, 1, 0.0, session.read_power))
+    assert radius(points) == pytest.approx(BEAM["radius"], abs=RADIUS_TOLERANCE)
+
+
+def test_visa_session_opens_once(bench):
+    _, meter = bench
+    rm = CountingResourceManager(meter)
+    with PowerMeterSession(1064, average_count=10, resource_manager=rm) as session:
+        for _ in range(5):
+            session.read_power()
+    assert rm.lookups == 1 and rm.opens == 1
+    assert meter.avg_count == 10 and meter.unit == "MW"
+
+
+def test_visa_session_reconnects_after_link_drop(bench, monkeypatch):
+    _, meter = bench
+    monkeypatch.setattr("powermeter.RECONNECT_DELAY", 0.0)
+    rm = CountingResourceManager(meter)
+    with PowerMeterSession(1064, resource_manager=rm) as session:
+        session.read_power()
+        meter.wavelength = 532.0  # lost with the meter's settings
+        rm.drop_next = True
+        power, _ = session.read_power()
+    assert rm.opens == 2
+    assert meter.wavelength == 1064.0
+    assert np.isfinite(power)
+
+
+def test_tlpmx_scan_recovers_radius(bench):
+    stage, meter = bench
+    with TLPMXSession(1064, avg_count=10, driver=meter.tlpmx) as session:
+        points = list(scan(stage, 0.5, 1.5, 20, FORWARD, 1, 0.0, session.read_power))
+    assert radius(points) == pytest.approx(BEAM["radius"], abs=RADIUS_TOLERANCE)
+    assert all(np.isfinite(measurement[1]) for _, _, _, _, measurement in points)
+
+
+def test_session_writes_averaging(bench):
+    _, meter = bench
+    with TLPMXSession(1064, avg_count=20, driver=meter.tlpmx) as session:
+        assert meter.avg_count == 20
+        session.set_averaging(avg_time=0.01)
+        assert meter.avg_time == pytest.approx(0.01)
+
+
+def test_gui_configures_meter_averaging(bench, tmp_path):
+    stage, meter = bench
+    meter.avg_count = 1
+    measure_power(1064, on_meter=True, driver=meter.tlpmx, avg_count=20)
+    assert meter.avg_count == 20
+    move_stage(stage, 0.6, 2, FORWARD, tmp_path / "scan.txt", 1064, on_meter=True, driver=meter.tlpmx)
+    assert meter.avg_count == AVERAGE_COUNT
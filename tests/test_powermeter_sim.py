@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from kinesis_sim import SimulatedClock
+from powermeter_sim import IDN, POWER_RANGES, SIMULATED_RESOURCE, GaussianBeam, MultimodeBeam, SimulatedPowerMeter
+
+
+@pytest.fixture
+def meter():
+    return SimulatedPowerMeter(clock=SimulatedClock(time_scale=1000), seed=0)
+
+
+def test_gaussian_beam_profile():
+    beam = GaussianBeam(power=2e-3, radius=0.1, center=1.0)
+    assert beam.transmitted(1.0) == pytest.approx(1e-3)
+    assert beam.transmitted([0.0, 2.0]) == pytest.approx([0.0, 2e-3])
+    # The 1/e^2 radius lies between the 2.3 % and 97.7 % points of the knife-edge profile
+    assert beam.transmitted(1.1) / beam.power == pytest.approx(0.977, abs=1e-3)
+
+
+def test_multimode_beam_adds_modes():
+    modes = [GaussianBeam(power=1e-3), GaussianBeam(power=0.5e-3, radius=0.3)]
+    beam = MultimodeBeam(modes)
+    assert beam.power == pytest.approx(1.5e-3)
+    assert beam.transmitted(1.2) == pytest.approx(sum(mode.transmitted(1.2) for mode in modes))
+
+
+def test_edge_position_sets_the_power(meter):
+    meter.position = lambda t: 0.0
+    assert meter.measure() == pytest.approx(0.0, abs=1e-6)
+    meter.position = lambda t: 2.0
+    assert meter.measure() == pytest.approx(meter.beam.power, rel=0.01)
+
+
+def test_scpi_long_and_short_forms(meter):
+    meter.scpi("sense:correction:wavelength 633;SENS:AVER:COUN 20")
+    assert meter.wavelength == 633.0 and meter.avg_count == 20
+    assert meter.scpi("*IDN?") == IDN
+    assert meter.scpi("sens:corr:wav? max") == "1100.0"
+    assert meter.scpi("power:dc:unit?") == "W"
+    assert len(meter.scpi("read?;read?").split(";")) == 2
+
+
+def test_scpi_unit(meter):
+    watts = float(meter.scpi("read?"))
+    meter.scpi("sens:pow:unit mW")
+    assert float(meter.scpi("read?")) == pytest.approx(watts * 1000, rel=0.01)
+
+
+def test_unknown_scpi_command_raises(meter):
+    with pytest.raises(ValueError):
+        meter.scpi("sens:bogus 1")
+
+
+def test_resource_manager_serves_the_meter(meter):
+    rm = meter.resource_manager()
+    assert rm.list_resources() == (SIMULATED_RESOURCE,)
+    assert rm.open_resource(SIMULATED_RESOURCE).query("*idn?") == IDN
+    with pytest.raises(ValueError):
+        rm.open_resource("USB0::0x1313::0x8078::OTHER::INSTR")
+
+
+def test_auto_range_switches_once_per_change(meter):
+    meter.position = lambda t: 2.0
+    meter.measure()
+    meter.measure()
+    assert meter.range == pytest.approx(1e-3) and meter.range_switches == 1
+    meter.position = lambda t: 0.95
+    meter.measure()
+    assert meter.range == pytest.approx(1e-3) and meter.range_switches == 1  # 0.16 mW still fits
+    meter.position = lambda t: 0.7
+    meter.measure()
+    assert meter.range < 1e-4 and meter.range_switches == 2
+
+
+def test_fixed_range_saturates(meter):
+    meter.scpi("sens:pow:rang:upp 1e-4")
+    assert not meter.auto_range
+    assert meter.measure() == pytest.approx(1e-4)
+    assert meter.scpi("sens:pow:rang:upp? max") == f"{POWER_RANGES[-1]:.9e}"
+
+
+def test_noise_shrinks_with_averaging(meter):
+    single = np.std([meter.measure() for _ in range(200)])
+    meter.avg_count = 100
+    averaged = np.std([meter.measure() for _ in range(200)])
+    assert single == pytest.approx(meter.noise * 0.5e-3, rel=0.2)
+    assert averaged == pytest.approx(single / 10, rel=0.3)
+
+
+def test_dark_adjust_removes_dark_error(meter):
+    meter.position = lambda t: 0.0
+    assert meter.measure() > 1e-9  # dark current, read as power
+    meter.scpi("sens:corr:coll:zero:init")
+    assert meter.scpi("sens:corr:coll:zero:stat?") == "1"
+    meter.sleep(2.5)
+    assert meter.scpi("sens:corr:coll:zero:stat?") == "0"
+    assert meter.dark_error() == pytest.approx(0.0, abs=1e-10)
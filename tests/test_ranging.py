@@ -0,0 +1,83 @@
+import pytest
+
+from kinesis import StageController
+from kinesis_sim import SimulatedDCServo
+from powermeter import TLPMXSession
+from powermeter_sim import POWER_RANGES, GaussianBeam, SimulatedPowerMeter
+from ranging import RangeCache, RangeLock, RangePlan, plan_ranges
+from scan import FORWARD, scan
+
+BEAM = dict(power=1e-3, radius=0.1, center=1.0)
+
+
+@pytest.fixture
+def bench():
+    simulator = SimulatedDCServo(time_scale=50, seed=0)
+    meter = SimulatedPowerMeter.for_stage(simulator, beam=GaussianBeam(**BEAM), seed=0)
+    with StageController(simulate=simulator) as stage, TLPMXSession(1064, avg_count=10, driver=meter.tlpmx) as session:
+        yield stage, meter, session
+
+
+def test_plan_uses_smallest_range_with_headroom():
+    plan = RangePlan.from_profile([0.0, 1.0, 2.0], [1e-6, 5e-4, 1e-3], POWER_RANGES)
+    assert plan.ranges == pytest.approx([1e-5, 1e-3, 1e-2])
+    # Between two pre-scan points the larger range holds
+    assert plan.range_at(0.5) == pytest.approx(1e-3)
+    assert plan.range_at(1.0) == pytest.approx(1e-3)
+
+
+def test_plan_covers_its_planned_span():
+    # Measured pre-scan positions miss the endpoints by the settling error
+    plan = RangePlan.from_profile([0.50003, 1.0, 1.49998], [0.0, 5e-4, 1e-3], POWER_RANGES, span=(0.5, 1.5))
+    assert plan.covers(0.5, 1.5)
+    assert plan.covers(1.5, 0.6)
+    assert not plan.covers(0.4, 1.5)
+    assert RangePlan.from_dict(plan.to_dict()).covers(0.5, 1.5)
+
+
+def test_cache_round_trip(tmp_path):
+    path = tmp_path / "cache" / "ranges.json"
+    plan = RangePlan([0.0, 1.0], [1e-3, 1e-2], span=(0.0, 1.0))
+    RangeCache(path).put("S123", 1064, plan)
+    cached = RangeCache(path).get("S123", 1064.0)
+    assert cached.ranges == plan.ranges and cached.span == plan.span
+    assert RangeCache(path).get("S123", 532) is None
+
+
+def test_cached_plan_skips_prescan(bench, tmp_path):
+    stage, meter, session = bench
+    cache = RangeCache(tmp_path / "ranges.json")
+    plan = plan_ranges(stage, session, 0.5, 1.5, cache)
+    stage.move_to(0.0)
+    assert plan_ranges(stage, session, 0.5, 1.5, cache).to_dict() == plan.to_dict()
+    assert stage.get_position() == pytest.approx(0.0, abs=0.01)  # no pre-scan moves
+
+
+def test_range_lock_scan_switches_rarely(bench):
+    stage, meter, session = bench
+    plan = plan_ranges(stage, session, 0.5, 1.5)
+    lock = RangeLock(session, plan)
+    lock.lock()
+    try:
+        points = list(scan(stage, 0.5, 1.5, 20, FORWARD, 1, 0.0, session.facade.power, lock))
+    finally:
+        lock.unlock()
+    assert meter.auto_range
+    # Each planned range is set once, in order along the edge
+    assert lock.switches <= len(set(plan.ranges))
+    assert lock.step_ups == 0
+    assert points[-1][4] == pytest.approx(BEAM["power"], rel=0.05)
+
+
+def test_range_lock_steps_up_near_saturation(bench):
+    stage, meter, session = bench
+    stage.move_to(1.5)
+    # A stale plan expecting a hundred times less power than the beam now gives
+    lock = RangeLock(session, RangePlan([0.0, 2.0], [1e-5, 1e-5]))
+    lock.lock()
+    try:
+        power = lock.measure(1.5, session.facade.power)
+    finally:
+        lock.unlock()
+    assert lock.step_ups >= 1
+    assert power == pytest.approx(BEAM["power"], rel=0.05)
@@ -0,0 +1,62 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from sampling import SequentialSampler
+
+
+def noisy(std, mean=1.0, seed=0):
+    rng = np.random.default_rng(seed)
+    return lambda: float(rng.normal(mean, std))
+
+
+def test_target_error_is_required():
+    with pytest.raises(ValueError):
+        SequentialSampler(noisy(0.1))
+
+
+@pytest.mark.parametrize("min_count, max_count", [(1, 10), (5, 4)])
+def test_counts_must_be_ordered(min_count, max_count):
+    with pytest.raises(ValueError):
+        SequentialSampler(noisy(0.1), target_sem=0.1, min_count=min_count, max_count=max_count)
+
+
+def test_quiet_point_stops_at_min_count():
+    sampler = SequentialSampler(itertools.repeat(2.0).__next__, target_sem=1e-6, min_count=3)
+    assert sampler() == (2.0, 0.0, 3)
+
+
+def test_noisy_point_stops_at_target_error():
+    sampler = SequentialSampler(noisy(0.1), target_sem=0.02, max_count=1000)
+    mean, std, n = sampler()
+    assert 3 <= n < 1000
+    assert std * np.sqrt(n / (n - 1)) / np.sqrt(n) <= 0.02  # standard error of the returned readings
+    assert mean == pytest.approx(1.0, abs=0.1)
+
+
+def test_relative_error():
+    sampler = SequentialSampler(noisy(0.1, mean=100.0), relative_sem=1e-3, max_count=1000)
+    assert sampler()[2] == 3  # 0.1 / sqrt(3) is below 0.1 % of 100
+
+
+def test_unreachable_target_stops_at_max_count():
+    sampler = SequentialSampler(noisy(0.1), target_sem=1e-9, max_count=20)
+    assert sampler()[2] == 20
+
+
+def test_counts_are_recorded_per_point():
+    readings = iter([1.0, 1.0, 1.0, 0.0, 2.0, 0.0, 2.0])
+    sampler = SequentialSampler(readings.__next__, target_sem=0.1, min_count=3, max_count=4)
+    sampler()
+    sampler()
+    assert sampler.counts == [3, 4]
+
+
+def test_matches_numpy_statistics():
+    values = [0.5, 1.5, 0.7, 1.1, 0.9]
+    sampler = SequentialSampler(iter(values).__next__, target_sem=1e-9, min_count=2, max_count=len(values))
+    mean, std, n = sampler()
+    assert n == len(values)
+    assert mean == pytest.approx(np.mean(values))
+    assert std == pytest.approx(np.std(values))
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from kinesis import StageController
+from kinesis_sim import SimulatedDCServo
+from scan import BACKWARD, FORWARD, SERPENTINE, plan_scan, scan
+
+
+def test_plan_forward():
+    plan = plan_scan(0.0, 1.0, 4, FORWARD, passes=2)
+    assert [origin for origin, _ in plan] == [0.0, 0.0]
+    np.testing.assert_allclose(plan[0][1], [0.25, 0.5, 0.75, 1.0])
+
+
+def test_plan_backward():
+    (origin, positions), = plan_scan(0.0, 1.0, 4, BACKWARD)
+    assert origin == 1.0
+    np.testing.assert_allclose(positions, [0.75, 0.5, 0.25, 0.0])
+
+
+def test_plan_serpentine_alternates():
+    plan = plan_scan(0.0, 1.0, 2, SERPENTINE, passes=3)
+    assert [origin for origin, _ in plan] == [0.0, 1.0, 0.0]
+    np.testing.assert_allclose(plan[1][1], [0.5, 0.0])
+
+
+@pytest.mark.parametrize("mode, n_steps", [("sideways", 4), (FORWARD, 0)])
+def test_plan_rejects_bad_arguments(mode, n_steps):
+    with pytest.raises(ValueError):
+        plan_scan(0.0, 1.0, n_steps, mode)
+
+
+class RecordingStage:
+    """
+    Stage stand-in that records the commanded positions and reports them back.
+    """
+
+    def __init__(self, position=0.0):
+        self.position = position
+        self.moves = []
+
+    def get_position(self):
+        return self.position
+
+    def move_to(self, position):
+        self.moves.append(position)
+        self.position = position
+
+
+def test_backlash_offsets_negative_moves_only():
+    stage = RecordingStage()
+    points = list(scan(stage, 0.0, 1.0, 2, SERPENTINE, passes=2, backlash=0.1))
+
+    # Forward pass from 0, then backward from 1 with the commanded positions offset by the backlash
+    np.testing.assert_allclose(stage.moves, [0.5, 1.0, 0.4, -0.1])
+    np.testing.assert_allclose([position for _, _, _, position, _ in points], [0.5, 1.0, 0.5, 0.0])
+
+
+def test_backlash_offsets_negative_moves_to_pass_start():
+    stage = RecordingStage()
+    points = list(scan(stage, 0.0, 1.0, 2, FORWARD, passes=2, backlash=0.1))
+
+    # The return to the start of the second pass is a negative move, so it is offset too
+    np.testing.assert_allclose(stage.moves, [0.5, 1.0, -0.1, 0.5, 1.0])
+    np.testing.assert_allclose([position for _, _, _, position, _ in points], [0.5, 1.0, 0.5, 1.0])
+
+
+def test_scan_moves_to_pass_start():
+    stage = RecordingStage(position=0.3)
+    list(scan(stage, 0.0, 1.0, 2, BACKWARD, backlash=0.1))
+    assert stage.moves[0] == 1.0  # a positive move, not offset
+    assert stage.moves[1] == pytest.approx(0.4)
+
+
+def test_scan_reaches_targets_on_simulated_stage():
+    with StageController(simulate=SimulatedDCServo(time_scale=50, seed=0)) as stage:
+        stage.move_to(0.0)
+        points = list(scan(stage, 0.0, 0.5, 5, SERPENTINE, passes=2))
+
+    assert len(points) == 10
+    for _, _, target, position, _ in points:
+        assert abs(position - target) < 1e-3
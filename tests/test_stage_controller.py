@@ -0,0 +1,68 @@
+import pytest
+
+from kinesis import StageController
+from kinesis_sim import SimulatedDCServo
+
+
+class CountingServo(SimulatedDCServo):
+    """
+    Simulator counting the calls that open, configure and close a device.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = {"CC_Open": 0, "CC_Close": 0, "CC_SetMotorParamsExt": 0}
+
+    def CC_Open(self, serial_num):
+        self.calls["CC_Open"] += 1
+        return super().CC_Open(serial_num)
+
+    def CC_Close(self, serial_num):
+        self.calls["CC_Close"] += 1
+        return super().CC_Close(serial_num)
+
+    def CC_SetMotorParamsExt(self, serial_num, steps_per_rev, gbox_ratio, pitch):
+        self.calls["CC_SetMotorParamsExt"] += 1
+        return super().CC_SetMotorParamsExt(serial_num, steps_per_rev, gbox_ratio, pitch)
+
+
+def test_session_opens_and_configures_once():
+    simulator = CountingServo(time_scale=50, seed=0)
+    with StageController(simulate=simulator) as stage:
+        stage.open()
+        for target in (0.1, 0.2, 0.3):
+            stage.move_to(target)
+            stage.get_position()
+        assert simulator.calls == {"CC_Open": 1, "CC_Close": 0, "CC_SetMotorParamsExt": 1}
+    assert simulator.calls["CC_Close"] == 1 and not stage.is_open
+    stage.close()
+    assert simulator.calls["CC_Close"] == 1
+
+
+def test_units_work_before_open():
+    stage = StageController(simulate=SimulatedDCServo())
+    assert stage.to_real(stage.to_device(1.25)) == pytest.approx(1.25, abs=1e-4)
+    assert not stage.is_open
+
+
+def test_open_failure_closes_device():
+    class FailingVerify(SimulatedDCServo):
+        closed = False
+
+        def CC_GetDeviceUnitFromRealValue(self, serial_num, real_unit, device_unit, unit_type):
+            device_unit._obj.value = -1  # disagrees with the UnitConverter
+            return 0
+
+        def CC_Close(self, serial_num):
+            self.closed = True
+
+    simulator = FailingVerify()
+    stage = StageController(simulate=simulator)
+    with pytest.raises(RuntimeError):
+        stage.open()
+    assert simulator.closed and not stage.is_open
+
+
+def test_open_checks_cc_open():
+    with pytest.raises(RuntimeError):
+        StageController(serial="12345678", simulate=SimulatedDCServo()).open()
@@ -0,0 +1,56 @@
+import re
+from ctypes import *
+from types import SimpleNamespace
+
+import tlpmx_bindings
+from make_tlpmx_bindings import SOURCE, signatures
+from TLPMX import TLPMX
+from tlpmx_bindings import SIGNATURES, bind
+
+
+def called_functions():
+    with open(SOURCE) as source_file:
+        text = source_file.read()
+    return set(re.findall(r"self\.dll\.(TLPMX_\w+)\(", text))
+
+
+def test_every_bound_function_is_called_by_the_wrapper():
+    assert set(SIGNATURES) == called_functions()
+
+
+def test_bindings_are_up_to_date():
+    found, skipped = signatures()
+    assert not skipped
+    assert {function: tuple(eval(expression, vars(tlpmx_bindings)) for expression in types)
+            for function, types in found.items()} == SIGNATURES
+
+
+def test_init_flags_are_vi_booleans():
+    _, id_query, reset_device, _ = SIGNATURES["TLPMX_init"]
+    assert sizeof(id_query) == sizeof(reset_device) == 2
+
+
+def test_bind_skips_missing_functions():
+    dll = SimpleNamespace(TLPMX_close=SimpleNamespace(), TLPMX_measPower=SimpleNamespace())
+    functions = bind(dll)
+    assert set(functions) == {"TLPMX_close", "TLPMX_measPower"}
+    assert dll.TLPMX_measPower.argtypes == SIGNATURES["TLPMX_measPower"]
+    assert dll.TLPMX_measPower.restype is tlpmx_bindings.ViStatus
+
+
+def test_open_passes_16_bit_flags():
+    calls = {}
+
+    def record(name):
+        def function(*args):
+            calls[name] = args
+            return 0
+        return function
+
+    meter = TLPMX.__new__(TLPMX)
+    meter.devSession = c_long()
+    meter.dll = SimpleNamespace(TLPMX_close=record("close"), TLPMX_init=record("init"))
+    meter.open(create_string_buffer(b"USB0::0x1313::0x8078::P0000001::INSTR"), c_bool(True), False)
+    _, id_query, reset_device, _ = calls["init"]
+    assert isinstance(id_query, c_uint16) and id_query.value == 1
+    assert isinstance(reset_device, c_uint16) and reset_device.value == 0
@@ -0,0 +1,65 @@
+import pytest
+
+from powermeter_sim import GaussianBeam, SimulatedPowerMeter
+from TLPMX import TLPM_ATTR_MAX_VAL, TLPM_ATTR_SET_VAL
+from tlpmx_facade import MeterFacade
+
+
+class RecordingMeter:
+    """
+    `TLPMX` stand-in keeping the arguments of every call and writing a fixed value into the output.
+    """
+
+    def __init__(self, value=1.5):
+        self.value = value
+        self.calls = []
+
+    def measPower(self, power, channel):
+        self.calls.append((power, channel))
+        power._obj.value = self.value
+        return 0
+
+    def getWavelength(self, attribute, wavelength, channel):
+        self.calls.append((attribute, wavelength, channel))
+        wavelength._obj.value = 1064.0 if attribute.value == TLPM_ATTR_SET_VAL else 1100.0
+        return 0
+
+
+@pytest.fixture
+def meter():
+    meter = SimulatedPowerMeter(beam=GaussianBeam(power=1e-3), seed=0, latency=0).tlpmx()
+    meter.open(None, False, False)
+    return meter
+
+
+def test_values_are_plain_python(meter):
+    facade = MeterFacade(meter)
+    power = facade.power()
+    assert type(power) is float and power == pytest.approx(0.5e-3, rel=0.05)
+    assert type(facade.avg_count()) is int
+    assert facade.auto_range() is True
+
+
+def test_buffers_and_arguments_are_reused():
+    meter = RecordingMeter()
+    facade = MeterFacade(meter)
+    assert [facade.power(), facade.power(), facade.power(2)] == [1.5, 1.5, 1.5]
+    (ref1, channel1), (ref2, channel2), (ref3, channel3) = meter.calls
+    assert ref1 is ref2 is ref3
+    assert channel1 is channel2 and channel3.value == 2 and channel3 is not channel1
+
+
+def test_attribute_arguments_are_cached_per_value():
+    meter = RecordingMeter()
+    facade = MeterFacade(meter)
+    assert facade.wavelength() == 1064.0
+    assert facade.wavelength(TLPM_ATTR_MAX_VAL) == 1100.0
+    facade.wavelength()
+    (set1, _, _), (maximum, _, _), (set2, _, _) = meter.calls
+    assert set1 is set2 and maximum is not set1
+
+
+def test_dual_channel(meter):
+    signal, reference = MeterFacade(meter).dual_channel()
+    assert reference == pytest.approx(1e-3, rel=0.05)
+    assert signal == pytest.approx(0.5e-3, rel=0.05)
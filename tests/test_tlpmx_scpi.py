@@ -0,0 +1,60 @@
+from ctypes import *
+
+import pytest
+
+from hwtrigger import TRIGGER_METHODS
+from kinesis import StageController
+from kinesis_sim import SimulatedClock, SimulatedDCServo
+from powermeter import TLPMXSession
+from powermeter_sim import GaussianBeam, SimulatedPowerMeter
+from powr_linearStageGUI import move_stage
+from scan import FORWARD
+from tlpmx_scpi import ScpiTLPMX
+
+pytest.importorskip("pyvisa")
+
+
+@pytest.fixture
+def meter():
+    return SimulatedPowerMeter(beam=GaussianBeam(power=1e-3), clock=SimulatedClock(time_scale=100), seed=0)
+
+
+def scpi_driver(meter):
+    return lambda: ScpiTLPMX(resource_manager=meter.resource_manager())
+
+
+def test_measures_over_scpi(meter):
+    with TLPMXSession(1064, avg_count=10, driver=scpi_driver(meter)) as session:
+        power, std = session.read_power()
+        assert power == pytest.approx(0.5e-3, rel=0.05)
+        assert not session.burst_std  # no fast-array mode over SCPI
+        assert meter.avg_count == 10 and meter.wavelength == 1064
+
+
+def test_unimplemented_methods_raise_name_error(meter):
+    driver = ScpiTLPMX(resource_manager=meter.resource_manager())
+    with pytest.raises(NameError, match="not supported by the SCPI backend"):
+        driver.setDigIoPinMode(c_int16(1), c_uint16(0))
+    with pytest.raises(NameError, match="use setAvgCnt"):
+        driver.setAvgTime(c_double(0.1), c_uint16(1))
+    with pytest.raises(AttributeError):
+        driver.noSuchMethod()
+
+
+def test_supports(meter):
+    with TLPMXSession(1064, driver=scpi_driver(meter)) as session:
+        assert session.supports("measPower", "setAvgCnt")
+        assert not session.supports(*TRIGGER_METHODS)
+    with TLPMXSession(1064, driver=meter.tlpmx) as session:
+        assert session.supports(*TRIGGER_METHODS)
+
+
+def test_hardware_trigger_scan_is_refused_up_front(tmp_path):
+    simulator = SimulatedDCServo(time_scale=50, seed=0)
+    meter = SimulatedPowerMeter.for_stage(simulator, seed=0)
+    with StageController(simulate=simulator) as stage:
+        with pytest.raises(ValueError, match="hardware triggers"):
+            move_stage(stage, 1.0, 5, FORWARD, tmp_path / "scan.txt", 1064, on_meter=True, hw_trigger=True,
+                       driver=scpi_driver(meter))
+        assert stage.get_position() == pytest.approx(0.0, abs=0.01)
+    assert not (tmp_path / "scan.txt").exists()
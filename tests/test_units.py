@@ -0,0 +1,31 @@
+from ctypes import *
+
+import numpy as np
+import pytest
+
+from kinesis_sim import SimulatedDCServo
+from units import DISTANCE, UnitConverter
+
+
+def test_distance_scale_from_motor_params():
+    units = UnitConverter(512, 67.49, 1.0)
+    assert units.to_device(1.0) == round(512 * 67.49)
+    assert isinstance(units.to_device(1.0), int)
+    assert isinstance(units.to_real(34555), float)
+
+
+def test_arrays_convert_in_one_call():
+    units = UnitConverter()
+    positions = np.linspace(0.0, 25.0, 1001)
+    dev = units.to_device(positions)
+    assert dev.dtype == np.int64 and dev.shape == positions.shape
+    np.testing.assert_allclose(units.to_real(dev), positions, atol=1 / units.scales[DISTANCE])
+
+
+def test_verify_rejects_wrong_motor_params():
+    lib = SimulatedDCServo()
+    serial_num = c_char_p(b"83859973")
+    lib.CC_SetMotorParamsExt(serial_num, c_double(512), c_double(67.49), c_double(1.0))
+    UnitConverter().verify(lib, serial_num)
+    with pytest.raises(RuntimeError):
+        UnitConverter(pitch=0.5).verify(lib, serial_num)
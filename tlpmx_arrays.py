@@ -0,0 +1,262 @@
+import time
+from collections import deque
+from ctypes import *
+
+import numpy as np
+
+from TLPMX import TLPM_DEFAULT_CHANNEL
+
+FAST_ARRAY_SIZE = 200  # samples returned per getNextFastArrayMeasurement call
+SEQUENCE_BLOCK = 100  # samples per unit of baseTime in getMeasurementSequence
+MAX_SEQUENCE_BASE_TIME = 100
+BUFFER_SIZE = SEQUENCE_BLOCK * MAX_SEQUENCE_BASE_TIME
+MIN_CHUNK = 100  # samples, smallest burst transfer
+TUNER_HISTORY = 16  # transfers the chunk size is fitted to
+BURST_POLL_INTERVAL = 0.005  # s
+BURST_IDLE_TIMEOUT = 1.0  # s
+STOP_FAST_ARRAY = b"ABOR;:CONF:POW\n"  # ends a fast-array measurement and returns to single power readings
+
+
+class ArrayReader:
+    """
+    Reads `TLPMX` array measurements straight into preallocated NumPy buffers.
+
+    The buffers are allocated once and the driver writes into their memory through ctypes arrays created
+    with `from_buffer`, so no ctypes objects are built and no samples are converted one by one per call.
+    The arrays returned are views of these buffers and are overwritten by the next read of the same kind;
+    copy them to keep them.
+    """
+
+    def __init__(self, meter, size=BUFFER_SIZE, channel=TLPM_DEFAULT_CHANNEL):
+        """
+        :param meter: open `TLPMX` session
+        :param size: buffer size in samples, the largest burst or sequence that can be read at once
+        :param channel: sensor channel of the fast-array reads
+        """
+        self.meter = meter
+        self.size = size
+        self.channel = c_uint16(channel)
+        self.count = c_uint32()
+
+        # getBurstArraySamples needs a timestamp buffer of twice the sample count
+        self.raw_timestamps = np.zeros(2 * size, dtype=np.uint32)  # fast array and burst, raw or µs
+        self.float_timestamps = np.zeros(size, dtype=np.float32)  # sequence, ms
+        self.values = np.zeros(size, dtype=np.float32)
+        self.values2 = np.zeros(size, dtype=np.float32)
+
+        self._raw_timestamps = (c_uint32 * (2 * size)).from_buffer(self.raw_timestamps)
+        self._float_timestamps = (c_float * size).from_buffer(self.float_timestamps)
+        self._values = (c_float * size).from_buffer(self.values)
+        self._values2 = (c_float * size).from_buffer(self.values2)
+
+    def _check(self, n):
+        if n > self.size:
+            raise ValueError(f"{n} samples do not fit into a buffer of {self.size}.")
+
+    def fast_array(self, relative=True):
+        """
+        Fetches the next block of a fast-array measurement (see `TLPMX.confPowerFastArrayMeasurement`).
+
+        :param relative: return timestamps in µs relative to the first sample instead of raw timestamps
+        :return: (timestamps, values) as NumPy views of up to FAST_ARRAY_SIZE samples
+        """
+        self._check(FAST_ARRAY_SIZE)
+        if relative:
+            self.meter.getNextFastArrayMeasurementRelativeTime(byref(self.count), self._raw_timestamps, self._values,
+                                                               self.channel)
+        else:
+            self.meter.getNextFastArrayMeasurement(byref(self.count), self._raw_timestamps, self._values,
+                                                   self.channel)
+        n = self.count.value
+        return self.raw_timestamps[:n], self.values[:n]
+
+    def stop_fast_array(self):
+        """
+        Takes the meter out of fast-array mode, so later `measPower` calls are single readings again.
+
+        :return: None
+        """
+        self.meter.writeRaw(c_char_p(STOP_FAST_ARRAY))
+
+    def burst_count(self):
+        """
+        Returns the number of samples in the meter's burst array buffer.
+        """
+        self.meter.getBurstArraySamplesCount(byref(self.count))
+        return self.count.value
+
+    def burst(self, start_index, sample_count):
+        """
+        Reads samples from the meter's burst array buffer (see `TLPMX.startBurstArrayMeasurement`).
+
+        :param start_index: index of the first sample
+        :param sample_count: number of samples
+        :return: (timestamps, values, values2) as NumPy views
+        """
+        self._check(sample_count)
+        self.meter.getBurstArraySamples(c_uint32(start_index), c_uint32(sample_count), self._raw_timestamps,
+                                        self._values, self._values2)
+        return (self.raw_timestamps[:sample_count], self.values[:sample_count],
+                self.values2[:sample_count])
+
+    def sequence(self, base_time):
+        """
+        Reads a measurement sequence (see `TLPMX.confPowerMeasurementSequence` and `startMeasurementSequence`).
+
+        :param base_time: sequence length in units of SEQUENCE_BLOCK samples, 1 to MAX_SEQUENCE_BASE_TIME
+        :return: (timestamps in ms, values, values2) as NumPy views
+        """
+        n = SEQUENCE_BLOCK * base_time
+        self._check(n)
+        self.meter.getMeasurementSequence(c_uint32(base_time), self._float_timestamps, self._values, self._values2)
+        return self.float_timestamps[:n], self.values[:n], self.values2[:n]
+
+
+class ChunkTuner:
+    """
+    Picks the burst transfer size from the measured transfer times.
+
+    Every transfer takes about `latency + n / bandwidth`. Both are fitted to the most recent transfers, and
+    the chunk size is the smallest one that reaches `efficiency` of the full bandwidth, so larger chunks
+    would only add latency and memory. Until two different sizes have been timed the size is doubled.
+    """
+
+    def __init__(self, initial=MIN_CHUNK, min_chunk=MIN_CHUNK, max_chunk=BUFFER_SIZE, efficiency=0.9,
+                 history=TUNER_HISTORY):
+        """
+        :param initial: chunk size of the first transfer
+        :param min_chunk: smallest chunk size
+        :param max_chunk: largest chunk size, at most the size of the reader's buffers
+        :param efficiency: fraction of the full bandwidth to reach, below 1
+        :param history: number of recent transfers the fit is based on
+        """
+        self.min_chunk = min_chunk
+        self.max_chunk = max_chunk
+        self.efficiency = efficiency
+        self.chunk_size = min(max(initial, min_chunk), max_chunk)
+        self.sizes = deque(maxlen=history)
+        self.durations = deque(maxlen=history)
+
+    def record(self, n, seconds):
+        """
+        Records the duration of a transfer of `n` samples and updates `chunk_size`.
+
+        :return: None
+        """
+        self.sizes.append(n)
+        self.durations.append(seconds)
+        if len(set(self.sizes)) < 2:
+            self.chunk_size = min(2 * max(n, self.min_chunk), self.max_chunk)
+            return
+
+        seconds_per_sample, latency = np.polyfit(np.array(self.sizes, dtype=float),
+                                                 np.array(self.durations, dtype=float), 1)
+        if seconds_per_sample <= 0 or latency <= 0:
+            # Transfer time does not grow measurably with size (or there is no fixed cost): go large
+            chunk = self.max_chunk
+        else:
+            chunk = self.efficiency / (1 - self.efficiency) * latency / seconds_per_sample
+        self.chunk_size = int(min(max(chunk, self.min_chunk), self.max_chunk))
+
+    def throughput(self):
+        """
+        Returns the samples per second of the transfers in the history, or NaN before the first one.
+        """
+        total_time = sum(self.durations)
+        return sum(self.sizes) / total_time if total_time > 0 else np.nan
+
+
+def burst_blocks(reader, total=None, tuner=None, poll_interval=BURST_POLL_INTERVAL, idle_timeout=BURST_IDLE_TIMEOUT,
+                 start=True, clock=None):
+    """
+    Starts a burst array measurement and reads its samples in chunks as they arrive.
+
+    Only the reader's buffers are used, so memory stays flat however long the capture runs. Each block is
+    a view of those buffers and is only valid until the next block is requested; copy it or store it in a
+    `BurstRing` to keep it.
+    :param reader: `ArrayReader` of the meter
+    :param total: number of samples to read, by default until no new samples arrive for `idle_timeout`
+    :param tuner: `ChunkTuner` choosing the transfer size, by default a new one
+    :param poll_interval: time between checks for new samples in s
+    :param idle_timeout: time without new samples after which the capture counts as finished in s
+    :param start: start the burst measurement; False to read one that has already been started
+    :param clock: (monotonic, sleep) functions to time the capture with, e.g. those of a simulated stage
+        library sharing its clock with the meter; by default the wall clock
+    :return: generator of (timestamps, values, values2) NumPy blocks
+    """
+    if tuner is None:
+        tuner = ChunkTuner(max_chunk=reader.size)
+    monotonic, sleep = clock if clock is not None else (time.monotonic, time.sleep)
+
+    if start:
+        reader.meter.startBurstArrayMeasurement()
+    index = 0
+    last_data = monotonic()
+    while total is None or index < total:
+        available = reader.burst_count()
+        if total is not None:
+            available = min(available, total)
+        if available <= index:
+            if monotonic() - last_data > idle_timeout:
+                if total is not None:
+                    raise TimeoutError(f"Burst stopped after {index} of {total} samples.")
+                return
+            sleep(poll_interval)
+            continue
+
+        n = min(tuner.chunk_size, available - index, reader.size)
+        started = monotonic()
+        block = reader.burst(index, n)
+        tuner.record(n, monotonic() - started)
+        index += n
+        last_data = monotonic()
+        yield block
+
+
+class BurstRing:
+    """
+    Fixed-size ring buffer keeping the most recent samples of a long capture.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.uint32)
+        self.values = np.zeros(capacity, dtype=np.float32)
+        self.values2 = np.zeros(capacity, dtype=np.float32)
+        self.head = 0  # index of the next sample to write
+        self.total = 0  # samples written since creation
+
+    def __len__(self):
+        return min(self.total, self.capacity)
+
+    def extend(self, timestamps, values, values2):
+        """
+        Appends a block of samples, overwriting the oldest ones once the buffer is full.
+
+        :return: None
+        """
+        n = len(values)
+        if n >= self.capacity:
+            # Only the last `capacity` samples survive
+            self.timestamps[:] = timestamps[-self.capacity:]
+            self.values[:] = values[-self.capacity:]
+            self.values2[:] = values2[-self.capacity:]
+            self.head = 0
+            self.total += n
+            return
+
+        first = min(n, self.capacity - self.head)
+        for buffer, block in ((self.timestamps, timestamps), (self.values, values), (self.values2, values2)):
+            buffer[self.head:self.head + first] = block[:first]
+            buffer[:n - first] = block[first:]
+        self.head = (self.head + n) % self.capacity
+        self.total += n
+
+    def latest(self):
+        """
+        Returns copies of the buffered (timestamps, values, values2), oldest sample first.
+        """
+        if self.total < self.capacity:
+            return self.timestamps[:self.head].copy(), self.values[:self.head].copy(), self.values2[:self.head].copy()
+        order = np.roll(np.arange(self.capacity), -self.head)
+        return self.timestamps[order], self.values[order], self.values2[order]
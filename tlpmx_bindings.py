@@ -0,0 +1,317 @@
+"""
+ctypes signatures of the TLPMX driver functions.
+
+Generated from the docstrings of TLPMX.py, with hand-checked corrections, by make_tlpmx_bindings.py, do not
+edit.
+"""
+from ctypes import *
+
+ViSession = c_long  # TLPMX keeps the session in a c_long
+ViStatus = c_int
+ViBoolean = c_uint16  # 16 bit in VISA; the docstrings mostly give c_int16, which has the same width
+
+SIGNATURES = {
+    "TLPMX_I2CRead": (ViSession, c_uint32, c_uint32, POINTER(c_uint32),),
+    "TLPMX_I2CWrite": (ViSession, c_uint32, c_char_p,),
+    "TLPMX_I2CWriteRead": (ViSession, c_uint32, c_char_p, c_uint32, POINTER(c_uint32),),
+    "TLPMX_beep": (ViSession,),
+    "TLPMX_blockFetch": (ViSession, c_uint32, POINTER(c_double), c_uint16,),
+    "TLPMX_cancelDarkAdjust": (ViSession, c_uint16,),
+    "TLPMX_cancelZeroPos": (ViSession, c_uint16,),
+    "TLPMX_close": (ViSession,),
+    "TLPMX_confBurstArrayMeasCurrentChannel": (ViSession, c_uint16,),
+    "TLPMX_confBurstArrayMeasPowerChannel": (ViSession, c_uint16,),
+    "TLPMX_confBurstArrayMeasTrigger": (ViSession, c_uint32, c_uint32, c_uint32, c_uint32,),
+    "TLPMX_confBurstArrayMeasVoltageChannel": (ViSession, c_uint16,),
+    "TLPMX_confCurrentFastArrayMeasurement": (ViSession, c_uint16,),
+    "TLPMX_confCurrentMeasurementSequence": (ViSession, c_uint32, c_uint16,),
+    "TLPMX_confCurrentMeasurementSequenceHWTrigger": (ViSession, c_uint16, c_uint32, c_uint32, c_uint16,),
+    "TLPMX_confEDensityFastArrayMeasurement": (ViSession, c_uint16,),
+    "TLPMX_confEnergyFastArrayMeasurement": (ViSession, c_uint16,),
+    "TLPMX_confFastArrayMeasurement": (ViSession, c_uint16, c_uint16,),
+    "TLPMX_confPDENMeasurementSequence": (ViSession, c_uint32, c_uint16,),
+    "TLPMX_confPDensityFastArrayMeasurement": (ViSession, c_uint16,),
+    "TLPMX_confPowerFastArrayMeasurement": (ViSession, c_uint16,),
+    "TLPMX_confPowerMeasurementSequence": (ViSession, c_uint32, c_uint16,),
+    "TLPMX_confPowerMeasurementSequenceHWTrigger": (ViSession, c_uint16, c_uint32, c_uint32, c_uint16,),
+    "TLPMX_confVolatgeMeasurementSequence": (ViSession, c_uint32, c_uint16,),
+    "TLPMX_confVolatgeMeasurementSequenceHWTrigger": (ViSession, c_uint16, c_uint32, c_uint32, c_uint16,),
+    "TLPMX_confVoltageFastArrayMeasurement": (ViSession, c_uint16,),
+    "TLPMX_deviceParamsExport": (ViSession, c_char_p,),
+    "TLPMX_deviceParamsImport": (ViSession, c_int16, c_char_p,),
+    "TLPMX_disableArrayMeasurementChannel": (ViSession, c_uint16,),
+    "TLPMX_errorCount": (ViSession, POINTER(c_uint32),),
+    "TLPMX_errorMessage": (ViSession, c_int, c_char_p,),
+    "TLPMX_errorQuery": (ViSession, POINTER(c_int), c_char_p,),
+    "TLPMX_errorQueryMode": (ViSession, c_int16,),
+    "TLPMX_exportSettingsAsJson": (ViSession, c_char_p, c_uint32,),
+    "TLPMX_fileClose": (ViSession,),
+    "TLPMX_fileOpen": (ViSession, c_char_p,),
+    "TLPMX_fileRead": (ViSession, c_uint32, c_uint32, c_int16,),
+    "TLPMX_findRsrc": (ViSession, POINTER(c_uint32),),
+    "TLPMX_getAccelMode": (ViSession, POINTER(c_int16), c_uint16,),
+    "TLPMX_getAccelState": (ViSession, POINTER(c_int16), c_uint16,),
+    "TLPMX_getAccelTau": (ViSession, c_int16, POINTER(c_double), c_uint16,),
+    "TLPMX_getActFanRpm": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_getAnalogOutputGainRange": (ViSession, POINTER(c_int16), c_uint16,),
+    "TLPMX_getAnalogOutputRoute": (ViSession, c_char_p, c_uint16,),
+    "TLPMX_getAnalogOutputSlope": (ViSession, c_int16, POINTER(c_double), c_uint16,),
+    "TLPMX_getAnalogOutputSlopeRange": (ViSession, POINTER(c_double), POINTER(c_double), c_uint16,),
+    "TLPMX_getAnalogOutputVoltage": (ViSession, c_int16, POINTER(c_double), c_uint16,),
+    "TLPMX_getAnalogOutputVoltageRange": (ViSession, POINTER(c_double), POINTER(c_double), c_uint16,),
+    "TLPMX_getAttenuation": (ViSession, c_int16, POINTER(c_double), c_uint16,),
+    "TLPMX_getAvgCnt": (ViSession, POINTER(c_int16), c_uint16,),
+    "TLPMX_getAvgTime": (ViSession, c_int16, POINTER(c_double), c_uint16,),
+    "TLPMX_getBatteryVoltage": (ViSession, POINTER(c_double),),
+    "TLPMX_getBeamDia": (ViSession, c_int16, POINTER(c_double), c_uint16,),
+    "TLPMX_getBurstArraySamples": (ViSession, c_uint32, c_uint32, POINTER(c_uint32), POINTER(c_float), POINTER(c_float),),
+    "TLPMX_getBurstArraySamplesCount": (ViSession, POINTER(c_uint32),),
+    "TLPMX_getCalibrationMsg": (ViSession, c_char_p, c_uint16,),
+    "TLPMX_getChannels": (ViSession, POINTER(c_uint16),),
+    "TLPMX_getCurrentAutorange": (ViSession, POINTER(c_int16), c_uint16,),
+    "TLPMX_getCurrentRange": (ViSession, c_int16, POINTER(c_double), c_uint16,),
+    "TLPMX_getCurrentRanges": (ViSession, POINTER(c_double), POINTER(c_uint16), c_uint16,),
+    "TLPMX_getCurrentRef": (ViSession, c_int16, POINTER(c_double), c_uint16,),
+    "TLPMX_getCurrentRefState": (ViSession, POINTER(c_int16), c_uint16,),
+    "TLPMX_getDFUPort": (ViSession, POINTER(c_uint32),),
+    "TLPMX_getDHCP": (ViSession, c_char_p,),
+    "TLPMX_getDarkAdjustState": (ViSession, POINTER(c_int16), c_uint16,),
+    "TLPMX_getDarkOffset": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_getDeviceBaudrate": (ViSession, POINTER(c_uint32),),
+    "TLPMX_getDigIoDirection": (ViSession, POINTER(c_int16), POINTER(c_int16), POINTER(c_int16), POINTER(c_int16),),
+    "TLPMX_getDigIoOutput": (ViSession, POINTER(c_int16), POINTER(c_int16), POINTER(c_int16), POINTER(c_int16),),
+    "TLPMX_getDigIoPinInput": (ViSession, POINTER(c_int16), POINTER(c_int16), POINTER(c_int16), POINTER(c_int16),),
+    "TLPMX_getDigIoPinMode": (ViSession, c_int16, POINTER(c_uint16),),
+    "TLPMX_getDigIoPort": (ViSession, POINTER(c_int16), POINTER(c_int16), POINTER(c_int16), POINTER(c_int16),),
+    "TLPMX_getDispBrightness": (ViSession, POINTER(c_double),),
+    "TLPMX_getDispContrast": (ViSession, POINTER(c_double),),
+    "TLPMX_getDisplayName": (ViSession, c_char_p,),
+    "TLPMX_getDriverBaudrate": (ViSession, POINTER(c_uint32),),
+    "TLPMX_getEnableBthSearch": (ViSession, POINTER(c_int16),),
+    "TLPMX_getEnableNetSearch": (ViSession, POINTER(c_int16),),
+    "TLPMX_getEncryption": (ViSession, c_char_p, POINTER(c_int16),),
+    "TLPMX_getEnergyRange": (ViSession, c_int16, POINTER(c_double), c_uint16,),
+    "TLPMX_getEnergyRef": (ViSession, c_int16, POINTER(c_double), c_uint16,),
+    "TLPMX_getEnergyRefState": (ViSession, POINTER(c_int16), c_uint16,),
+    "TLPMX_getExtNtcParameter": (ViSession, c_int16, POINTER(c_double), POINTER(c_double), c_uint16,),
+    "TLPMX_getFanAdjustParameters": (ViSession, POINTER(c_double), POINTER(c_double), POINTER(c_double), POINTER(c_double), c_uint16,),
+    "TLPMX_getFanMode": (ViSession, POINTER(c_uint16), c_uint16,),
+    "TLPMX_getFanRpm": (ViSession, POINTER(c_double), POINTER(c_double), c_uint16,),
+    "TLPMX_getFanState": (ViSession, POINTER(c_int16), c_uint16,),
+    "TLPMX_getFanTemperatureSource": (ViSession, POINTER(c_uint16), c_uint16,),
+    "TLPMX_getFanVoltage": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_getFastMaxSamplerate": (ViSession, POINTER(c_uint32), c_uint16,),
+    "TLPMX_getFetchState": (ViSession, POINTER(c_int16), c_uint16,),
+    "TLPMX_getFilterAutoMode": (ViSession, POINTER(c_int16),),
+    "TLPMX_getFilterPosition": (ViSession, POINTER(c_int16),),
+    "TLPMX_getFreqMode": (ViSession, POINTER(c_uint16), c_uint16,),
+    "TLPMX_getFreqRange": (ViSession, POINTER(c_double), POINTER(c_double), c_uint16,),
+    "TLPMX_getHostname": (ViSession, c_char_p,),
+    "TLPMX_getI2CMode": (ViSession, POINTER(c_int16),),
+    "TLPMX_getIPAddress": (ViSession, c_char_p,),
+    "TLPMX_getIPMask": (ViSession, c_char_p,),
+    "TLPMX_getInputAdapterType": (ViSession, POINTER(c_int16), c_uint16,),
+    "TLPMX_getInputFilterState": (ViSession, POINTER(c_int16), c_uint16,),
+    "TLPMX_getLANPropagation": (ViSession, POINTER(c_int16),),
+    "TLPMX_getLaserState": (ViSession, POINTER(c_int16),),
+    "TLPMX_getLineFrequency": (ViSession, POINTER(c_int16),),
+    "TLPMX_getLookForInfoOnSearch": (ViSession, POINTER(c_int16),),
+    "TLPMX_getMACAddress": (ViSession, c_char_p,),
+    "TLPMX_getMeasPinEnergyLevel": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_getMeasPinMode": (ViSession, POINTER(c_int16), c_uint16,),
+    "TLPMX_getMeasPinPowerLevel": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_getMeasurementSequence": (ViSession, c_uint32, POINTER(c_float), POINTER(c_float), POINTER(c_float),),
+    "TLPMX_getNextFastArrayMeasurement": (ViSession, POINTER(c_uint32), POINTER(c_uint32), POINTER(c_float), c_uint16,),
+    "TLPMX_getNextFastArrayMeasurementRelativeTime": (ViSession, POINTER(c_uint32), POINTER(c_uint32), POINTER(c_float), c_uint16,),
+    "TLPMX_getPeakFilter": (ViSession, POINTER(c_int16), c_uint16,),
+    "TLPMX_getPeakThreshold": (ViSession, c_int16, POINTER(c_double), c_uint16,),
+    "TLPMX_getPhotodiodeResponsivity": (ViSession, c_int16, POINTER(c_double), c_uint16,),
+    "TLPMX_getPositionAnalogOutputSlope": (ViSession, c_int16, POINTER(c_double), c_uint16,),
+    "TLPMX_getPositionAnalogOutputSlopeRange": (ViSession, POINTER(c_double), POINTER(c_double), c_uint16,),
+    "TLPMX_getPositionAnalogOutputVoltage": (ViSession, c_int16, POINTER(c_double), POINTER(c_double), c_uint16,),
+    "TLPMX_getPositionAnalogOutputVoltageRange": (ViSession, POINTER(c_double), POINTER(c_double), c_uint16,),
+    "TLPMX_getPowerAutorange": (ViSession, POINTER(c_int16), c_uint16,),
+    "TLPMX_getPowerCalibrationPoints": (ViSession, c_uint16, c_uint16, POINTER(c_double), POINTER(c_double), c_uint16,),
+    "TLPMX_getPowerCalibrationPointsInformation": (ViSession, c_uint16, c_char_p, c_char_p, POINTER(c_uint16), c_char_p, POINTER(c_uint16), c_uint16,),
+    "TLPMX_getPowerCalibrationPointsState": (ViSession, c_uint16, POINTER(c_int16), c_uint16,),
+    "TLPMX_getPowerRange": (ViSession, c_int16, POINTER(c_double), c_uint16,),
+    "TLPMX_getPowerRef": (ViSession, c_int16, POINTER(c_double), c_uint16,),
+    "TLPMX_getPowerRefState": (ViSession, POINTER(c_int16), c_uint16,),
+    "TLPMX_getPowerUnit": (ViSession, POINTER(c_int16), c_uint16,),
+    "TLPMX_getPyrosensorResponsivity": (ViSession, c_int16, POINTER(c_double), c_uint16,),
+    "TLPMX_getRsrcInfo": (ViSession, c_uint32, c_char_p, c_char_p, c_char_p, POINTER(c_int16),),
+    "TLPMX_getRsrcName": (ViSession, c_uint32, c_char_p,),
+    "TLPMX_getSCPIPort": (ViSession, POINTER(c_uint32),),
+    "TLPMX_getSensorInfo": (ViSession, c_char_p, c_char_p, c_char_p, POINTER(c_int16), POINTER(c_int16), POINTER(c_int16), c_uint16,),
+    "TLPMX_getShutterInterlock": (ViSession, POINTER(c_int16),),
+    "TLPMX_getShutterPosition": (ViSession, POINTER(c_int16),),
+    "TLPMX_getSummertime": (ViSession, POINTER(c_int16),),
+    "TLPMX_getThermopileResponsivity": (ViSession, c_int16, POINTER(c_double), c_uint16,),
+    "TLPMX_getTime": (ViSession, POINTER(c_int16), POINTER(c_int16), POINTER(c_int16), POINTER(c_int16), POINTER(c_int16), POINTER(c_int16),),
+    "TLPMX_getTimeoutValue": (ViSession, POINTER(c_uint32),),
+    "TLPMX_getVoltageAutorange": (ViSession, POINTER(c_int16), c_uint16,),
+    "TLPMX_getVoltageRange": (ViSession, c_int16, POINTER(c_double), c_uint16,),
+    "TLPMX_getVoltageRanges": (ViSession, POINTER(c_double), POINTER(c_uint16), c_uint16,),
+    "TLPMX_getVoltageRef": (ViSession, c_int16, POINTER(c_double), c_uint16,),
+    "TLPMX_getVoltageRefState": (ViSession, POINTER(c_int16), c_uint16,),
+    "TLPMX_getWavelength": (ViSession, c_int16, POINTER(c_double), c_uint16,),
+    "TLPMX_getWebPort": (ViSession, POINTER(c_uint32),),
+    "TLPMX_getZeroPos": (ViSession, POINTER(c_double), POINTER(c_double), c_uint16,),
+    "TLPMX_identificationQuery": (ViSession, c_char_p, c_char_p, c_char_p, c_char_p,),
+    "TLPMX_importSettingsFromJson": (ViSession, c_int16, c_char_p,),
+    "TLPMX_init": (c_char_p, ViBoolean, ViBoolean, POINTER(ViSession),),
+    "TLPMX_initWithEncryption": (ViSession, c_int16, c_int16, c_char_p, POINTER(ViSession),),
+    "TLPMX_isPeakDetectorRunning": (ViSession, POINTER(c_int16), c_uint16,),
+    "TLPMX_listDirectory": (ViSession, c_char_p, c_uint32,),
+    "TLPMX_meas4QPositions": (ViSession, POINTER(c_double), POINTER(c_double), c_uint16,),
+    "TLPMX_meas4QVoltages": (ViSession, POINTER(c_double), POINTER(c_double), POINTER(c_double), POINTER(c_double), c_uint16,),
+    "TLPMX_measAuxAD0": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_measAuxAD1": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_measCurrent": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_measDualChannelSimultaneous": (ViSession, c_uint16, POINTER(c_double), POINTER(c_double),),
+    "TLPMX_measEmmHumidity": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_measEmmTemperature": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_measEnergy": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_measEnergyDens": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_measExtNtcResistance": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_measExtNtcTemperature": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_measFreq": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_measHeadResistance": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_measHeadTemperature": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_measNegDutyCycle": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_measNegPulseWidth": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_measPosDutyCycle": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_measPosPulseWidth": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_measPower": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_measPowerDens": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_measPowerMeasurementSequence": (ViSession, c_uint32, c_uint16,),
+    "TLPMX_measPowerMeasurementSequenceHWTrigger": (ViSession, c_uint32, c_uint32, c_uint16,),
+    "TLPMX_measVoltage": (ViSession, POINTER(c_double), c_uint16,),
+    "TLPMX_measureCurrentMeasurementSequence": (ViSession, c_uint32, c_uint16,),
+    "TLPMX_measureCurrentMeasurementSequenceHWTrigger": (ViSession, c_uint32, c_uint32, c_uint16,),
+    "TLPMX_measureVoltageMeasurementSequence": (ViSession, c_uint32, c_uint16,),
+    "TLPMX_measureVoltageMeasurementSequenceHWTrigger": (ViSession, c_uint32, c_uint32, c_uint16,),
+    "TLPMX_presetRegister": (ViSession,),
+    "TLPMX_readRaw": (ViSession, c_char_p, c_uint32, POINTER(c_uint32),),
+    "TLPMX_readRegister": (ViSession, c_int16, POINTER(c_int16),),
+    "TLPMX_reinitSensor": (ViSession, c_uint16,),
+    "TLPMX_reset": (ViSession,),
+    "TLPMX_resetFastArrayMeasurement": (ViSession, c_uint16,),
+    "TLPMX_revisionQuery": (ViSession, c_char_p, c_char_p,),
+    "TLPMX_selfTest": (ViSession, POINTER(c_int16), c_char_p,),
+    "TLPMX_sendNTPRequest": (ViSession, c_int16, c_int16, c_char_p,),
+    "TLPMX_setAccelMode": (ViSession, c_int16, c_uint16,),
+    "TLPMX_setAccelState": (ViSession, c_int16, c_uint16,),
+    "TLPMX_setAccelTau": (ViSession, c_double, c_uint16,),
+    "TLPMX_setAnalogOutputGainRange": (ViSession, c_int16, c_uint16,),
+    "TLPMX_setAnalogOutputRoute": (ViSession, c_uint16, c_uint16,),
+    "TLPMX_setAnalogOutputSlope": (ViSession, c_double, c_uint16,),
+    "TLPMX_setAttenuation": (ViSession, c_double, c_uint16,),
+    "TLPMX_setAvgCnt": (ViSession, c_int16, c_uint16,),
+    "TLPMX_setAvgTime": (ViSession, c_double, c_uint16,),
+    "TLPMX_setBeamDia": (ViSession, c_double, c_uint16,),
+    "TLPMX_setCurrentAutoRange": (ViSession, c_int16, c_uint16,),
+    "TLPMX_setCurrentRange": (ViSession, c_double, c_uint16,),
+    "TLPMX_setCurrentRangeSearch": (ViSession, c_uint16,),
+    "TLPMX_setCurrentRef": (ViSession, c_double, c_uint16,),
+    "TLPMX_setCurrentRefState": (ViSession, c_int16, c_uint16,),
+    "TLPMX_setDFUPort": (ViSession, c_uint32,),
+    "TLPMX_setDHCP": (ViSession, c_char_p,),
+    "TLPMX_setDarkOffset": (ViSession, c_double, c_uint16,),
+    "TLPMX_setDeviceBaudrate": (ViSession, c_uint32,),
+    "TLPMX_setDigIoDirection": (ViSession, c_int16, c_int16, c_int16, c_int16,),
+    "TLPMX_setDigIoOutput": (ViSession, c_int16, c_int16, c_int16, c_int16,),
+    "TLPMX_setDigIoPinMode": (ViSession, c_int16, c_uint16,),
+    "TLPMX_setDispBrightness": (ViSession, c_double,),
+    "TLPMX_setDispContrast": (ViSession, c_double,),
+    "TLPMX_setDisplayName": (ViSession, c_char_p,),
+    "TLPMX_setDriverBaudrate": (ViSession, c_uint32,),
+    "TLPMX_setEnableBthSearch": (ViSession, c_int16,),
+    "TLPMX_setEnableNetSearch": (ViSession, c_int16,),
+    "TLPMX_setEncryption": (ViSession, c_char_p, c_char_p, c_int16,),
+    "TLPMX_setEnergyRange": (ViSession, c_double, c_uint16,),
+    "TLPMX_setEnergyRef": (ViSession, c_double, c_uint16,),
+    "TLPMX_setEnergyRefState": (ViSession, c_int16, c_uint16,),
+    "TLPMX_setExtNtcParameter": (ViSession, c_double, c_double, c_uint16,),
+    "TLPMX_setFanAdjustParameters": (ViSession, c_double, c_double, c_double, c_double, c_uint16,),
+    "TLPMX_setFanMode": (ViSession, c_uint16, c_uint16,),
+    "TLPMX_setFanRpm": (ViSession, c_double, c_double, c_uint16,),
+    "TLPMX_setFanTemperatureSource": (ViSession, c_uint16, c_uint16,),
+    "TLPMX_setFanVoltage": (ViSession, c_double, c_uint16,),
+    "TLPMX_setFilterAutoMode": (ViSession, c_int16,),
+    "TLPMX_setFilterPosition": (ViSession, c_int16,),
+    "TLPMX_setFreqMode": (ViSession, c_uint16, c_uint16,),
+    "TLPMX_setHostname": (ViSession, c_char_p,),
+    "TLPMX_setI2CMode": (ViSession, c_uint16,),
+    "TLPMX_setIPAddress": (ViSession, c_char_p,),
+    "TLPMX_setIPMask": (ViSession, c_char_p,),
+    "TLPMX_setInputAdapterType": (ViSession, c_int16, c_uint16,),
+    "TLPMX_setInputFilterState": (ViSession, c_int16, c_uint16,),
+    "TLPMX_setLANPropagation": (ViSession, c_int16,),
+    "TLPMX_setLaserState": (ViSession, c_int16, c_uint32, c_uint32,),
+    "TLPMX_setLineFrequency": (ViSession, c_int16,),
+    "TLPMX_setLookForInfoOnSearch": (ViSession, c_int16,),
+    "TLPMX_setMeasPinEnergyLevel": (ViSession, c_double, c_uint16,),
+    "TLPMX_setMeasPinPowerLevel": (ViSession, c_double, c_uint16,),
+    "TLPMX_setNegativeDutyCycle": (ViSession, c_double, c_uint16,),
+    "TLPMX_setNegativePulseWidth": (ViSession, c_double, c_uint16,),
+    "TLPMX_setNetSearchMask": (ViSession, c_char_p,),
+    "TLPMX_setPeakFilter": (ViSession, c_int16, c_uint16,),
+    "TLPMX_setPeakThreshold": (ViSession, c_double, c_uint16,),
+    "TLPMX_setPhotodiodeResponsivity": (ViSession, c_double, c_uint16,),
+    "TLPMX_setPositionAnalogOutputSlope": (ViSession, c_double, c_uint16,),
+    "TLPMX_setPositiveDutyCycle": (ViSession, c_double, c_uint16,),
+    "TLPMX_setPositivePulseWidth": (ViSession, c_double, c_uint16,),
+    "TLPMX_setPowerAutoRange": (ViSession, c_int16, c_uint16,),
+    "TLPMX_setPowerCalibrationPoints": (ViSession, c_uint16, c_uint16, POINTER(c_double), POINTER(c_double), c_char_p, c_uint16, c_uint16,),
+    "TLPMX_setPowerCalibrationPointsState": (ViSession, c_uint16, c_int16, c_uint16,),
+    "TLPMX_setPowerRange": (ViSession, c_double, c_uint16,),
+    "TLPMX_setPowerRef": (ViSession, c_double, c_uint16,),
+    "TLPMX_setPowerRefState": (ViSession, c_int16, c_uint16,),
+    "TLPMX_setPowerUnit": (ViSession, c_int16, c_uint16,),
+    "TLPMX_setPyrosensorResponsivity": (ViSession, c_double, c_uint16,),
+    "TLPMX_setSCPIPort": (ViSession, c_uint32,),
+    "TLPMX_setShutterPosition": (ViSession, c_int16,),
+    "TLPMX_setSummertime": (ViSession, c_int16,),
+    "TLPMX_setThermopileResponsivity": (ViSession, c_double, c_uint16,),
+    "TLPMX_setTime": (ViSession, c_int16, c_int16, c_int16, c_int16, c_int16, c_int16,),
+    "TLPMX_setTimeoutValue": (ViSession, c_uint32,),
+    "TLPMX_setVoltageAutoRange": (ViSession, c_int16, c_uint16,),
+    "TLPMX_setVoltageRange": (ViSession, c_double, c_uint16,),
+    "TLPMX_setVoltageRangeSearch": (ViSession, c_uint16,),
+    "TLPMX_setVoltageRef": (ViSession, c_double, c_uint16,),
+    "TLPMX_setVoltageRefState": (ViSession, c_int16, c_uint16,),
+    "TLPMX_setWavelength": (ViSession, c_double, c_uint16,),
+    "TLPMX_setWebPort": (ViSession, c_uint32,),
+    "TLPMX_setZeroPos": (ViSession, c_double, c_double, c_uint16,),
+    "TLPMX_startBurstArrayMeasurement": (ViSession,),
+    "TLPMX_startDarkAdjust": (ViSession, c_uint16,),
+    "TLPMX_startMeasurementSequence": (ViSession, c_uint32, POINTER(c_int16),),
+    "TLPMX_startPeakDetector": (ViSession, c_uint16,),
+    "TLPMX_startZeroPos": (ViSession, c_uint16,),
+    "TLPMX_writeRaw": (ViSession, c_char_p,),
+    "TLPMX_writeRegister": (ViSession, c_int16, c_int16,),
+}
+
+
+def bind(dll):
+    """
+    Declares argtypes and restype of the TLPMX functions in `dll`.
+
+    ctypes keeps the function pointers as attributes of the library, so `dll.TLPMX_xxx` returns the bound
+    pointer from then on and arguments are checked and converted by the declared types. Functions the
+    library does not export (older driver versions) are skipped.
+
+    :param dll: loaded TLPMX library
+    :return: dict of the bound function pointers by name
+    """
+    functions = {}
+    for name, argtypes in SIGNATURES.items():
+        try:
+            function = getattr(dll, name)
+        except AttributeError:
+            continue
+        function.argtypes = argtypes
+        function.restype = ViStatus
+        functions[name] = function
+    return functions
@@ -0,0 +1,145 @@
+from ctypes import *
+
+from TLPMX import TLPM_ATTR_SET_VAL, TLPM_DEFAULT_CHANNEL, TLPM_MEAS_POWER
+
+
+class MeterFacade:
+    """
+    Value-returning front end of the `TLPMX` meas*/get* calls.
+
+    The output buffers, their `byref` references, the channel numbers and the attribute arguments are
+    created once and reused, so a call like `power(channel)` allocates no ctypes objects and returns a
+    plain Python float or int. Meant for the tight loops that read the meter at every point.
+    """
+
+    def __init__(self, meter, channel=TLPM_DEFAULT_CHANNEL):
+        """
+        :param meter: open `TLPMX` session (or a stand-in like `powermeter_sim.SimulatedTLPMX`)
+        :param channel: channel used when a call does not give one
+        """
+        self.meter = meter
+        self.channel = channel
+        self._uint16s = {}
+        self._int16s = {}
+        self._double = c_double()
+        self._double_ref = byref(self._double)
+        self._double2 = c_double()
+        self._double2_ref = byref(self._double2)
+        self._int16 = c_int16()
+        self._int16_ref = byref(self._int16)
+
+    def _uint16(self, value):
+        argument = self._uint16s.get(value)
+        if argument is None:
+            argument = self._uint16s[value] = c_uint16(value)
+        return argument
+
+    def _channel(self, channel):
+        return self._uint16(self.channel if channel is None else channel)
+
+    def _attribute(self, attribute):
+        argument = self._int16s.get(attribute)
+        if argument is None:
+            argument = self._int16s[attribute] = c_int16(attribute)
+        return argument
+
+    def _measure(self, function, channel):
+        function(self._double_ref, self._channel(channel))
+        return self._double.value
+
+    def _get(self, function, attribute, channel):
+        function(self._attribute(attribute), self._double_ref, self._channel(channel))
+        return self._double.value
+
+    def power(self, channel=None):
+        """
+        :return: power in the unit set on the meter (W by default)
+        """
+        return self._measure(self.meter.measPower, channel)
+
+    def current(self, channel=None):
+        """
+        :return: photodiode current in A
+        """
+        return self._measure(self.meter.measCurrent, channel)
+
+    def voltage(self, channel=None):
+        """
+        :return: thermopile or pyroelectric voltage in V
+        """
+        return self._measure(self.meter.measVoltage, channel)
+
+    def energy(self, channel=None):
+        """
+        :return: pulse energy in J
+        """
+        return self._measure(self.meter.measEnergy, channel)
+
+    def frequency(self, channel=None):
+        """
+        :return: pulse frequency in Hz
+        """
+        return self._measure(self.meter.measFreq, channel)
+
+    def power_density(self, channel=None):
+        """
+        :return: power density in W/cm²
+        """
+        return self._measure(self.meter.measPowerDens, channel)
+
+    def energy_density(self, channel=None):
+        """
+        :return: energy density in J/cm²
+        """
+        return self._measure(self.meter.measEnergyDens, channel)
+
+    def head_temperature(self, channel=None):
+        """
+        :return: sensor head temperature in °C
+        """
+        return self._measure(self.meter.measHeadTemperature, channel)
+
+    def dual_channel(self, measurement=TLPM_MEAS_POWER):
+        """
+        Measures both channels of a dual-channel meter simultaneously.
+
+        :param measurement: TLPM_MEAS_* quantity
+        :return: (channel 1, channel 2) results
+        """
+        self.meter.measDualChannelSimultaneous(self._uint16(measurement), self._double_ref, self._double2_ref)
+        return self._double.value, self._double2.value
+
+    def wavelength(self, attribute=TLPM_ATTR_SET_VAL, channel=None):
+        """
+        :param attribute: TLPM_ATTR_* value to read
+        :return: correction wavelength in nm
+        """
+        return self._get(self.meter.getWavelength, attribute, channel)
+
+    def power_range(self, attribute=TLPM_ATTR_SET_VAL, channel=None):
+        """
+        :param attribute: TLPM_ATTR_* value to read
+        :return: power range in W
+        """
+        return self._get(self.meter.getPowerRange, attribute, channel)
+
+    def avg_time(self, attribute=TLPM_ATTR_SET_VAL, channel=None):
+        """
+        :param attribute: TLPM_ATTR_* value to read
+        :return: averaging time in s
+        """
+        return self._get(self.meter.getAvgTime, attribute, channel)
+
+    def avg_count(self, channel=None):
+        """
+        :return: averaging count (PM100 series)
+        """
+        self.meter.getAvgCnt(self._int16_ref, self._channel(channel))
+        return self._int16.value
+
+    def auto_range(self, channel=None):
+        """
+        :return: True if power auto range is on
+        """
+        self.meter.getPowerAutorange(self._int16_ref, self._channel(channel))
+        return bool(self._int16.value)
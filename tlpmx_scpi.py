@@ -0,0 +1,283 @@
+from TLPMX import TLPMX, TLPM_ATTR_DFLT_VAL, TLPM_ATTR_MAX_VAL, TLPM_ATTR_MIN_VAL, TLPM_AUTORANGE_POWER_ON, \
+    TLPM_POWER_UNIT_DBM, TLPM_POWER_UNIT_WATT
+
+# Thorlabs USBTMC meters; network meters are opened by name, e.g. "TCPIP::192.168.1.10::5025::SOCKET"
+RESOURCE_QUERY = "USB?*::0x1313::?*::INSTR"
+TIMEOUT = 2000  # ms
+_BOUNDS = {TLPM_ATTR_MIN_VAL: " MIN", TLPM_ATTR_MAX_VAL: " MAX", TLPM_ATTR_DFLT_VAL: " DEF"}
+# What to use instead of TLPMX methods the SCPI backend does not implement
+_ALTERNATIVES = {"setAvgTime": "use setAvgCnt", "getAvgTime": "use getAvgCnt"}
+
+
+def _value(arg):
+    """
+    Returns the Python value of a ctypes argument, passed either directly or through `byref`.
+    """
+    arg = getattr(arg, "_obj", arg)
+    value = getattr(arg, "value", arg)
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _set(ref, value):
+    """
+    Writes `value` into the ctypes object behind a `byref` argument, unless it is None (VI_NULL).
+    """
+    if ref is not None:
+        getattr(ref, "_obj", ref).value = value
+
+
+def _bound(attribute):
+    return _BOUNDS.get(_value(attribute), "")
+
+
+class ScpiTLPMX:
+    """
+    `TLPMX` driver session that speaks SCPI through pyvisa instead of loading TLPMX_32/64.dll.
+
+    It implements the `TLPMX` settings, dark adjustment, scalar measurement and raw I/O methods used by this
+    project with the same ctypes arguments, and failures raise `NameError` like `TLPMX`, so it can be passed
+    as `powermeter.TLPMXSession(driver=ScpiTLPMX)`. With the pyvisa-py backend it runs on Linux over USBTMC or
+    TCP sockets without NI-VISA. Every other `TLPMX` method, among them the fast-array, burst, sequence and
+    digital I/O methods, raises `NameError` saying it is not supported by the SCPI backend; check with
+    `powermeter.TLPMXSession.supports` before relying on them. Binary block transfers and asynchronous I/O
+    are not used. The backend is never picked implicitly: pass it as the driver where the DLL is not available.
+    """
+
+    def __init__(self, resource_manager=None, timeout=TIMEOUT):
+        """
+        :param resource_manager: `pyvisa.ResourceManager`, by default one with pyvisa's default backend
+        :param timeout: I/O timeout in ms
+        """
+        import pyvisa  # only needed if this backend is used
+        self.errors = (pyvisa.Error, OSError, ValueError)
+        self.rm = resource_manager if resource_manager is not None else pyvisa.ResourceManager()
+        self.timeout = timeout
+        self.resources = []
+        self.instrument = None
+        self.pending = b""  # rest of an answer longer than the readRaw buffer
+
+    def _write(self, command):
+        if self.instrument is None:
+            raise NameError(b"Instrument session is not open.")
+        try:
+            self.instrument.write(command)
+        except self.errors as error:
+            raise NameError(str(error).encode()) from error
+
+    def _query(self, command):
+        if self.instrument is None:
+            raise NameError(b"Instrument session is not open.")
+        try:
+            return self.instrument.query(command).strip()
+        except self.errors as error:
+            raise NameError(str(error).encode()) from error
+
+    def _query_float(self, command):
+        return float(self._query(command))
+
+    @staticmethod
+    def _unsupported(name):
+        alternative = f" ({_ALTERNATIVES[name]})" if name in _ALTERNATIVES else ""
+        raise NameError(f"{name} is not supported by the SCPI backend{alternative}.".encode())
+
+    def __getattr__(self, name):
+        # The TLPMX methods not implemented here fail like a driver call, not with AttributeError
+        if not name.startswith("_") and callable(getattr(TLPMX, name, None)):
+            def unsupported(*args):
+                self._unsupported(name)
+            return unsupported
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    # Resources and session
+
+    def findRsrc(self, resourceCount):
+        try:
+            self.resources = list(self.rm.list_resources(RESOURCE_QUERY))
+        except self.errors:
+            self.resources = []  # pyvisa raises if nothing matches
+        _set(resourceCount, len(self.resources))
+        return 0
+
+    def getRsrcName(self, index, resourceName):
+        index = _value(index)
+        if not 0 <= index < len(self.resources):
+            raise NameError(b"Invalid resource index.")
+        resourceName.value = self.resources[index].encode()
+        return 0
+
+    def open(self, resourceName, IDQuery, resetDevice):
+        self.close()
+        self.pending = b""
+        try:
+            instrument = self.rm.open_resource(_value(resourceName))
+        except self.errors as error:
+            raise NameError(str(error).encode()) from error
+        instrument.read_termination = "\n"
+        instrument.write_termination = "\n"
+        instrument.timeout = self.timeout
+        self.instrument = instrument
+        if _value(resetDevice):
+            self._write("*RST")
+        if _value(IDQuery) and not self._query("*IDN?").startswith("Thorlabs"):
+            self.close()
+            raise NameError(b"The instrument is not a Thorlabs power meter.")
+        return 0
+
+    def close(self):
+        if self.instrument is not None:
+            try:
+                self.instrument.close()
+            except self.errors:
+                pass  # The link is already gone
+            finally:
+                self.instrument = None
+        return 0
+
+    def identificationQuery(self, manufacturerName, deviceName, serialNumber, firmwareRevision):
+        fields = (self._query("*IDN?").split(",") + [""] * 4)[:4]
+        for buffer, field in zip((manufacturerName, deviceName, serialNumber, firmwareRevision), fields):
+            if buffer is not None:
+                buffer.value = field.strip().encode()
+        return 0
+
+    def errorQuery(self, errorNumber, errorMessage):
+        number, _, message = self._query("SYST:ERR?").partition(",")
+        _set(errorNumber, int(number))
+        if errorMessage is not None:
+            errorMessage.value = message.strip('"').encode()
+        return 0
+
+    def getSensorInfo(self, name, snr, message, pType, pStype, pFlags, channel):
+        fields = (self._query(f"SYST:SENS{_value(channel)}:IDN?").split(",") + [""] * 6)[:6]
+        for buffer, field in zip((name, snr, message), fields):
+            if buffer is not None:
+                buffer.value = field.encode()
+        for ref, field in zip((pType, pStype, pFlags), fields[3:]):
+            _set(ref, int(field or 0))
+        return 0
+
+    def writeRaw(self, command):
+        command = _value(command)
+        self._write(command.rstrip("\n"))
+        return 0
+
+    def readRaw(self, buffer, size, returnCount):
+        if self.instrument is None:
+            raise NameError(b"Instrument session is not open.")
+        if not self.pending:
+            try:
+                self.pending = (self.instrument.read() + "\n").encode()
+            except self.errors as error:
+                raise NameError(str(error).encode()) from error
+        data = self.pending[:_value(size)]
+        self.pending = self.pending[len(data):]
+        buffer[:len(data)] = data
+        if len(data) < _value(size):
+            buffer[len(data)] = b"\0"
+        _set(returnCount, len(data))
+        return 0
+
+    # Settings
+
+    def setWavelength(self, wavelength, channel):
+        self._write(f"SENS{_value(channel)}:CORR:WAV {float(_value(wavelength))!r}")
+        return 0
+
+    def getWavelength(self, attribute, wavelength, channel):
+        _set(wavelength, self._query_float(f"SENS{_value(channel)}:CORR:WAV?{_bound(attribute)}"))
+        return 0
+
+    def setPowerUnit(self, powerUnit, channel):
+        unit = "DBM" if _value(powerUnit) == TLPM_POWER_UNIT_DBM else "W"
+        self._write(f"SENS{_value(channel)}:POW:DC:UNIT {unit}")
+        return 0
+
+    def getPowerUnit(self, powerUnit, channel):
+        unit = self._query(f"SENS{_value(channel)}:POW:DC:UNIT?")
+        _set(powerUnit, TLPM_POWER_UNIT_DBM if unit.upper() == "DBM" else TLPM_POWER_UNIT_WATT)
+        return 0
+
+    def setPowerAutoRange(self, powerAutorangeMode, channel):
+        state = "ON" if _value(powerAutorangeMode) == TLPM_AUTORANGE_POWER_ON else "OFF"
+        self._write(f"SENS{_value(channel)}:POW:DC:RANG:AUTO {state}")
+        return 0
+
+    def getPowerAutorange(self, powerAutorangeMode, channel):
+        _set(powerAutorangeMode, int(self._query(f"SENS{_value(channel)}:POW:DC:RANG:AUTO?")))
+        return 0
+
+    def setPowerRange(self, power_to_Measure, channel):
+        self._write(f"SENS{_value(channel)}:POW:DC:RANG:UPP {float(_value(power_to_Measure))!r}")
+        return 0
+
+    def getPowerRange(self, attribute, powerValue, channel):
+        _set(powerValue, self._query_float(f"SENS{_value(channel)}:POW:DC:RANG:UPP?{_bound(attribute)}"))
+        return 0
+
+    def getCurrentRange(self, attribute, currentValue, channel):
+        _set(currentValue, self._query_float(f"SENS{_value(channel)}:CURR:DC:RANG:UPP?{_bound(attribute)}"))
+        return 0
+
+    def setAvgCnt(self, averageCount, channel):
+        self._write(f"SENS{_value(channel)}:AVER:COUN {_value(averageCount)}")
+        return 0
+
+    def getAvgCnt(self, averageCount, channel):
+        _set(averageCount, int(float(self._query(f"SENS{_value(channel)}:AVER:COUN?"))))
+        return 0
+
+    # Dark adjustment
+
+    def startDarkAdjust(self, channel):
+        self._write(f"SENS{_value(channel)}:CORR:COLL:ZERO:INIT")
+        return 0
+
+    def cancelDarkAdjust(self, channel):
+        self._write(f"SENS{_value(channel)}:CORR:COLL:ZERO:ABOR")
+        return 0
+
+    def getDarkAdjustState(self, state, channel):
+        _set(state, int(self._query(f"SENS{_value(channel)}:CORR:COLL:ZERO:STAT?")))
+        return 0
+
+    def setDarkOffset(self, darkOffset, channel):
+        self._write(f"SENS{_value(channel)}:CORR:COLL:ZERO:MAGN {float(_value(darkOffset))!r}")
+        return 0
+
+    def getDarkOffset(self, darkOffset, channel):
+        _set(darkOffset, self._query_float(f"SENS{_value(channel)}:CORR:COLL:ZERO:MAGN?"))
+        return 0
+
+    # Measurements
+
+    def measPower(self, power, channel):
+        _set(power, self._query_float(f"MEAS{_value(channel)}:POW?"))
+        return 0
+
+    def measCurrent(self, current, channel):
+        _set(current, self._query_float(f"MEAS{_value(channel)}:CURR?"))
+        return 0
+
+    def measVoltage(self, voltage, channel):
+        _set(voltage, self._query_float(f"MEAS{_value(channel)}:VOLT?"))
+        return 0
+
+    def measEnergy(self, energy, channel):
+        _set(energy, self._query_float(f"MEAS{_value(channel)}:ENER?"))
+        return 0
+
+    def measFreq(self, frequency, channel):
+        _set(frequency, self._query_float(f"MEAS{_value(channel)}:FREQ?"))
+        return 0
+
+    def measPowerDens(self, powerDensity, channel):
+        _set(powerDensity, self._query_float(f"MEAS{_value(channel)}:PDEN?"))
+        return 0
+
+    def measEnergyDens(self, energyDensity, channel):
+        _set(energyDensity, self._query_float(f"MEAS{_value(channel)}:EDEN?"))
+        return 0
+
+    def measHeadTemperature(self, frequency, channel):
+        _set(frequency, self._query_float(f"MEAS{_value(channel)}:TEMP?"))
+        return 0
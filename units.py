@@ -0,0 +1,75 @@
+from ctypes import *
+
+import numpy as np
+
+STEPS_PER_REV = 512  # for the MTS25-Z8
+GBOX_RATIO = 67.49  # gearbox ratio
+PITCH = 1.0
+
+# Unit types for CC_GetDeviceUnitFromRealValue / CC_GetRealValueFromDeviceUnit
+DISTANCE = 0
+VELOCITY = 1
+ACCELERATION = 2
+
+# The TCube DC servo scales velocities and accelerations by its sampling interval (2048 / 6 MHz)
+SAMPLING_INTERVAL = 2048 / 6e6
+
+# Positions (mm), velocities (mm/s) and accelerations (mm/s^2) compared against the DLL by `verify`
+VERIFY_VALUES = {
+    DISTANCE: (0.0, 0.001, 1.0, 12.5, 25.0),
+    VELOCITY: (0.1, 1.0, 2.3),
+    ACCELERATION: (0.5, 1.5),
+}
+
+
+class UnitConverter:
+    """
+    Converts between real units and TCube DC servo device units without calling into the Kinesis DLL.
+
+    The scale factors are derived once from the motor parameters, so positions can be planned before the
+    device is opened and whole NumPy arrays of positions are converted in one operation.
+    """
+
+    def __init__(self, steps_per_rev=STEPS_PER_REV, gbox_ratio=GBOX_RATIO, pitch=PITCH):
+        counts_per_mm = steps_per_rev * gbox_ratio / pitch
+        self.scales = {
+            DISTANCE: counts_per_mm,
+            VELOCITY: counts_per_mm * SAMPLING_INTERVAL * 65536,
+            ACCELERATION: counts_per_mm * SAMPLING_INTERVAL ** 2 * 65536,
+        }
+
+    def to_device(self, real_value, unit_type=DISTANCE):
+        """
+        Converts a value or array in mm, mm/s or mm/s^2 to device units.
+
+        :return: int for a scalar input, otherwise an int64 NumPy array
+        """
+        dev_value = np.rint(np.asarray(real_value, dtype=float) * self.scales[unit_type]).astype(np.int64)
+        return dev_value if dev_value.ndim else int(dev_value)
+
+    def to_real(self, dev_value, unit_type=DISTANCE):
+        """
+        Converts a value or array in device units to mm, mm/s or mm/s^2.
+
+        :return: float for a scalar input, otherwise a float64 NumPy array
+        """
+        real_value = np.asarray(dev_value, dtype=float) / self.scales[unit_type]
+        return real_value if real_value.ndim else float(real_value)
+
+    def verify(self, lib, serial_num, tolerance=1):
+        """
+        Cross-checks the conversion against the DLL of an open device.
+
+        :param lib: Kinesis library handle
+        :param serial_num: device serial number (c_char_p)
+        :param tolerance: allowed difference in device units
+        :return: None
+        """
+        dev_value = c_int()
+        for unit_type, real_values in VERIFY_VALUES.items():
+            for real_value in real_values:
+                lib.CC_GetDeviceUnitFromRealValue(serial_num, c_double(real_value), byref(dev_value), unit_type)
+                expected = self.to_device(real_value, unit_type)
+                if abs(dev_value.value - expected) > tolerance:
+                    raise RuntimeError(f"Unit conversion of {real_value} (unit type {unit_type}) gives {expected}, "
+                                       f"the device gives {dev_value.value}. Check the motor parameters.")